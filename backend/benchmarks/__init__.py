@@ -0,0 +1 @@
+# 性能基准测试模块初始化
\ No newline at end of file
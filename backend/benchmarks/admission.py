@@ -0,0 +1,81 @@
+"""
+准入控制：列表查询高峰下健康检查与单条读取的延迟
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.admission --list-requests 2000 --list-concurrency 200
+
+开启/关闭准入控制各在独立子进程中运行：以高并发持续请求大页列表（/api/company/?limit=1000），
+同时以低并发请求 /health 与 /api/company/{id}，比较后者的延迟及列表请求被拒绝（503）的数量
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import BACKEND_DIR, prepare_environment, seed_database, run_load
+
+MODES = {"off": "false", "on": "true"}
+
+
+def run_worker(args) -> None:
+    """子进程：在指定模式下执行压测并输出JSON结果"""
+    prepare_environment(ADMISSION_CONTROL_ENABLED=MODES[args.mode])
+    seed_database(users=10, companies=args.companies)
+
+    import main
+
+    async def list_request(client, i):
+        return await client.get("/api/company/", params={"skip": i % 10 * 1000, "limit": 1000})
+
+    async def probe_request(client, i):
+        if i % 2:
+            return await client.get("/health")
+        return await client.get(f"/api/company/{1 + i % args.companies}")
+
+    async def run():
+        flood = asyncio.ensure_future(run_load(main.app, list_request, args.list_requests, args.list_concurrency))
+        # 等待列表请求占满处理能力后再开始探测
+        await asyncio.sleep(0.5)
+        probe = await run_load(main.app, probe_request, args.probe_requests, args.probe_concurrency)
+        return await flood, probe
+
+    flood, probe = asyncio.run(run())
+    from middleware.admission import get_admission_stats
+    print(json.dumps({"mode": args.mode, "list": flood, "probe": probe, "stats": get_admission_stats()}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="准入控制下的探测请求延迟")
+    parser.add_argument("--companies", type=int, default=10000)
+    parser.add_argument("--list-requests", type=int, default=2000)
+    parser.add_argument("--list-concurrency", type=int, default=200)
+    parser.add_argument("--probe-requests", type=int, default=200)
+    parser.add_argument("--probe-concurrency", type=int, default=4)
+    parser.add_argument("--mode", choices=list(MODES))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    print(f"{'准入控制':<10}{'探测p50(ms)':>12}{'探测p99(ms)':>12}{'列表p99(ms)':>12}{'列表503':>10}{'列表req/s':>12}")
+    for mode in (args.mode,) if args.mode else MODES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.admission", "--worker", "--mode", mode,
+             "--companies", str(args.companies),
+             "--list-requests", str(args.list_requests), "--list-concurrency", str(args.list_concurrency),
+             "--probe-requests", str(args.probe_requests), "--probe-concurrency", str(args.probe_concurrency)],
+            cwd=BACKEND_DIR, env=os.environ.copy(), capture_output=True, text=True, check=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        probe, flood = r["probe"], r["list"]
+        print(f"{mode:<10}{probe['p50_ms']:>12.2f}{probe['p99_ms']:>12.2f}{flood['p99_ms']:>12.2f}"
+              f"{flood['errors']:>10}{flood['rps']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
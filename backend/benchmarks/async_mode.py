@@ -0,0 +1,69 @@
+"""
+同步/异步数据库模式吞吐对比
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.async_mode --requests 2000 --concurrency 32
+
+每种模式在独立子进程中运行（DB_ASYNC_MODE 在导入时生效），
+使用相同的数据量与并发度驱动 /api/users/{id} 与 /api/company/{id}，输出 requests/sec 对比
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import BACKEND_DIR, prepare_environment, seed_database, auth_headers, run_load
+
+MODES = {"sync": "false", "async": "true"}
+
+
+def run_worker(args) -> None:
+    """子进程：在指定模式下执行压测并输出JSON结果"""
+    prepare_environment(DB_ASYNC_MODE=MODES[args.mode])
+    seed_database(users=args.users, companies=args.companies)
+
+    import main
+
+    headers = auth_headers()
+
+    async def make_request(client, i):
+        if i % 2:
+            return await client.get(f"/api/users/{1 + i % args.users}", headers=headers)
+        return await client.get(f"/api/company/{1 + i % args.companies}")
+
+    result = asyncio.run(run_load(main.app, make_request, args.requests, args.concurrency))
+    result["mode"] = args.mode
+    print(json.dumps(result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="同步/异步数据库模式吞吐对比")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--companies", type=int, default=1000)
+    parser.add_argument("--mode", choices=list(MODES))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    print(f"{'mode':<8}{'req/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'errors':>8}")
+    for mode in (args.mode,) if args.mode else MODES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.async_mode", "--worker", "--mode", mode,
+             "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+             "--users", str(args.users), "--companies", str(args.companies)],
+            cwd=BACKEND_DIR, env=os.environ.copy(), capture_output=True, text=True, check=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<8}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
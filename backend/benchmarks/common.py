@@ -0,0 +1,167 @@
+"""
+基准测试公共工具
+负责准备临时SQLite数据库、批量写入测试数据，以及在进程内通过ASGI客户端驱动真实应用
+注意：必须在导入任何应用模块（config/database/main）之前调用 prepare_environment
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_environment(db_path: Optional[str] = None, **env: str) -> str:
+    """设置临时数据库及环境变量，返回数据库文件路径"""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="yg-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("DEBUG", "false")
+    os.environ.setdefault("TOKEN_DENYLIST_FILE", os.path.join(os.path.dirname(db_path), "revoked_tokens.log"))
+    for key, value in env.items():
+        os.environ[key] = str(value)
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    return db_path
+
+
+def seed_database(users: int = 10, companies: int = 100, password: str = "bench-password", search_index: bool = True) -> None:
+    """
+    批量写入测试用户与公司状态（直接使用Core批量插入，避免逐行ORM开销）
+    search_index=False 时停在建立检索索引之前的结构版本，由调用方自行执行最后的迁移
+    """
+    from database.database import engine
+    from database.schema import upgrade_schema
+    from models.user import User, CompanyState
+    from core.security import get_password_hash
+
+    # 先建表与普通索引，检索索引在写入后建立（一次回填比逐行触发器更快）
+    upgrade_schema(engine, "0003_material_indexes")
+    # 所有测试用户共用同一个密码哈希，避免seed阶段被哈希计算拖慢
+    hashed_password = get_password_hash(password)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {
+                "username": f"user{i}",
+                "email": f"user{i}@bench.local",
+                "hashed_password": hashed_password,
+                "full_name": f"Bench User {i}",
+                "role": "admin" if i == 0 else "user",
+                "is_active": True,
+                "certification": 0,
+            }
+            for i in range(users)
+        ])
+        batch = []
+        for i in range(companies):
+            batch.append({
+                "company_name": f"company-{i:08d}",
+                "company_code": f"C{i:08d}",
+                "bank_name": f"bank-{i % 50}",
+                "bank_account": f"{i:016d}",
+                "warranty_year": 2020 + i % 6,
+                "material_info": {"code": f"M{i % 1000:04d}", "quantity": i % 500},
+                "user_id": 1 + i % max(users, 1),
+            })
+            if len(batch) >= 10000:
+                conn.execute(CompanyState.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(CompanyState.__table__.insert(), batch)
+    if search_index:
+        upgrade_schema(engine)
+
+
+def auth_headers(username: str = "user0") -> Dict[str, str]:
+    """为测试用户签发访问令牌"""
+    from core.security import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+
+@contextmanager
+def count_queries():
+    """
+    统计代码块内执行的SQL语句，产出语句列表
+    同时监听同步引擎与异步引擎（的 sync_engine），与 DB_ASYNC_MODE 无关
+    """
+    from sqlalchemy import event
+    from database import database
+
+    statements: List[str] = []
+    engines = [database.engine]
+    if database.async_engine is not None:
+        engines.append(database.async_engine.sync_engine)
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", record)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def is_error_response(response) -> bool:
+    """HTTP状态码 >= 400，或统一响应格式中的 code 不为 20000"""
+    if response.status_code >= 400:
+        return True
+    if response.headers.get("content-type", "").startswith("application/json"):
+        body = response.json()
+        return isinstance(body, dict) and "code" in body and body["code"] != 20000
+    return False
+
+
+async def run_load(app, make_request: Callable, total: int, concurrency: int,
+                   is_error: Callable = lambda response: response.status_code >= 400) -> Dict[str, float]:
+    """
+    以固定并发驱动ASGI应用
+    make_request(client, i) 返回一个发起请求的协程，is_error(response) 判断响应是否计为错误
+    """
+    import httpx
+
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                start = time.perf_counter()
+                response = await make_request(client, i)
+                latencies.append(time.perf_counter() - start)
+                if is_error(response):
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed": elapsed,
+        "rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
@@ -0,0 +1,154 @@
+"""
+公司状态读缓存：详情与按用户查询的吞吐、SQL语句数，以及写入后的失效检查
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.company_cache --companies 10000 --hot 500 --requests 5000 --concurrency 16
+
+关闭/开启 COMPANY_CACHE_ENABLED 各在独立子进程中运行：请求集中在 --hot 个公司及其所属用户上
+（详情、按名称、按用户查询混合），比较吞吐、延迟与查询 company_states 的SQL语句数。
+开启时还检查修改、删除、新建、导入后立即读取都能读到最新数据、带 fields 的请求仍按投影查询，不满足时以非零状态码退出
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import BACKEND_DIR, prepare_environment, seed_database, auth_headers, run_load
+
+MODES = {"off": "false", "on": "true"}
+
+
+def run_worker(args) -> None:
+    """子进程：在指定模式下执行压测并输出JSON结果"""
+    prepare_environment(COMPANY_CACHE_ENABLED=MODES[args.mode], ADMISSION_CONTROL_ENABLED="false")
+    seed_database(users=100, companies=args.companies)
+
+    from sqlalchemy import event
+    import main
+    from config.settings import settings
+    from core.company_cache import company_cache
+    from database import database
+
+    counts = {"selects": 0, "material_selects": 0}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT") and "FROM company_states" in statement:
+            counts["selects"] += 1
+            counts["material_selects"] += "material_info" in statement.split("FROM", 1)[0]
+    engine = database.async_engine.sync_engine if settings.DB_ASYNC_MODE else database.engine
+    event.listen(engine, "before_cursor_execute", record)
+
+    headers = auth_headers("user0")
+
+    async def read(client, i):
+        company_id = 1 + (i * 7919) % args.hot
+        kind = i % 4
+        if kind == 0:
+            return await client.get(f"/api/company/name/company-{company_id - 1:08d}", headers=headers)
+        if kind == 1:
+            return await client.get(f"/api/company/user/{1 + company_id % 100}", headers=headers)
+        return await client.get(f"/api/company/{company_id}", headers=headers)
+
+    async def verify():
+        """写入后立即读取，检查缓存已失效"""
+        import httpx
+        checks = {}
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def get(path):
+                response = await client.get(path, headers=headers)
+                return response.status_code, response.json() if response.status_code == 200 else None
+
+            # 公司1属于用户1
+            await get("/api/company/1")
+            await get("/api/company/name/company-00000000")
+            await get("/api/company/user/1")
+            await client.put("/api/company/1", json={"bank_name": "cache-check"}, headers=headers)
+            checks["update_by_id"] = (await get("/api/company/1"))[1]["bank_name"] == "cache-check"
+            checks["update_by_name"] = (await get("/api/company/name/company-00000000"))[1]["bank_name"] == "cache-check"
+            user_list = (await get("/api/company/user/1"))[1]
+            checks["update_in_user_list"] = any(c["id"] == 1 and c["bank_name"] == "cache-check" for c in user_list)
+
+            # 带 fields 的请求按投影查询，不读取 material_info
+            selects, counts["material_selects"] = counts["selects"], 0
+            status_code, body = await get(f"/api/company/{args.hot + 1}?fields=id,company_name")
+            checks["fields_projected"] = (status_code == 200 and set(body) == {"id", "company_name"}
+                                          and counts["selects"] > selects and counts["material_selects"] == 0)
+
+            await client.delete("/api/company/1", headers=headers)
+            checks["delete_by_id"] = (await get("/api/company/1"))[0] == 404
+            checks["delete_by_name"] = (await get("/api/company/name/company-00000000"))[0] == 404
+            checks["delete_from_user_list"] = all(c["id"] != 1 for c in (await get("/api/company/user/1"))[1])
+
+            await get("/api/company/user/50")
+            response = await client.post("/api/company/", json={"company_name": "created-company", "user_id": 50}, headers=headers)
+            created_id = response.json()["id"]
+            checks["create_in_user_list"] = any(c["id"] == created_id for c in (await get("/api/company/user/50"))[1])
+
+            await get("/api/company/user/51")
+            await client.post(
+                "/api/company/import", headers=headers,
+                files={"file": ("import.ndjson", b'{"company_name": "imported-company", "user_id": 51}\n')},
+            )
+            checks["import_in_user_list"] = any(
+                c["company_name"] == "imported-company" for c in (await get("/api/company/user/51"))[1]
+            )
+        return checks
+
+    async def run():
+        result = await run_load(main.app, read, args.requests, args.concurrency)
+        selects = counts["selects"]
+        checks = await verify() if args.mode == "on" else {}
+        return result, selects, checks
+
+    counts["selects"] = 0
+    result, selects, checks = asyncio.run(run())
+    print(json.dumps({"mode": args.mode, "result": result, "selects": selects, "checks": checks,
+                      "stats": company_cache.stats()}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="公司状态读缓存的吞吐与失效检查")
+    parser.add_argument("--companies", type=int, default=10000)
+    parser.add_argument("--hot", type=int, default=500, help="被读取的公司数（热点集合）")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mode", choices=list(MODES))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    failed = []
+    print(f"{'缓存':<8}{'req/s':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'errors':>8}{'SELECT':>8}{'命中率':>8}")
+    for mode in (args.mode,) if args.mode else MODES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.company_cache", "--worker", "--mode", mode,
+             "--companies", str(args.companies), "--hot", str(args.hot),
+             "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+            cwd=BACKEND_DIR, env=os.environ.copy(), capture_output=True, text=True, check=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        result, stats = r["result"], r["stats"]
+        hit_ratio = f"{stats['hit_ratio']:.1%}" if stats["enabled"] else "-"
+        print(f"{mode:<8}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+              f"{result['errors']:>8}{r['selects']:>8}{hit_ratio:>8}")
+        for name, ok in r["checks"].items():
+            print(f"    {'OK  ' if ok else 'FAIL'} {name}")
+            if not ok:
+                failed.append(name)
+        if result["errors"]:
+            failed.append(f"{mode}: {result['errors']} errors")
+
+    if failed:
+        print(f"\n检查未通过: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
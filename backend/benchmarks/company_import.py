@@ -0,0 +1,94 @@
+"""
+公司状态批量导入吞吐
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.company_import --rows 100000 --batch-size 1000 --single 500
+
+比较逐行调用 /api/company/create 与 /api/company/import（NDJSON、CSV）的每秒导入行数
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import time
+
+from benchmarks.common import prepare_environment, seed_database
+
+
+def make_records(prefix: str, count: int, users: int):
+    """生成测试用公司状态"""
+    return [
+        {
+            "company_name": f"{prefix}-{i:08d}",
+            "company_code": f"C{i:08d}",
+            "bank_name": f"bank-{i % 50}",
+            "bank_account": f"{i:016d}",
+            "warranty_year": 2020 + i % 6,
+            "material_info": {"code": f"M{i % 1000:04d}", "quantity": i % 500},
+            "user_id": 1 + i % users,
+        }
+        for i in range(count)
+    ]
+
+
+def to_ndjson(records) -> bytes:
+    return "\n".join(json.dumps(record) for record in records).encode()
+
+
+def to_csv(records) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(records[0]))
+    writer.writeheader()
+    for record in records:
+        writer.writerow({**record, "material_info": json.dumps(record["material_info"])})
+    return buffer.getvalue().encode()
+
+
+async def run(args) -> None:
+    import httpx
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        records = make_records("single", args.single, args.users)
+        started = time.perf_counter()
+        for record in records:
+            response = await client.post("/api/company/create", json=record)
+            assert response.json()["code"] == 20000, response.text
+        elapsed = time.perf_counter() - started
+        print(f"{'逐行 /create':<16}{args.single:>10}{elapsed:>10.2f}{args.single / elapsed:>14.0f}")
+
+        for fmt, encode in (("ndjson", to_ndjson), ("csv", to_csv)):
+            body = encode(make_records(fmt, args.rows, args.users))
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/company/import",
+                params={"batch_size": args.batch_size},
+                files={"file": (f"companies.{fmt}", body)},
+            )
+            elapsed = time.perf_counter() - started
+            data = response.json()["data"]
+            assert data["inserted"] == args.rows, data
+            print(f"{'/import ' + fmt:<16}{args.rows:>10}{elapsed:>10.2f}{args.rows / elapsed:>14.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="公司状态批量导入吞吐")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--single", type=int, default=500, help="逐行创建对照组的行数")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--async-mode", action="store_true", help="使用异步数据库模式")
+    args = parser.parse_args()
+
+    prepare_environment(DB_ASYNC_MODE="true" if args.async_mode else "false")
+    seed_database(users=args.users, companies=0)
+
+    print(f"{'方式':<16}{'行数':>10}{'耗时(s)':>10}{'行/秒':>14}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+公司检索：LIKE 全表扫描 vs FTS5 trigram 索引
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.company_search --rows 1000000
+
+写入测试数据后创建检索索引（记录回填耗时），再对若干检索词分别以 LIKE 与 FTS5 查询第一页（含命中总数），
+并测量开启同步触发器后批量写入的开销
+"""
+
+import argparse
+import time
+
+from benchmarks.common import prepare_environment, seed_database
+
+QUERIES = [
+    ("稀有子串", "00123456"),
+    ("常见词", "bank-7"),
+    ("名称片段", "company-000999"),
+    ("多个词", "bank-1 C0000"),
+    ("无结果", "zzzzzz"),
+]
+
+
+def timed(fn, repeat: int):
+    """多次执行取最小耗时（毫秒），同时返回最后一次结果"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="公司检索：LIKE vs FTS5")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--insert-rows", type=int, default=50000, help="测量触发器写入开销的插入行数")
+    args = parser.parse_args()
+
+    prepare_environment()
+    seed_database(users=10, companies=args.rows, search_index=False)
+
+    from config.settings import settings
+    from database.database import SessionLocal, engine
+    from database.schema import upgrade_schema
+    from models.user import CompanyState
+    from crud.company import search_company_states
+    from core.search import split_terms
+
+    def bulk_insert(prefix: str) -> float:
+        rows = [{"company_name": f"{prefix}-{i}", "bank_name": "bench", "user_id": 1} for i in range(args.insert_rows)]
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(CompanyState.__table__.insert(), rows)
+        return args.insert_rows / (time.perf_counter() - start)
+
+    plain_rate = bulk_insert("plain")
+    start = time.perf_counter()
+    upgrade_schema(engine, "0004_company_search_fts")
+    print(f"索引回填 {args.rows + args.insert_rows} 行: {time.perf_counter() - start:.2f}s")
+    trigger_rate = bulk_insert("trigger")
+    print(f"批量写入: 无触发器 {plain_rate:.0f} 行/秒，带同步触发器 {trigger_rate:.0f} 行/秒\n")
+    upgrade_schema(engine)
+
+    db = SessionLocal()
+    print(f"{'检索词':<24}{'命中':>10}{'LIKE(ms)':>12}{'FTS5(ms)':>12}")
+    for label, q in QUERIES:
+        terms = split_terms(q)
+        settings.COMPANY_SEARCH_FTS_ENABLED = False
+        like_ms, (_, like_total) = timed(lambda: search_company_states(db, terms, limit=args.limit), args.repeat)
+        settings.COMPANY_SEARCH_FTS_ENABLED = True
+        fts_ms, (_, fts_total) = timed(lambda: search_company_states(db, terms, limit=args.limit), args.repeat)
+        assert like_total == fts_total, (q, like_total, fts_total)
+        print(f"{label + ' ' + q:<24}{fts_total:>10}{like_ms:>12.1f}{fts_ms:>12.1f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+合同到期窗口：索引命中、键集翻页与定时增量扫描检查
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.contract_expiry --companies 200000
+
+检查：窗口查询的 EXPLAIN QUERY PLAN 使用 ix_company_states_contract_expire_id 且无需额外排序；
+GET /api/company/expiring 逐页翻完（含向前翻页）的结果与直接查询一致；定时扫描在时间后移时只读取新进入窗口的行，
+经由接口修改、新建、删除公司状态后下一次扫描与直接查询一致。并比较有无索引时首页查询的耗时。不满足时以非零状态码退出
+"""
+
+import argparse
+import sys
+import time
+from datetime import timedelta
+
+from benchmarks.common import prepare_environment, seed_database, auth_headers
+
+INDEX_NAME = "ix_company_states_contract_expire_id"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="合同到期窗口检查")
+    parser.add_argument("--companies", type=int, default=200000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # 关闭缓存与准入控制，定时扫描由本脚本手动触发
+    prepare_environment(ADMISSION_CONTROL_ENABLED="false", COMPANY_CACHE_ENABLED="false",
+                        CONTRACT_EXPIRY_SCAN_INTERVAL="3600", CONTRACT_EXPIRY_WINDOW_DAYS=str(args.days))
+    seed_database(users=10, companies=args.companies)
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, select, text
+    from database.database import SessionLocal, engine
+    from models.user import CompanyState, utcnow
+    from core.contract_expiry import contract_expiry
+    from core.material import explain_plan
+    from crud.company import get_company_states_expiring
+    from main import app
+
+    # 2/3 的公司设置合同到期时间（过去10天到未来170天，分钟级分散），
+    # 按 SQLAlchemy 的存储格式（YYYY-MM-DD HH:MM:SS.ffffff）写入，保证与绑定参数按字符串比较时一致
+    now = utcnow()
+    offset = func.printf("+%d minutes", CompanyState.id * 7 % (180 * 1440) - 10 * 1440)
+    with engine.begin() as conn:
+        conn.execute(
+            CompanyState.__table__.update()
+            .where(CompanyState.id % 3 != 0)
+            .values(framework_contract_expire=func.printf("%s000", func.strftime("%Y-%m-%d %H:%M:%f", now, offset)))
+        )
+
+    failures = 0
+
+    def check(label: str, ok: bool, detail: str = "") -> None:
+        nonlocal failures
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label:<44} {detail}")
+
+    expire = CompanyState.framework_contract_expire
+
+    def expected_ids(start, end):
+        with engine.connect() as conn:
+            return list(conn.execute(
+                select(CompanyState.id).where(expire >= start, expire < end).order_by(expire, CompanyState.id)
+            ).scalars())
+
+    start, end = now, now + timedelta(days=args.days)
+    with SessionLocal() as db:
+        query = db.query(CompanyState).filter(expire >= start, expire < end).order_by(expire, CompanyState.id)
+        plan = explain_plan(db, query.limit(args.limit + 1))
+        check("窗口查询使用复合索引", any(INDEX_NAME in line for line in plan), " | ".join(plan))
+        check("窗口查询无需额外排序", not any("TEMP B-TREE" in line for line in plan))
+
+        def first_page_ms() -> float:
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                get_company_states_expiring(db, start, end, limit=args.limit)
+            return (time.perf_counter() - started) / args.repeat * 1000
+
+        indexed_ms = first_page_ms()
+        db.execute(text(f"DROP INDEX {INDEX_NAME}"))
+        scan_ms = first_page_ms()
+        db.rollback()
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON company_states (framework_contract_expire, id)"))
+
+    headers = auth_headers("user0")
+    with TestClient(app) as client:
+        # 逐页翻完窗口，再从最后一页向前翻回第一页
+        params = {"start": start.isoformat(), "end": end.isoformat(), "limit": args.limit}
+        ids, pages, cursor, last = [], [], None, None
+        while True:
+            page = client.get("/api/company/expiring", params={**params, "cursor": cursor} if cursor else params,
+                              headers=headers).json()
+            ids.extend(item["id"] for item in page["items"])
+            pages.append([item["id"] for item in page["items"]])
+            last = page
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        expected = expected_ids(start, end)
+        check("翻页结果与直接查询一致", ids == expected, f"{len(ids)} / {len(expected)} 行，{len(pages)} 页")
+        backward, cursor = [], last["prev_cursor"]
+        while cursor:
+            page = client.get("/api/company/expiring", params={**params, "cursor": cursor}, headers=headers).json()
+            backward.insert(0, [item["id"] for item in page["items"]])
+            cursor = page["prev_cursor"]
+        check("向前翻页结果一致", backward == pages[:-1], f"{len(backward)} 页")
+        status_code = client.get("/api/company/expiring", params={"start": end.isoformat(), "end": start.isoformat()},
+                                 headers=headers).status_code
+        check("end 早于 start 返回400", status_code == 400, str(status_code))
+
+        # 定时扫描：启动时的首次扫描为全量
+        snapshot = contract_expiry.scan(now)
+        window = set(expected_ids(now, now + timedelta(days=args.days)))
+        check("首次扫描与直接查询一致", snapshot["total"] == len(window), f"{snapshot['total']} / {len(window)}")
+
+        # 时间后移一天：只读取新进入窗口的行
+        later = now + timedelta(days=1)
+        snapshot = contract_expiry.scan(later)
+        window = expected_ids(later, later + timedelta(days=args.days))
+        entered = len(expected_ids(now + timedelta(days=args.days), later + timedelta(days=args.days)))
+        check("增量扫描只读取新进入窗口的行", not snapshot["full_scan"] and snapshot["scanned_rows"] == entered,
+              f"{snapshot['scanned_rows']} 行（窗口共 {len(window)} 行）")
+        check("增量扫描后与直接查询一致", snapshot["total"] == len(window)
+              and [item["id"] for item in snapshot["soonest"]] == window[:len(snapshot["soonest"])],
+              f"{snapshot['total']} / {len(window)}")
+
+        # 经由接口写入后，下一次扫描按ID重新读取
+        # 种子数据都落在整分钟上，半分钟后到期的合同必然排在最前面
+        soon = (later + timedelta(seconds=30)).isoformat()
+        moved = window[-1]
+        client.put(f"/api/company/{moved}", json={"framework_contract_expire": soon}, headers=headers)
+        outside = expected_ids(later + timedelta(days=args.days + 1), later + timedelta(days=args.days + 2))[0]
+        client.put(f"/api/company/{outside}", json={"framework_contract_expire": soon}, headers=headers)
+        client.delete(f"/api/company/{window[0]}", headers=headers)
+        created = client.post("/api/company/", json={"company_name": "expiry-check", "user_id": 1,
+                                                     "framework_contract_expire": soon}, headers=headers).json()["id"]
+        snapshot = contract_expiry.scan(later)
+        window = expected_ids(later, later + timedelta(days=args.days))
+        soonest = [item["id"] for item in snapshot["soonest"]]
+        check("写入后扫描与直接查询一致", snapshot["total"] == len(window) and soonest == window[:len(soonest)],
+              f"{snapshot['total']} / {len(window)}")
+        check("修改、新建的合同进入最近到期列表", {moved, outside, created} <= set(soonest), str(soonest[:5]))
+
+        stats = client.get("/api/dashboard/stats", headers=headers).json()["data"]
+        check("仪表盘返回扫描快照", stats["contracts"]["upcoming"]["total"] == snapshot["total"])
+
+    print(f"\n窗口 {args.days} 天首页（{args.limit} 行）：有索引 {indexed_ms:.2f}ms，无索引 {scan_ms:.2f}ms")
+
+    if failures:
+        print(f"\n{failures} 项检查未通过")
+        sys.exit(1)
+    print("\n全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+仪表盘汇总计数：增量维护的一致性检查与统计接口耗时
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.dashboard --users 1000 --companies 200000
+
+检查：迁移回填后汇总表与全表统计一致；经由接口新建/修改/删除用户与公司状态、批量导入、删除用户（级联删除公司状态）后
+以及多个线程并发修改同一行后仍然一致；统计接口返回的数值与直接 COUNT 的结果相同；汇总表被改动后 check 能发现、rebuild 能修复。
+然后比较 GET /api/dashboard/stats 与按全表 GROUP BY 统计的耗时。不满足时以非零状态码退出
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from benchmarks.common import BACKEND_DIR, prepare_environment, seed_database, auth_headers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="仪表盘汇总计数检查与耗时")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--companies", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--concurrent-updates", type=int, default=25, help="并发检查中每个线程修改同一行的次数")
+    args = parser.parse_args()
+
+    prepare_environment(ADMISSION_CONTROL_ENABLED="false")
+    seed_database(users=args.users, companies=args.companies, search_index=False)
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, select, text
+    from database.database import SessionLocal, engine
+    from database.schema import upgrade_schema
+    from models.user import CompanyState, utcnow
+    from crud.dashboard import EXPIRY_WINDOWS, check_counters, compute_counters, get_dashboard_stats
+    from crud.company import update_company_state
+    from crud.user import update_user
+    from schemas.company import CompanyStateUpdate
+    from main import app
+
+    # 部分公司设置合同到期时间（过去10天到未来120天），再执行剩余迁移回填汇总表
+    now = utcnow()
+    with engine.begin() as conn:
+        conn.execute(
+            CompanyState.__table__.update()
+            .where(CompanyState.id % 3 == 0)
+            .values(framework_contract_expire=func.datetime(now, func.printf("+%d days", CompanyState.id % 130 - 10)))
+        )
+    upgrade_schema(engine)
+
+    failures = 0
+
+    def check(label: str, ok: bool, detail: str = "") -> None:
+        nonlocal failures
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label:<40} {detail}")
+
+    def consistent(label: str) -> None:
+        with SessionLocal() as db:
+            result = check_counters(db)
+        check(label, result["consistent"], str(result["mismatches"][:3]) if result["mismatches"] else "")
+
+    consistent("迁移回填后一致")
+
+    headers = auth_headers("user0")
+    expire = (now + timedelta(days=45)).isoformat()
+    with TestClient(app) as client:
+        response = client.post("/api/users/", json={"username": "dash-user", "email": "dash@bench.local",
+                                                    "password": "dash-password", "role": "admin"}, headers=headers)
+        user_id = response.json()["id"]
+        consistent("新建用户后一致")
+        client.put(f"/api/users/{user_id}", json={"role": "user", "is_active": False}, headers=headers)
+        consistent("修改角色与启用状态后一致")
+
+        company = client.post("/api/company/", json={"company_name": "dash-company", "user_id": user_id,
+                                                    "warranty_year": 2031, "framework_contract_expire": expire},
+                              headers=headers).json()
+        consistent("新建公司状态后一致")
+        client.put(f"/api/company/{company['id']}", json={"warranty_year": 2032, "framework_contract_expire": None},
+                   headers=headers)
+        consistent("修改质保年与到期时间后一致")
+        client.delete(f"/api/company/{company['id']}", headers=headers)
+        consistent("删除公司状态后一致")
+
+        lines = "".join(
+            f'{{"company_name": "dash-import-{i}", "user_id": {user_id}, "warranty_year": {2020 + i % 3}, '
+            f'"framework_contract_expire": "{expire}"}}\n' for i in range(50)
+        )
+        client.post("/api/company/import", files={"file": ("import.ndjson", lines.encode())}, headers=headers)
+        consistent("批量导入后一致")
+        client.delete(f"/api/users/{user_id}", headers=headers)
+        consistent("删除用户（级联删除公司状态）后一致")
+
+        # 并发修改同一行（各线程独立会话）：旧值须在写锁内读取，否则多个事务减去同一组旧计数
+        def toggle(worker: int) -> None:
+            for i in range(args.concurrent_updates):
+                with SessionLocal() as db:
+                    update_company_state(db, 2, CompanyStateUpdate(warranty_year=2040 + (worker + i) % 3))
+                    update_user(db, 2, {"is_active": (worker + i) % 2 == 0, "role": ("user", "admin")[i % 2]})
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(toggle, range(8)))
+        consistent("并发修改同一行后一致")
+
+        stats = client.get("/api/dashboard/stats", headers=headers).json()["data"]
+        with engine.connect() as conn:
+            total = conn.execute(select(func.count()).select_from(CompanyState)).scalar()
+            today = now.date()
+            expiring = {
+                days: conn.execute(select(func.count()).select_from(CompanyState).where(
+                    func.date(CompanyState.framework_contract_expire).between(
+                        today.isoformat(), (today + timedelta(days=days)).isoformat()))).scalar()
+                for days in EXPIRY_WINDOWS
+            }
+            users = conn.execute(text("SELECT COUNT(*) FROM users")).scalar()
+        check("公司总数", stats["companies"]["total"] == total, f"{stats['companies']['total']} / {total}")
+        check("用户总数", stats["users"]["total"] == users, f"{stats['users']['total']} / {users}")
+        for days in EXPIRY_WINDOWS:
+            value = stats["contracts"][f"within_{days}_days"]
+            check(f"{days}天内到期", value == expiring[days], f"{value} / {expiring[days]}")
+
+        # 汇总表被改动：check 发现、rebuild 修复
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE dashboard_counters SET value = value + 7 WHERE metric = 'companies_by_user' AND bucket = '1'"))
+        check_cli = subprocess.run([sys.executable, "-m", "crud.dashboard", "check"], cwd=BACKEND_DIR,
+                                   env=os.environ.copy(), capture_output=True, text=True)
+        check("check 发现不一致（非零退出）", check_cli.returncode == 1, check_cli.stdout.strip().splitlines()[0])
+        response = client.post("/api/admin/dashboard/rebuild", headers=headers)
+        check("rebuild 接口", response.json()["code"] == 20000, str(response.json()["data"]))
+        consistent("rebuild 后一致")
+
+        # 耗时：统计接口（汇总表） vs 全表 GROUP BY
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            client.get("/api/dashboard/stats", headers=headers)
+        summary_ms = (time.perf_counter() - start) / args.repeat * 1000
+        with SessionLocal() as db:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                get_dashboard_stats(db)
+            query_ms = (time.perf_counter() - start) / args.repeat * 1000
+            start = time.perf_counter()
+            for _ in range(max(1, args.repeat // 5)):
+                compute_counters(db)
+            scan_ms = (time.perf_counter() - start) / max(1, args.repeat // 5) * 1000
+
+    print(f"\n{args.companies} 行公司状态：GET /api/dashboard/stats {summary_ms:.2f}ms（其中汇总表查询 {query_ms:.2f}ms），"
+          f"全表 GROUP BY 统计 {scan_ms:.1f}ms")
+
+    if failures:
+        print(f"\n{failures} 项检查未通过")
+        sys.exit(1)
+    print("\n全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+流式导出 vs 分页拉取全表
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.export --rows 200000
+
+比较通过 GET /api/company/?skip=&limit=100 逐页拉取全表与 GET /api/company/export 流式导出的
+总耗时、首字节时间及 Python 堆内存峰值（tracemalloc）
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks.common import prepare_environment, seed_database, auth_headers
+
+
+async def stream_asgi(app, path: str, query: str, headers=None):
+    """
+    直接调用ASGI应用并逐块产出响应体
+    （httpx.ASGITransport 会先缓冲完整响应体，无法测量首字节时间）
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [(b"host", b"bench")] + [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    finished = asyncio.Event()
+    requested = False
+
+    async def receive():
+        # 首次返回请求体，之后阻塞直到响应结束（StreamingResponse 会持续监听断开事件）
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        await queue.put(message)
+
+    task = asyncio.ensure_future(app(scope, receive, send))
+    while True:
+        message = await queue.get()
+        if message["type"] == "http.response.body":
+            yield message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+    finished.set()
+    await task
+
+
+async def measure(fetch):
+    """执行两次：第一次计时，第二次在 tracemalloc 下统计内存峰值（tracemalloc 会显著拖慢执行）"""
+    started = time.perf_counter()
+    rows, first_byte = await fetch()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    await fetch()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, elapsed, first_byte, peak
+
+
+async def run(args) -> None:
+    import httpx
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def paged():
+            skip = rows = 0
+            while True:
+                response = await client.get("/api/company/", params={"skip": skip, "limit": args.page_size})
+                page = response.json()
+                if not page:
+                    return rows, None
+                rows += len(page)
+                skip += args.page_size
+
+        rows, elapsed, _, peak = await measure(paged)
+        print(f"{'分页拉取':<14}{rows:>10}{elapsed:>10.2f}{'-':>12}{peak / 2**20:>12.1f}")
+
+        for fmt in ("ndjson", "csv"):
+            async def exported():
+                started = time.perf_counter()
+                first_byte = None
+                lines = 0
+                async for chunk in stream_asgi(app, "/api/company/export", f"format={fmt}", auth_headers()):
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - started
+                    lines += chunk.count(b"\n")
+                return (lines - 1 if fmt == "csv" else lines), first_byte
+
+            rows, elapsed, first_byte, peak = await measure(exported)
+            print(f"{'导出 ' + fmt:<14}{rows:>10}{elapsed:>10.2f}{first_byte * 1000:>12.1f}{peak / 2**20:>12.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="流式导出 vs 分页拉取全表")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--async-mode", action="store_true", help="使用异步数据库模式")
+    args = parser.parse_args()
+
+    prepare_environment(DB_ASYNC_MODE="true" if args.async_mode else "false")
+    seed_database(users=10, companies=args.rows)
+
+    print(f"{'方式':<14}{'行数':>10}{'耗时(s)':>10}{'首字节(ms)':>12}{'内存峰值(MB)':>12}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
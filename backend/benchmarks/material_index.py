@@ -0,0 +1,68 @@
+"""
+物料信息JSON路径查询的耗时
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.material_index --rows 200000
+
+对声明的路径执行等值/范围查询（含翻页游标），列出 EXPLAIN QUERY PLAN 中使用的表达式索引与查询耗时，
+并与"加载全部 material_info 后在Python中过滤"的旧做法对比。索引命中的断言见 tests/test_material_index.py
+"""
+
+import argparse
+import time
+
+from benchmarks.common import prepare_environment, seed_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="物料信息JSON路径查询的索引检查")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    prepare_environment()
+    seed_database(users=10, companies=args.rows)
+
+    from core.material import explain_plan, indexes_used
+
+    from database.database import SessionLocal
+    from models.user import CompanyState
+    from crud.company import company_states_by_material_query, get_company_states_by_material
+    from core.pagination import encode_cursor
+
+    cases = [
+        ("code 等值", [("code", "eq", "M0042")]),
+        ("quantity 范围", [("quantity", "gte", 100), ("quantity", "lt", 105)]),
+        ("code + quantity", [("code", "eq", "M0042"), ("quantity", "gt", 10)]),
+    ]
+
+    db = SessionLocal()
+    print(f"{'条件':<20}{'游标':<6}{'命中索引':<40}{'索引查询(ms)':>14}")
+    for label, conditions in cases:
+        for cursor_key in (None, args.rows // 2):
+            query = company_states_by_material_query(db, conditions)
+            if cursor_key is not None:
+                query = query.filter(CompanyState.id > cursor_key)
+            plan = explain_plan(db, query.order_by(CompanyState.id).limit(args.limit + 1))
+            used = indexes_used(plan)
+
+            cursor = encode_cursor([cursor_key]) if cursor_key is not None else None
+            start = time.perf_counter()
+            get_company_states_by_material(db, conditions, cursor=cursor, limit=args.limit)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{label:<20}{'有' if cursor else '无':<6}{', '.join(used) or '无（' + ' | '.join(plan) + '）':<40}"
+                  f"{elapsed:>14.1f}")
+
+    # 对照：旧做法，读取全部物料信息后在Python中过滤
+    start = time.perf_counter()
+    matched = [
+        row.id for row in db.query(CompanyState.id, CompanyState.material_info)
+        if (row.material_info or {}).get("code") == "M0042"
+    ]
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"\n对照：全表加载后Python过滤 code=M0042，命中 {len(matched)} 行，耗时 {elapsed:.1f}ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+偏移分页 vs 键集分页 深翻页对比
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.pagination --rows 1000000 --limit 100 --page 10000
+
+比较第1页与第 N 页在 offset/limit 与游标分页下的查询耗时（全表列表与按用户列表）
+"""
+
+import argparse
+import time
+
+from benchmarks.common import prepare_environment, seed_database
+
+
+def timed(fn, repeat: int) -> float:
+    """多次执行取最小耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="偏移分页 vs 键集分页 深翻页对比")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--page", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    prepare_environment()
+    seed_database(users=args.users, companies=args.rows)
+
+    from database.database import SessionLocal
+    from models.user import CompanyState
+    from crud.company import get_company_states, get_company_states_page
+    from core.pagination import encode_cursor
+
+    db = SessionLocal()
+    user_id = 1
+    user_rows = db.query(CompanyState).filter(CompanyState.user_id == user_id).count()
+    user_page = max(1, min(args.page, user_rows // args.limit))
+
+    def nth_key(page: int, user_filter: bool):
+        """第 page 页之前最后一行的排序键（模拟客户端持有的游标）"""
+        query = db.query(CompanyState.user_id, CompanyState.id)
+        if user_filter:
+            query = query.filter(CompanyState.user_id == user_id).order_by(CompanyState.user_id, CompanyState.id)
+        else:
+            query = query.order_by(CompanyState.id)
+        row = query.offset((page - 1) * args.limit - 1).limit(1).one()
+        return [row.id]
+
+    def offset_all(page):
+        return lambda: get_company_states(db, skip=(page - 1) * args.limit, limit=args.limit)
+
+    def offset_user(page):
+        skip = (page - 1) * args.limit
+        return lambda: (
+            db.query(CompanyState).filter(CompanyState.user_id == user_id)
+            .order_by(CompanyState.id).offset(skip).limit(args.limit).all()
+        )
+
+    def keyset(page, user_filter):
+        cursor = encode_cursor(nth_key(page, user_filter)) if page > 1 else None
+        uid = user_id if user_filter else None
+        return lambda: get_company_states_page(db, cursor=cursor, limit=args.limit, user_id=uid)
+
+    cases = [
+        ("all / offset", 1, offset_all(1)),
+        ("all / offset", args.page, offset_all(args.page)),
+        ("all / keyset", 1, keyset(1, False)),
+        ("all / keyset", args.page, keyset(args.page, False)),
+        ("user / offset", 1, offset_user(1)),
+        ("user / offset", user_page, offset_user(user_page)),
+        ("user / keyset", 1, keyset(1, True)),
+        ("user / keyset", user_page, keyset(user_page, True)),
+    ]
+
+    print(f"rows={args.rows} limit={args.limit}")
+    print(f"{'query':<16}{'page':>8}{'ms':>12}")
+    for name, page, fn in cases:
+        db.expunge_all()
+        print(f"{name:<16}{page:>8}{timed(fn, args.repeat):>12.3f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
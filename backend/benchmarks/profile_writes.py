@@ -0,0 +1,119 @@
+"""
+个人信息延迟写入：逐字段自动保存的吞吐与事务数
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.profile_writes --users 50 --requests 3000 --concurrency 32
+
+关闭/开启 PROFILE_WRITE_BEHIND_ENABLED 各在独立子进程中运行：多个用户并发地逐字段调用 PUT /api/user/profile，
+比较吞吐、延迟、提交的事务数与 UPDATE 语句数；开启时还检查写入后立即读取 /api/user/info 能读到新值、
+关闭应用时剩余修改全部落库，不满足时以非零状态码退出
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import BACKEND_DIR, prepare_environment, seed_database, auth_headers, run_load, is_error_response
+
+MODES = {"off": "false", "on": "true"}
+
+# 自动保存时逐个提交的前端字段
+FIELDS = ("job", "organization", "location", "phone", "name")
+
+
+def run_worker(args) -> None:
+    """子进程：在指定模式下执行压测并输出JSON结果"""
+    prepare_environment(PROFILE_WRITE_BEHIND_ENABLED=MODES[args.mode], ADMISSION_CONTROL_ENABLED="false")
+    seed_database(users=args.users, companies=0)
+
+    from sqlalchemy import event, select
+    import main
+    from database.database import engine
+    from core.write_behind import profile_writes
+    from models.user import User
+
+    counts = {"commits": 0, "updates": 0}
+    event.listen(engine, "commit", lambda conn: counts.__setitem__("commits", counts["commits"] + 1))
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE users"):
+            counts["updates"] += 1
+    event.listen(engine, "before_cursor_execute", record)
+
+    headers = [auth_headers(f"user{i}") for i in range(args.users)]
+
+    async def autosave(client, i):
+        field = FIELDS[i // args.users % len(FIELDS)]
+        return await client.put("/api/user/profile", json={field: f"{field}-{i}"}, headers=headers[i % args.users])
+
+    async def run():
+        if args.mode == "on":
+            profile_writes.start()
+        result = await run_load(main.app, autosave, args.requests, args.concurrency, is_error=is_error_response)
+        checks = {}
+        if args.mode == "on":
+            import httpx
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                await profile_writes.flush_async()
+                await client.put("/api/user/profile", json={"job": "read-your-writes"}, headers=headers[0])
+                info = (await client.get("/api/user/info", headers=headers[0])).json()["data"]
+                with engine.connect() as conn:
+                    stored = conn.execute(select(User.job).where(User.username == "user0")).scalar()
+                checks["overlay_visible"] = info["job"] == "read-your-writes"
+                checks["not_yet_stored"] = stored != "read-your-writes"
+            await profile_writes.stop()
+            with engine.connect() as conn:
+                stored = conn.execute(select(User.job).where(User.username == "user0")).scalar()
+            checks["flushed_on_stop"] = stored == "read-your-writes"
+        return result, checks
+
+    # 只统计压测期间（不含seed）的事务
+    counts.update(commits=0, updates=0)
+    result, checks = asyncio.run(run())
+    print(json.dumps({"mode": args.mode, "result": result, "counts": counts, "checks": checks,
+                      "stats": profile_writes.stats()}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="个人信息延迟写入的吞吐与事务数")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mode", choices=list(MODES))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    failed = []
+    print(f"{'延迟写入':<10}{'req/s':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'errors':>8}{'事务数':>8}{'UPDATE':>8}")
+    for mode in (args.mode,) if args.mode else MODES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.profile_writes", "--worker", "--mode", mode,
+             "--users", str(args.users), "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+            cwd=BACKEND_DIR, env=os.environ.copy(), capture_output=True, text=True, check=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        result, counts = r["result"], r["counts"]
+        print(f"{mode:<10}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+              f"{result['errors']:>8}{counts['commits']:>8}{counts['updates']:>8}")
+        for name, ok in r["checks"].items():
+            print(f"    {'OK  ' if ok else 'FAIL'} {name}")
+            if not ok:
+                failed.append(name)
+        if result["errors"]:
+            failed.append(f"{mode}: {result['errors']} errors")
+
+    if failed:
+        print(f"\n检查未通过: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
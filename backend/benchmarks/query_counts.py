@@ -0,0 +1,62 @@
+"""
+批量查询接口：逐个请求 vs 批量请求的耗时与SQL语句数
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.query_counts
+    python -m benchmarks.query_counts --async-mode
+
+比较逐个请求 /api/company/info/{id} 与一次 POST /api/company/batch 的耗时，以及 /api/users/with-companies 的耗时，
+并列出各自执行的SQL语句数。语句数的断言见 tests/test_query_counts.py（python -m pytest tests）
+"""
+
+import argparse
+import time
+
+from benchmarks.common import prepare_environment, seed_database, auth_headers, count_queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="批量查询接口的耗时与SQL语句数")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--keys", type=int, default=50, help="每次批量查询的键数量")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--async-mode", action="store_true", help="使用异步数据库模式")
+    args = parser.parse_args()
+
+    prepare_environment(DB_ASYNC_MODE="true" if args.async_mode else "false", ADMISSION_CONTROL_ENABLED="false")
+    seed_database(users=args.users, companies=args.companies)
+
+    from fastapi.testclient import TestClient
+    from main import app
+
+    headers = auth_headers("user0")
+    ids = list(range(1, args.keys + 1))
+    names = [f"company-{i:08d}" for i in range(args.keys)]
+
+    with TestClient(app) as client:
+        # 预热认证主体缓存，使鉴权查询不计入统计
+        client.get("/api/user/me", headers=headers)
+
+        def measure(label: str, request) -> None:
+            with count_queries() as statements:
+                request()
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                request()
+            elapsed = (time.perf_counter() - start) / args.repeat * 1000
+            print(f"{label:<44}{len(statements):>8}{elapsed:>12.2f}")
+
+        print(f"{'请求':<44}{'语句数':>8}{'耗时(ms)':>12}")
+        measure(f"GET /api/company/info/{{id}} x {len(ids)}",
+                lambda: [client.get(f"/api/company/info/{i}") for i in ids])
+        measure(f"POST /api/company/batch ids x {len(ids)}",
+                lambda: client.post("/api/company/batch", json={"ids": ids}))
+        measure(f"POST /api/company/batch names x {len(names)}",
+                lambda: client.post("/api/company/batch", json={"names": names}))
+        measure(f"GET /api/users/with-companies limit={args.users}",
+                lambda: client.get("/api/users/with-companies", params={"limit": args.users}, headers=headers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+读写分离检查：第二个SQLite文件作为只读副本
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.replica_routing
+    python -m benchmarks.replica_routing --async-mode
+
+主库写入测试数据后复制到副本文件（之后不再自动同步，模拟复制延迟），检查：
+只读请求的SQL在副本上执行、写请求在主库执行；写入后携带粘滞Cookie的读取能读到刚写入的数据，
+不带Cookie的读取在同步前读不到、同步后读到；副本连接拒绝写入。不满足时以非零状态码退出
+"""
+
+import argparse
+import json
+import os
+import sys
+from contextlib import contextmanager
+
+from benchmarks.common import prepare_environment, seed_database, auth_headers
+
+
+@contextmanager
+def engine_statements(engines):
+    """按引擎名统计代码块内执行的SQL语句数"""
+    from sqlalchemy import event
+
+    counts = {name: 0 for name in engines}
+    listeners = []
+    for name, sync_engine in engines.items():
+        def record(*args, name=name):
+            counts[name] += 1
+        event.listen(sync_engine, "before_cursor_execute", record)
+        listeners.append((sync_engine, record))
+    try:
+        yield counts
+    finally:
+        for sync_engine, record in listeners:
+            event.remove(sync_engine, "before_cursor_execute", record)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="读写分离检查")
+    parser.add_argument("--async-mode", action="store_true", help="使用异步数据库模式")
+    args = parser.parse_args()
+
+    # 关闭公司状态缓存，使每次读取都实际查询数据库
+    db_path = prepare_environment(DB_ASYNC_MODE="true" if args.async_mode else "false", COMPANY_CACHE_ENABLED="false")
+    replica_path = os.path.join(os.path.dirname(db_path), "replica.db")
+    os.environ["DATABASE_REPLICA_URLS"] = json.dumps([f"sqlite:///{replica_path}"])
+    # 只在启动时同步一次，之后手动同步
+    os.environ["DB_REPLICA_SYNC_INTERVAL"] = "3600"
+    seed_database(users=10, companies=100)
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+    from config.settings import settings
+    from database import database
+    from database.replica import sync_sqlite_replicas
+    from main import app
+
+    primary = database.async_engine.sync_engine if args.async_mode else database.engine
+    replica = database.async_replica_engines[0].sync_engine if args.async_mode else database.replica_engines[0]
+    engines = {"primary": primary, "replica": replica}
+    headers = auth_headers("user0")
+    failures = 0
+
+    def check(label: str, ok: bool, detail: str = "") -> None:
+        nonlocal failures
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label:<52} {detail}")
+
+    with TestClient(app) as client:
+        # 预热认证主体缓存，使鉴权查询不计入统计
+        client.get("/api/user/me", headers=headers)
+
+        with engine_statements(engines) as counts:
+            response = client.get("/api/company/", params={"limit": 20}, headers=headers)
+        check("GET /api/company/ 使用副本", response.status_code == 200 and counts["replica"] > 0 and counts["primary"] == 0, str(counts))
+
+        with engine_statements(engines) as counts:
+            response = client.post("/api/company/batch", json={"ids": [1, 2, 3]}, headers=headers)
+        check("POST /api/company/batch（只读）使用副本", response.status_code == 200 and counts["primary"] == 0, str(counts))
+
+        # 写请求：主库，并下发粘滞Cookie（TestClient 会保存并在之后的请求中携带）
+        with engine_statements(engines) as counts:
+            response = client.post("/api/company/", json={"company_name": "replica-check", "user_id": 1}, headers=headers)
+        created = response.json()
+        company_id = (created.get("data") or created).get("id")
+        check("POST /api/company/ 使用主库", response.status_code < 400 and counts["replica"] == 0, str(counts))
+        check("写入后下发粘滞Cookie", settings.DB_REPLICA_STICKY_COOKIE in response.cookies)
+
+        with engine_statements(engines) as counts:
+            response = client.get(f"/api/company/{company_id}", headers=headers)
+        check("写入后同一客户端读到新数据（主库）", response.status_code == 200 and counts["replica"] == 0, str(counts))
+
+        # 不带粘滞Cookie的另一个客户端（不进入上下文，避免再次执行启动阶段的副本同步）
+        other = TestClient(app)
+        response = other.get(f"/api/company/{company_id}", headers=headers)
+        check("其他客户端在同步前读副本（尚无新数据）", response.status_code == 404, str(response.status_code))
+        sync_sqlite_replicas()
+        response = other.get(f"/api/company/{company_id}", headers=headers)
+        check("同步后其他客户端读到新数据", response.status_code == 200, str(response.status_code))
+
+    try:
+        with database.replica_engines[0].begin() as conn:
+            conn.execute(text("DELETE FROM company_states"))
+        check("副本连接拒绝写入", False)
+    except Exception as e:
+        check("副本连接拒绝写入", "readonly" in str(e).lower(), type(e).__name__)
+
+    if failures:
+        print(f"\n{failures} 项检查未通过")
+        sys.exit(1)
+    print("\n全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+统一响应编码微基准
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.response_encoding --rows 5000 --repeat 20
+
+对比大批量公司状态列表的编码耗时：
+- pydantic: 先校验为 CompanyStateResponse 再 json.dumps 字典（原有做法）
+- encoder/json: 按类型缓存的编码函数 + 标准库json
+- encoder/orjson: 按类型缓存的编码函数 + orjson（已安装时）
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import prepare_environment
+
+
+def build_rows(count: int):
+    """构造已加载全部列的公司状态对象"""
+    from models.user import CompanyState
+
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    return [
+        CompanyState(
+            id=i,
+            company_name=f"company-{i:08d}",
+            company_code=f"C{i:08d}",
+            company_phone="010-12345678",
+            warranty_year=2020 + i % 6,
+            eps_account=f"eps-{i}",
+            eps_password="secret",
+            bank_name=f"bank-{i % 50}",
+            bank_account=f"{i:016d}",
+            framework_contract_expire=now + timedelta(days=i % 365),
+            material_info={"code": f"M{i % 1000:04d}", "quantity": i % 500, "items": [1, 2, 3]},
+            user_id=1 + i % 10,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    """多次执行取最小耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="统一响应编码微基准")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    prepare_environment()
+
+    import core.response as response
+    from schemas.company import CompanyStateResponse
+
+    rows = build_rows(args.rows)
+
+    def pydantic_path():
+        data = [CompanyStateResponse.model_validate(row).model_dump(mode="json") for row in rows]
+        body = {"code": 20000, "msg": "成功", "data": data}
+        return json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode()
+
+    def stdlib_path():
+        body = json.dumps(rows, default=response._default, ensure_ascii=False, separators=(',', ':')).encode()
+        return b'{"code":20000,"msg":"\xe6\x88\x90\xe5\x8a\x9f","data":%s}' % body
+
+    cases = [("pydantic", pydantic_path), ("encoder/json", stdlib_path)]
+    if response.orjson is not None:
+        cases.append(("encoder/orjson", lambda: response.ResponseModel(data=rows).to_bytes()))
+
+    baseline = None
+    print(f"rows={args.rows}")
+    print(f"{'path':<16}{'ms':>10}{'speedup':>10}{'bytes':>12}")
+    for name, fn in cases:
+        elapsed = timed(fn, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{name:<16}{elapsed:>10.2f}{baseline / elapsed:>9.1f}x{len(fn()):>12}")
+
+
+if __name__ == "__main__":
+    main()
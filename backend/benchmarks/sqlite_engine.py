@@ -0,0 +1,113 @@
+"""
+SQLite引擎配置并发读写对比
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.sqlite_engine --readers 8 --writers 4 --seconds 5
+
+分别使用原始默认引擎（仅 check_same_thread=False）与按 Settings 调优后的引擎，
+在各自的临时数据库上以多线程并发读写，统计吞吐与 "database is locked" 错误数
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks.common import prepare_environment
+
+
+def build_engines(db_dir: str):
+    """创建待对比的两个引擎：原始默认配置 / 调优配置"""
+    from sqlalchemy import create_engine
+    from database.database import create_db_engine
+
+    default_url = f"sqlite:///{os.path.join(db_dir, 'default.db')}"
+    tuned_url = f"sqlite:///{os.path.join(db_dir, 'tuned.db')}"
+    return {
+        "default": create_engine(default_url, connect_args={"check_same_thread": False}),
+        "tuned": create_db_engine(tuned_url),
+    }
+
+
+def run_profile(engine, args) -> dict:
+    """在单个引擎上执行并发读写"""
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from database.database import Base
+    from models.user import User, CompanyState
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"username": "bench", "email": "bench@bench.local", "hashed_password": "x"}])
+        conn.execute(CompanyState.__table__.insert(), [
+            {"company_name": f"company-{i}", "user_id": 1, "bank_name": "bank"} for i in range(args.rows)
+        ])
+
+    stats = {"reads": 0, "writes": 0, "locked": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def record(key):
+        with lock:
+            stats[key] += 1
+
+    def reader():
+        while time.perf_counter() < deadline:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        text("SELECT * FROM company_states WHERE id = :id"),
+                        {"id": random.randint(1, args.rows)},
+                    ).fetchall()
+                record("reads")
+            except OperationalError as exc:
+                record("locked" if "locked" in str(exc) else "errors")
+
+    def writer():
+        while time.perf_counter() < deadline:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text("UPDATE company_states SET warranty_year = :y WHERE id = :id"),
+                        {"y": random.randint(2000, 2030), "id": random.randint(1, args.rows)},
+                    )
+                record("writes")
+            except OperationalError as exc:
+                record("locked" if "locked" in str(exc) else "errors")
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    stats["reads_per_sec"] = stats["reads"] / elapsed
+    stats["writes_per_sec"] = stats["writes"] / elapsed
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite引擎配置并发读写对比")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="yg-bench-")
+    prepare_environment(os.path.join(db_dir, "unused.db"))
+
+    print(f"{'profile':<10}{'reads/s':>12}{'writes/s':>12}{'locked':>10}{'errors':>10}")
+    for name, engine in build_engines(db_dir).items():
+        r = run_profile(engine, args)
+        print(f"{name:<10}{r['reads_per_sec']:>12.1f}{r['writes_per_sec']:>12.1f}{r['locked']:>10}{r['errors']:>10}")
+
+
+if __name__ == "__main__":
+    main()
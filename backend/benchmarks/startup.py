@@ -0,0 +1,106 @@
+"""
+冷启动耗时：从启动服务进程到返回第一个请求
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.startup --companies 100000 --runs 5
+
+在临时数据库中写入测试数据后，多次以 uvicorn 启动服务进程，记录 /health 与 /api/company/1 首次返回的时间；
+同时在独立进程中分别测量 import main 与启动阶段（lifespan）各自的耗时，取中位数
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.common import BACKEND_DIR, prepare_environment, seed_database
+
+# 子进程：分别测量导入与启动阶段
+PHASES_SCRIPT = """
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def lifespan():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(lifespan())
+print(json.dumps({"import_ms": (imported - started) * 1000, "lifespan_ms": (ready - imported) * 1000}))
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, started: float, timeout: float = 60.0) -> float:
+    """轮询直到URL返回200，返回自 started 起的毫秒数"""
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return (time.perf_counter() - started) * 1000
+        except OSError:
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(url)
+
+
+def serve_once(env) -> dict:
+    """启动一次 uvicorn，返回首个 /health 与首个数据接口的耗时"""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        health_ms = wait_for(f"http://127.0.0.1:{port}/health", started)
+        data_ms = wait_for(f"http://127.0.0.1:{port}/api/company/1", started)
+    finally:
+        process.terminate()
+        process.wait()
+    return {"health_ms": health_ms, "data_ms": data_ms}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="冷启动耗时")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--companies", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    prepare_environment(DEBUG="false")
+    seed_database(users=args.users, companies=args.companies)
+    env = os.environ.copy()
+
+    # 首次启动可能需要完成迁移/回填，单独记录，不计入中位数
+    first = serve_once(env)
+    phases, serves = [], []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PHASES_SCRIPT], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        phases.append(json.loads(output.strip().splitlines()[-1]))
+        serves.append(serve_once(env))
+
+    median = lambda rows, key: statistics.median(row[key] for row in rows)
+    print(f"首次启动: /health {first['health_ms']:.0f}ms, /api/company/1 {first['data_ms']:.0f}ms")
+    print(f"import main:         {median(phases, 'import_ms'):>8.0f}ms")
+    print(f"启动阶段(lifespan):  {median(phases, 'lifespan_ms'):>8.0f}ms")
+    print(f"启动到 /health:      {median(serves, 'health_ms'):>8.0f}ms")
+    print(f"启动到首个数据请求:  {median(serves, 'data_ms'):>8.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+全部API路由的进程内压测
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.suite --users 100 --companies 10000 --requests 300 --concurrency 16 --output results.json
+    python -m benchmarks.suite --compare results.json --threshold 0.15
+    python -m benchmarks.suite --only "company|health" --async-mode
+
+在临时数据库中写入指定数量的用户与公司状态后，通过ASGI客户端以固定并发逐个压测每个接口，
+输出每个接口的吞吐与 p50/p95/p99 延迟；--output 保存JSON结果，--compare 与保存的基线对比，
+吞吐下降或 p95 上升超过阈值的接口标记为退化并以非零状态码退出。
+写入类接口（创建/更新）在读取类接口之后执行，删除类接口最后执行，避免影响其他接口的数据
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks.common import prepare_environment, seed_database, auth_headers, run_load, is_error_response
+
+PASSWORD = "bench-password"
+
+
+class Scenario(NamedTuple):
+    """一个被压测的接口"""
+    name: str
+    method: str
+    url: Callable[[int], str]
+    # 第 i 个请求的额外参数（json / data / files / params）
+    kwargs: Optional[Callable[[int], Dict[str, Any]]] = None
+    auth: bool = True
+    # 请求数相对 --requests 的比例（登录、导入导出等重量级接口减少请求数）
+    weight: float = 1.0
+
+
+def build_scenarios(args) -> List[Scenario]:
+    """按执行顺序列出所有接口：只读 -> 写入 -> 删除"""
+    users, companies = args.users, args.companies
+    # 读取接口只访问前半部分数据，删除接口从末尾开始删除
+    company_id = lambda i: 1 + i % max(1, companies // 2)
+    user_id = lambda i: 1 + i % max(1, users // 2)
+    run = int(time.time())
+
+    def import_file(i):
+        body = "\n".join(
+            json.dumps({"company_name": f"import-{run}-{i}-{n}", "user_id": 1 + n % users}) for n in range(100)
+        )
+        return {"files": {"file": ("companies.ndjson", body.encode())}}
+
+    return [
+        Scenario("health", "GET", lambda i: "/health", auth=False),
+        Scenario("metrics", "GET", lambda i: "/metrics", auth=False, weight=0.2),
+        # 用户认证
+        Scenario("user.login", "POST", lambda i: "/api/user/login", auth=False, weight=0.2,
+                 kwargs=lambda i: {"data": {"username": f"user{i % users}", "password": PASSWORD}}),
+        Scenario("user.me", "GET", lambda i: "/api/user/me"),
+        Scenario("user.info", "POST", lambda i: "/api/user/info"),
+        Scenario("user.logout", "POST", lambda i: "/api/user/logout"),
+        # 用户管理
+        Scenario("users.list", "GET", lambda i: "/api/users/", kwargs=lambda i: {"params": {"limit": 100}}),
+        Scenario("users.page", "GET", lambda i: "/api/users/page", kwargs=lambda i: {"params": {"limit": 100}}),
+        Scenario("users.with_companies", "GET", lambda i: "/api/users/with-companies", kwargs=lambda i: {"params": {"limit": 20}}),
+        Scenario("users.export", "GET", lambda i: "/api/users/export", weight=0.05),
+        Scenario("users.get", "GET", lambda i: f"/api/users/{user_id(i)}"),
+        # 公司状态
+        Scenario("company.list", "GET", lambda i: "/api/company/", kwargs=lambda i: {"params": {"limit": 100}}),
+        Scenario("company.page", "GET", lambda i: "/api/company/page", kwargs=lambda i: {"params": {"limit": 100}}),
+        Scenario("company.user_page", "GET", lambda i: f"/api/company/user/{user_id(i)}/page", kwargs=lambda i: {"params": {"limit": 100}}),
+        Scenario("company.search", "GET", lambda i: "/api/company/search", kwargs=lambda i: {"params": {"q": f"{i % 1000:04d}"}}),
+        Scenario("company.material", "GET", lambda i: "/api/company/material", kwargs=lambda i: {"params": {"code": f"M{i % 1000:04d}"}}),
+        Scenario("company.material_paths", "GET", lambda i: "/api/company/material/paths"),
+        Scenario("company.export", "GET", lambda i: "/api/company/export", weight=0.05),
+        Scenario("company.get", "GET", lambda i: f"/api/company/{company_id(i)}"),
+        Scenario("company.by_name", "GET", lambda i: f"/api/company/name/company-{company_id(i) - 1:08d}"),
+        Scenario("company.by_user", "GET", lambda i: f"/api/company/user/{user_id(i)}"),
+        Scenario("company.info", "GET", lambda i: f"/api/company/info/{company_id(i)}"),
+        Scenario("company.user_info", "GET", lambda i: f"/api/company/user-info/{user_id(i)}"),
+        Scenario("company.batch", "POST", lambda i: "/api/company/batch",
+                 kwargs=lambda i: {"json": {"ids": [company_id(i + n) for n in range(50)]}}),
+        # 系统管理
+        Scenario("admin.principal_cache", "GET", lambda i: "/api/admin/principal-cache"),
+        Scenario("admin.password_hash", "GET", lambda i: "/api/admin/password-hash"),
+        Scenario("admin.admission", "GET", lambda i: "/api/admin/admission"),
+        # 写入
+        Scenario("user.register", "POST", lambda i: "/api/user/register", auth=False, weight=0.2,
+                 kwargs=lambda i: {"json": {"username": f"reg-{run}-{i}", "email": f"reg-{run}-{i}@bench.local", "password": PASSWORD}}),
+        Scenario("user.profile", "PUT", lambda i: "/api/user/profile", kwargs=lambda i: {"json": {"job": f"job-{i}"}}),
+        Scenario("users.create", "POST", lambda i: "/api/users/", weight=0.2,
+                 kwargs=lambda i: {"json": {"username": f"new-{run}-{i}", "email": f"new-{run}-{i}@bench.local", "password": PASSWORD}}),
+        Scenario("users.update", "PUT", lambda i: f"/api/users/{user_id(i)}", kwargs=lambda i: {"json": {"full_name": f"Bench {i}"}}),
+        Scenario("company.create_rest", "POST", lambda i: "/api/company/",
+                 kwargs=lambda i: {"json": {"company_name": f"rest-{run}-{i}", "user_id": user_id(i)}}),
+        Scenario("company.create", "POST", lambda i: "/api/company/create",
+                 kwargs=lambda i: {"json": {"company_name": f"create-{run}-{i}", "user_id": user_id(i)}}),
+        Scenario("company.import", "POST", lambda i: "/api/company/import", weight=0.1, kwargs=import_file),
+        Scenario("company.update_rest", "PUT", lambda i: f"/api/company/{company_id(i)}", kwargs=lambda i: {"json": {"bank_name": f"bank-{i}"}}),
+        Scenario("company.update", "PUT", lambda i: f"/api/company/update/{company_id(i)}", kwargs=lambda i: {"json": {"bank_name": f"bank-{i}"}}),
+        # 删除（从末尾的数据开始）
+        Scenario("company.delete", "DELETE", lambda i: f"/api/company/{companies - i}"),
+        Scenario("users.delete", "DELETE", lambda i: f"/api/users/{users - i}", weight=0.1),
+    ]
+
+
+async def run_suite(args) -> Dict[str, Dict[str, float]]:
+    """依次压测选中的接口（与真实服务一致，全部接口在同一个事件循环中执行）"""
+    import main
+
+    headers = auth_headers()
+    pattern = re.compile(args.only) if args.only else None
+    results: Dict[str, Dict[str, float]] = {}
+
+    print(f"{'接口':<28}{'请求数':>8}{'req/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'errors':>8}")
+    for scenario in build_scenarios(args):
+        if pattern and not pattern.search(scenario.name):
+            continue
+        total = max(1, int(args.requests * scenario.weight))
+        if scenario.method == "DELETE":
+            # 删除接口不能超过可删除的数据量（保留前半部分供其他接口使用）
+            limit = (args.users if scenario.name.startswith("users") else args.companies) // 2 - 1
+            total = max(1, min(total, limit))
+
+        async def make_request(client, i, scenario=scenario):
+            kwargs = scenario.kwargs(i) if scenario.kwargs else {}
+            if scenario.auth:
+                kwargs["headers"] = headers
+            return await client.request(scenario.method, scenario.url(i), **kwargs)
+
+        result = await run_load(main.app, make_request, total, args.concurrency, is_error=is_error_response)
+        results[scenario.name] = result
+        print(f"{scenario.name:<28}{total:>8}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['errors']:>8}")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """与基线对比，返回退化的接口名"""
+    regressions = []
+    print(f"\n{'接口':<28}{'基线req/s':>12}{'当前req/s':>12}{'变化':>9}{'基线p95':>10}{'当前p95':>10}{'变化':>9}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<28}{'（基线中无此接口）':>12}")
+            continue
+        rps_change = current["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        p95_change = current["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        regressed = rps_change < -threshold or p95_change > threshold or current["errors"] > base["errors"]
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<28}{base['rps']:>12.1f}{current['rps']:>12.1f}{rps_change:>+9.1%}"
+              f"{base['p95_ms']:>10.2f}{current['p95_ms']:>10.2f}{p95_change:>+9.1%}{'  退化' if regressed else ''}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="全部API路由的进程内压测")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--companies", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=300, help="每个接口的请求数（重量级接口按比例减少）")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--only", help="只压测名称匹配该正则的接口，如 company|health")
+    parser.add_argument("--async-mode", action="store_true", help="使用异步数据库模式")
+    parser.add_argument("--output", help="结果保存为JSON文件")
+    parser.add_argument("--compare", help="与之前保存的JSON结果对比")
+    parser.add_argument("--threshold", type=float, default=0.15, help="判定退化的相对变化阈值")
+    args = parser.parse_args()
+
+    prepare_environment(DB_ASYNC_MODE="true" if args.async_mode else "false")
+    seed_database(users=args.users, companies=args.companies, password=PASSWORD)
+
+    results = asyncio.run(run_suite(args))
+
+    if args.output:
+        report = {
+            "meta": {
+                "users": args.users,
+                "companies": args.companies,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "async_mode": args.async_mode,
+                "python": platform.python_version(),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到 {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} 个接口退化（阈值 {args.threshold:.0%}）: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n未发现退化")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+令牌吊销检查与 verify_token 开销
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.token_revocation --entries 100000 --checks 100000
+
+检查：登出后同一令牌访问 /api/user/me 返回401、其他令牌不受影响；verify_token 的判断不访问文件；
+应用关闭后吊销记录已写入文件，重新加载名单文件后吊销仍然有效；过期的吊销记录在后台维护时从内存中丢弃、压缩后从文件中删除。然后比较空名单与 --entries 条吊销记录时 verify_token 的耗时。
+不满足时以非零状态码退出
+"""
+
+import argparse
+import builtins
+import os
+import sys
+import time
+from unittest import mock
+
+from benchmarks.common import prepare_environment, seed_database, auth_headers
+
+
+def time_verify(tokens, verify_token) -> float:
+    """每次 verify_token 的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for token in tokens:
+        verify_token(token)
+    return (time.perf_counter() - start) / len(tokens) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="令牌吊销检查与 verify_token 开销")
+    parser.add_argument("--entries", type=int, default=100000, help="压测时吊销名单中的记录数")
+    parser.add_argument("--checks", type=int, default=100000, help="verify_token 调用次数")
+    args = parser.parse_args()
+
+    db_path = prepare_environment(ADMISSION_CONTROL_ENABLED="false")
+    seed_database(users=3, companies=0)
+
+    from fastapi.testclient import TestClient
+    from config.settings import settings
+    from core.revocation import TokenDenylist, token_denylist
+    from core.security import create_access_token, verify_token
+    from main import app
+
+    failures = 0
+
+    def check(label: str, ok: bool, detail: str = "") -> None:
+        nonlocal failures
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label:<44} {detail}")
+
+    def new_denylist(path: str) -> TokenDenylist:
+        return TokenDenylist(path, settings.TOKEN_DENYLIST_BUCKET_SECONDS, settings.TOKEN_DENYLIST_BLOOM_BITS, 0)
+
+    headers = auth_headers("user1")
+    other_headers = auth_headers("user1")
+    with TestClient(app) as client:
+        check("登出前令牌有效", client.get("/api/user/me", headers=headers).status_code == 200)
+        response = client.post("/api/user/logout", headers=headers)
+        check("登出成功", response.status_code == 200 and response.json()["code"] == 20000)
+        status_code = client.get("/api/user/me", headers=headers).status_code
+        check("登出后令牌返回401", status_code == 401, str(status_code))
+        status_code = client.get("/api/user/me", headers=other_headers).status_code
+        check("同一用户的其他令牌不受影响", status_code == 200, str(status_code))
+        check("未携带令牌登出同样成功", client.post("/api/user/logout").status_code == 200)
+
+        # 请求路径上的吊销判断只访问内存：文件操作一律报错
+        def no_io(*args, **kwargs):
+            raise AssertionError("verify_token 访问了文件")
+        with mock.patch.object(builtins, "open", no_io), mock.patch.object(os, "stat", no_io):
+            try:
+                ok = verify_token(headers["Authorization"].split()[1]) is None and verify_token(
+                    other_headers["Authorization"].split()[1]) is not None
+            except AssertionError:
+                ok = False
+        check("verify_token 不访问文件", ok)
+
+    # 重启：新实例从文件加载
+    token = headers["Authorization"].split()[1]
+    jti = verify_token(other_headers["Authorization"].split()[1])["jti"]
+    revoked = [line.split() for line in open(settings.TOKEN_DENYLIST_FILE, encoding="utf-8")]
+    reloaded = new_denylist(settings.TOKEN_DENYLIST_FILE)
+    check("重新加载后吊销仍然有效", len(revoked) == 1 and reloaded.is_revoked(revoked[0][0], float(revoked[0][1])),
+          str(reloaded.stats()["entries"]))
+    check("重新加载后未吊销的令牌有效", not reloaded.is_revoked(jti, float(revoked[0][1])))
+    check("吊销的令牌不通过 verify_token", verify_token(token) is None)
+
+    # 过期：1秒一个分桶，等待记录过期后从内存与文件中删除
+    expire_path = os.path.join(os.path.dirname(db_path), "expire.log")
+    denylist = TokenDenylist(expire_path, 1, settings.TOKEN_DENYLIST_BLOOM_BITS, 0)
+    now = time.time()
+    denylist.revoke("expired", now - 5)
+    denylist.revoke("short", now + 1)
+    denylist.revoke("long", now + 3600)
+    check("已过期的令牌不写入名单", denylist.stats()["entries"] == 2, str(denylist.stats()["entries"]))
+    time.sleep(2.1)
+    denylist.maintain()
+    check("过期的分桶被丢弃", denylist.stats()["entries"] == 1 and denylist.is_revoked("long", now + 3600),
+          str(denylist.stats()["entries"]))
+    denylist.compact()
+    lines = open(expire_path, encoding="utf-8").read().split()
+    check("压缩后文件只保留有效记录", "short" not in lines and "long" in lines, str(lines))
+
+    # verify_token 耗时：空名单 vs 大名单（被检查的令牌均未吊销）
+    tokens = [create_access_token({"sub": f"user{i % 3}"}) for i in range(1000)]
+    tokens = (tokens * (args.checks // len(tokens) + 1))[:args.checks]
+    empty_us = time_verify(tokens, verify_token)
+    lifetime = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    now = time.time()
+    with token_denylist._lock:
+        for i in range(args.entries):
+            token_denylist._add(f"bench-{i}", now + 60 + i % lifetime)
+    full_us = time_verify(tokens, verify_token)
+    stats = token_denylist.stats()
+    print(f"\nverify_token: 空名单 {empty_us:.1f}us，{stats['entries']} 条吊销记录 {full_us:.1f}us"
+          f"（布隆过滤器误判 {stats['bloom_hits']}/{stats['checks']}）")
+    check("大名单下 verify_token 耗时增加不超过50%", full_us <= empty_us * 1.5, f"{full_us / empty_us:.2f}x")
+
+    if failures:
+        print(f"\n{failures} 项检查未通过")
+        sys.exit(1)
+    print("\n全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
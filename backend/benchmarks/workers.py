@@ -0,0 +1,139 @@
+"""
+多进程服务：吞吐随工作进程数的变化
+
+用法（在 backend 目录下执行）：
+    python -m benchmarks.workers --workers 1,2,4 --clients 4 --concurrency 16 --seconds 10
+
+在临时数据库中写入测试数据后，依次以不同的工作进程数启动 run.py（真实TCP端口），
+由多个独立的压测进程（避免压测端自身成为瓶颈）持续请求单条读取与分页接口，输出吞吐与延迟；
+吞吐的提升上限取决于本机CPU核数（压测进程同样占用CPU）
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.common import BACKEND_DIR, prepare_environment, seed_database, auth_headers, percentile
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(url)
+
+
+def client_process(base_url: str, headers, companies: int, concurrency: int, seconds: float, queue) -> None:
+    """压测进程：以固定并发持续请求，结束后返回请求数、错误数与延迟样本"""
+    import httpx
+
+    async def run():
+        latencies, errors = [], 0
+        deadline = time.perf_counter() + seconds
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+            async def worker(n):
+                nonlocal errors
+                i = n
+                while time.perf_counter() < deadline:
+                    if i % 4 == 0:
+                        request = client.get("/api/company/page", params={"limit": 50})
+                    else:
+                        request = client.get(f"/api/company/{1 + i * 7919 % companies}")
+                    start = time.perf_counter()
+                    try:
+                        response = await request
+                        if response.status_code >= 400:
+                            errors += 1
+                    except httpx.HTTPError:
+                        errors += 1
+                    latencies.append(time.perf_counter() - start)
+                    i += concurrency
+
+            await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        return latencies, errors
+
+    queue.put(asyncio.run(run()))
+
+
+def measure(workers: int, args, env, headers) -> dict:
+    """以指定工作进程数启动服务并压测"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "run.py", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(base_url + "/health")
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        clients = [
+            context.Process(target=client_process,
+                            args=(base_url, headers, args.companies, args.concurrency, args.seconds, queue))
+            for _ in range(args.clients)
+        ]
+        for process in clients:
+            process.start()
+        results = [queue.get() for _ in clients]
+        for process in clients:
+            process.join()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    latencies = [value for samples, _ in results for value in samples]
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "rps": len(latencies) / args.seconds,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="吞吐随工作进程数的变化")
+    parser.add_argument("--workers", default="1,2,4", help="逗号分隔的工作进程数")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--companies", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=4, help="压测进程数")
+    parser.add_argument("--concurrency", type=int, default=16, help="每个压测进程的并发数")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    # 关闭准入控制与请求数回收，只比较进程数本身的影响
+    prepare_environment(DEBUG="false", ADMISSION_CONTROL_ENABLED="false", WEB_MAX_REQUESTS="0")
+    seed_database(users=args.users, companies=args.companies)
+    env = os.environ.copy()
+    headers = auth_headers()
+
+    print(f"CPU核数: {os.cpu_count()}")
+    print(f"{'工作进程':>8}{'请求数':>10}{'req/s':>10}{'加速比':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'errors':>8}")
+    baseline = None
+    for workers in [int(value) for value in args.workers.split(",")]:
+        result = measure(workers, args, env, headers)
+        baseline = baseline or result["rps"]
+        print(f"{workers:>8}{result['requests']:>10}{result['rps']:>10.1f}{result['rps'] / baseline:>8.2f}"
+              f"{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,140 @@ import os
 class Settings(BaseSettings):
     # 数据库配置
     DATABASE_URL: str = "sqlite:///./app.db"
+    # 异步数据库模式：开启后路由通过 AsyncSession + 异步驱动访问数据库，不再占用线程池
+    DB_ASYNC_MODE: bool = False
+    # 异步数据库连接地址，留空时根据 DATABASE_URL 自动推导（如 sqlite -> sqlite+aiosqlite）
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # 只读副本连接地址：只读请求（GET/HEAD 等）使用副本，写请求以及写入后 DB_REPLICA_STICKY_SECONDS 秒内
+    # 同一客户端（粘滞Cookie）的读取使用主库；异步模式下的副本地址由同步地址推导
+    DATABASE_REPLICA_URLS: list = []
+    DB_REPLICA_STICKY_SECONDS: float = 5.0
+    DB_REPLICA_STICKY_COOKIE: str = "yg_read_primary"
+    # SQLite本地测试：每隔该秒数把主库文件复制到各副本文件（模拟复制延迟），0 表示不同步（副本由数据库自身复制维护）
+    DB_REPLICA_SYNC_INTERVAL: float = 0.0
+    # 启动时数据库结构版本落后则自动执行迁移（关闭后需先手动执行 alembic upgrade head，否则拒绝启动）
+    DB_AUTO_MIGRATE: bool = True
+    
+    # 连接池配置（内存SQLite使用单连接池，不受这些参数影响）
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    
+    # SQLite连接参数，每个新连接建立时通过 PRAGMA 设置
+    SQLITE_TUNING_ENABLED: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE: int = -65536  # 负数表示KiB，即64MB页缓存
+    SQLITE_MMAP_SIZE: int = 268435456  # 256MB
     
     # JWT配置
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # 公司状态读缓存（按ID、公司名称、用户ID读取时使用，写入后精确失效；进程内后端在多进程服务中停用）
+    COMPANY_CACHE_ENABLED: bool = True
+    COMPANY_CACHE_BACKEND: str = "memory"  # 缓存后端，见 core.cache.CACHE_BACKENDS
+    COMPANY_CACHE_MAX_SIZE: int = 50000  # 最多缓存的行数（按用户ID缓存的列表按行数计）
+    COMPANY_CACHE_TTL: int = 60  # 秒
+    
+    # 合同到期窗口定时扫描（结果供仪表盘使用）
+    CONTRACT_EXPIRY_SCAN_ENABLED: bool = True
+    CONTRACT_EXPIRY_WINDOW_DAYS: int = 30
+    CONTRACT_EXPIRY_SCAN_INTERVAL: float = 60.0  # 秒，每次只扫描新进入窗口的部分
+    CONTRACT_EXPIRY_FULL_SCAN_INTERVAL: float = 3600.0  # 秒，定期全量扫描窗口以纠正偏差
+    
+    # 令牌吊销：登出后令牌立即失效；吊销名单按过期时间分桶保存在内存中并追加写入本地文件，重启后重新加载
+    # 启用时拒绝没有 jti 的令牌（启用前签发的令牌需重新登录）
+    TOKEN_REVOCATION_ENABLED: bool = True
+    TOKEN_DENYLIST_FILE: str = "./revoked_tokens.log"
+    TOKEN_DENYLIST_BUCKET_SECONDS: int = 60
+    TOKEN_DENYLIST_BLOOM_BITS: int = 1 << 20  # 布隆过滤器位数（128KB），约10万条吊销记录时误判率约1%
+    TOKEN_DENYLIST_REFRESH_INTERVAL: float = 1.0  # 后台维护间隔（秒）：写入吊销记录、读取其他进程追加的记录、丢弃过期分桶
+    
+    # 认证主体缓存（按令牌 sub 缓存当前用户，减少鉴权查询；多进程服务中停用）
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 60  # 秒，同时不超过令牌过期时间
+    
+    # 密码哈希配置
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_PBKDF2_ITERATIONS: int = 100000
+    PASSWORD_HASH_WORKERS: int = 2  # 独立哈希进程数，0 表示改用线程池
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 2  # 同时执行的哈希任务上限
+    PASSWORD_HASH_QUEUE_SIZE: int = 64  # 等待执行的哈希任务上限，超出直接拒绝
+    PASSWORD_HASH_TIMEOUT: float = 10.0  # 排队与计算的总超时（秒）
+    
+    # 个人信息延迟写入：PUT /api/user/profile 的修改按用户合并，每隔 INTERVAL 秒或待写入用户数达到 MAX_PENDING 时批量写入
+    PROFILE_WRITE_BEHIND_ENABLED: bool = False
+    PROFILE_WRITE_BEHIND_INTERVAL: float = 0.5
+    PROFILE_WRITE_BEHIND_MAX_PENDING: int = 100
+    
+    # 公司状态批量导入
+    COMPANY_IMPORT_BATCH_SIZE: int = 1000  # 每个事务批量插入的行数
+    COMPANY_IMPORT_MAX_BATCH_SIZE: int = 10000  # batch_size 参数上限
+    COMPANY_IMPORT_MAX_ERRORS: int = 1000  # 导入结果中最多返回的行错误数
+    
+    # 公司检索：SQLite下使用FTS5全文索引（关闭时退化为LIKE查询）
+    COMPANY_SEARCH_FTS_ENABLED: bool = True
+    
+    # material_info 中建立表达式索引、允许过滤的JSON路径及取值类型（text / number），
+    # 环境变量中以JSON配置，如 {"code": "text", "quantity": "number"}
+    MATERIAL_INFO_INDEXED_PATHS: dict = {"code": "text", "quantity": "number"}
+    
+    # 批量查询接口每类键（ID/名称/用户ID）的数量上限
+    BATCH_LOOKUP_MAX_KEYS: int = 1000
+    
+    # 流式导出每批从数据库游标读取的行数
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # 准入控制：各路由分组（登录注册 / 列表查询 / 写入 / 轻量读取）的并发上限、等待队列长度与排队超时（秒），
+    # 队列已满或排队超时返回503，Retry-After 为 ADMISSION_RETRY_AFTER 秒
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_RETRY_AFTER: float = 1.0
+    ADMISSION_AUTH_CONCURRENCY: int = 8
+    ADMISSION_AUTH_QUEUE_SIZE: int = 64
+    ADMISSION_AUTH_TIMEOUT: float = 5.0
+    ADMISSION_LIST_CONCURRENCY: int = 8
+    ADMISSION_LIST_QUEUE_SIZE: int = 32
+    ADMISSION_LIST_TIMEOUT: float = 5.0
+    ADMISSION_WRITE_CONCURRENCY: int = 16
+    ADMISSION_WRITE_QUEUE_SIZE: int = 64
+    ADMISSION_WRITE_TIMEOUT: float = 10.0
+    ADMISSION_READ_CONCURRENCY: int = 32
+    ADMISSION_READ_QUEUE_SIZE: int = 256
+    ADMISSION_READ_TIMEOUT: float = 2.0
+    
+    # 运行指标：/metrics 输出 Prometheus 文本格式的请求、SQL与连接池指标
+    METRICS_ENABLED: bool = True
+    
+    # 慢查询日志：超过阈值的SQL记录日志并按语句形态聚合，每种形态首次变慢时保存 EXPLAIN QUERY PLAN
+    SLOW_QUERY_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_LOG_PARAMETERS: bool = True  # 密码等参数按绑定名脱敏
+    SLOW_QUERY_MAX_SHAPES: int = 500  # 保留的语句形态上限，超出时淘汰累计耗时最少的
+    SLOW_QUERY_RECENT_SIZE: int = 200  # 保留的最近慢查询条数
+    
+    # JSON编码后端：auto（安装了orjson时使用orjson）、orjson、json
+    JSON_BACKEND: str = "auto"
+    
     # 应用配置
     DEBUG: bool = True
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     
+    # 多进程服务（python run.py --workers N，DEBUG=false 时默认启用）
+    WEB_WORKERS: int = 0  # 工作进程数，0 表示CPU核数
+    WEB_MAX_REQUESTS: int = 10000  # 工作进程处理该数量的请求后平滑退出并由新进程替换，0 表示不限制
+    WEB_MAX_REQUESTS_JITTER: int = 1000  # 请求上限的随机增量，避免所有工作进程同时重启
+    WEB_MAX_MEMORY_MB: int = 0  # 工作进程常驻内存上限（MB），超过后平滑退出，0 表示不限制
+    WEB_MEMORY_CHECK_INTERVAL: float = 5.0  # 内存检查间隔（秒）
+    WEB_GRACEFUL_TIMEOUT: int = 30  # 平滑退出时等待进行中请求的时间（秒），超时后强制结束
+    WEB_BACKLOG: int = 2048  # 监听队列长度
+    
     # CORS配置
     ALLOWED_ORIGINS: list = ["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:5173", "http://127.0.0.1:5173"]
     
@@ -26,4 +149,4 @@ class Settings(BaseSettings):
 
 
 # 全局配置实例
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,134 @@
+"""
+缓存后端
+CacheBackend 定义旁路缓存（cache-aside）使用的后端接口，值为可序列化的普通数据（dict/list），
+网络缓存（如Redis）实现同样的方法并注册到 CACHE_BACKENDS 即可通过配置切换。
+内置 MemoryCacheBackend：进程内 LRU + TTL，容量按条目权重（如列表的行数）计算；
+process_local 为True的后端只在当前进程内可见，多进程服务中会被停用（见 core.prefork）
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+class CacheBackend(ABC):
+    """缓存后端接口"""
+
+    # 是否只在当前进程内可见（写入后的失效无法通知其他进程）
+    process_local = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存值，不存在或已过期返回None"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float, weight: int = 1) -> None:
+        """写入缓存；weight 为条目占用的容量（如列表的行数）"""
+
+    @abstractmethod
+    def delete(self, keys: Iterable[str]) -> int:
+        """删除指定键，返回实际删除的条目数"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """清空缓存"""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """命中、淘汰等统计"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """线程安全的进程内 LRU + TTL 缓存"""
+
+    process_local = True
+
+    def __init__(self, max_size: int, **options):
+        self.max_size = max_size
+        # 键 -> (值, 过期时间, 权重)
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, weight = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self._weight -= weight
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any, ttl: float, weight: int = 1) -> None:
+        weight = max(1, weight)
+        if weight > self.max_size:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._weight -= old[2]
+            self._entries[key] = (value, time.monotonic() + ttl, weight)
+            self._weight += weight
+            while self._weight > self.max_size:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._weight -= evicted
+                self.evictions += 1
+
+    def delete(self, keys: Iterable[str]) -> int:
+        deleted = 0
+        with self._lock:
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._weight -= entry[2]
+                    deleted += 1
+            self.invalidations += deleted
+        return deleted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self._entries),
+                "weight": self._weight,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# 后端名称 -> 构造函数（参数：max_size 及其他配置项）
+CACHE_BACKENDS: Dict[str, Callable[..., CacheBackend]] = {
+    "memory": MemoryCacheBackend,
+}
+
+
+def create_cache_backend(name: str, **options) -> CacheBackend:
+    """按名称创建缓存后端"""
+    factory = CACHE_BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"未知的缓存后端: {name}（可选: {', '.join(CACHE_BACKENDS)}）")
+    return factory(**options)
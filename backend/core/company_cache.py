@@ -0,0 +1,136 @@
+"""
+公司状态读缓存（cache-aside）
+按ID、公司名称、用户ID读取公司状态时先查缓存，未命中再查询数据库并回填：
+- 键为 company:id:<ID>、company:name:<名称>、company:user:<用户ID>，值为行数据（列名 -> 值）的列表
+- 单条查询只缓存查到的结果；按用户ID查询的空列表同样缓存（新建时会使该用户的键失效）
+- crud.company 中新建、修改、删除、导入以及删除用户后，按涉及的ID、名称（修改前后）、用户ID（修改前后）精确失效
+- 后端由 COMPANY_CACHE_BACKEND 选择（见 core.cache），默认进程内 LRU + TTL；失效只作用于当前进程，
+  因此多进程服务（core.prefork）中进程内后端会被停用，需要缓存时改用进程间共享的后端
+- 配置只读副本时，失效后 DB_REPLICA_STICKY_SECONDS 秒内不使用副本上读到的数据回填（副本可能尚未同步该次写入）
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config.settings import settings
+from core.cache import CacheBackend, create_cache_backend
+from core.fieldsets import column_keys
+from core.metrics import register_collector
+from database.database import replica_engines, use_replica
+from models.user import CompanyState
+
+COMPANY_COLUMNS = column_keys(CompanyState)
+
+
+_new_company_state = CompanyState.__mapper__.class_manager.new_instance
+
+
+def company_row(obj: CompanyState) -> Dict[str, Any]:
+    """公司状态对象的全部列数据"""
+    loaded = obj.__dict__
+    return {key: loaded.get(key) for key in COMPANY_COLUMNS}
+
+
+def company_from_row(row: Dict[str, Any]) -> CompanyState:
+    """由列数据构造（不属于任何会话的）公司状态对象；直接写入属性字典，跳过构造函数的逐属性事件"""
+    obj = _new_company_state()
+    obj.__dict__.update(row)
+    return obj
+
+
+class CompanyStateCache:
+    """公司状态的旁路缓存"""
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float, replica_lag: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.replica_lag = replica_lag
+        self._lock = threading.Lock()
+        # 每次失效时递增；查询期间发生失效则不回填，避免写入旧数据
+        self.generation = 0
+        self._invalidated_at = float("-inf")
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get_or_load(self, key: str, loader: Callable[[], List[CompanyState]], cache_empty: bool) -> List[CompanyState]:
+        """
+        命中时返回由缓存数据构造的（不属于任何会话的）对象，未命中时调用 loader 查询完整的行并回填
+        cache_empty 为False时不缓存空结果
+        """
+        rows = self.backend.get(key)
+        if rows is not None:
+            return [company_from_row(row) for row in rows]
+        generation = self.generation
+        objs = loader()
+        if objs or cache_empty:
+            rows = [company_row(obj) for obj in objs]
+            with self._lock:
+                if generation == self.generation and not self._replica_may_lag():
+                    self.backend.set(key, rows, self.ttl, weight=len(rows))
+        return objs
+
+    def _replica_may_lag(self) -> bool:
+        """当前请求从副本读取，且距离上次失效不足副本同步时间"""
+        return bool(replica_engines) and use_replica.get() and \
+            time.monotonic() - self._invalidated_at < self.replica_lag
+
+    def invalidate(self, ids: Iterable[int] = (), names: Iterable[str] = (), user_ids: Iterable[int] = ()) -> None:
+        """使涉及的ID、公司名称、用户ID的缓存失效（在写入事务提交之后调用）"""
+        if self.backend is None:
+            return
+        keys = [
+            *[f"company:id:{value}" for value in ids],
+            *[f"company:name:{value}" for value in names],
+            *[f"company:user:{value}" for value in user_ids],
+        ]
+        with self._lock:
+            self.generation += 1
+            self._invalidated_at = time.monotonic()
+        self.backend.delete(keys)
+
+    def disable_process_local(self) -> bool:
+        """后端只在当前进程内可见时停用缓存（其他进程的写入无法使其失效），返回是否停用"""
+        if self.backend is None or not self.backend.process_local:
+            return False
+        self.backend = None
+        return True
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            with self._lock:
+                self.generation += 1
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        if self.backend is None:
+            return {"enabled": False}
+        return {"enabled": True, "ttl": self.ttl, **self.backend.stats()}
+
+
+def company_cache_metrics():
+    """公司状态缓存统计（供 /metrics 输出）"""
+    stats = company_cache.stats()
+    metrics = [
+        ("company_cache_hits_total", "counter", "公司状态缓存命中次数", "hits"),
+        ("company_cache_misses_total", "counter", "公司状态缓存未命中次数", "misses"),
+        ("company_cache_evictions_total", "counter", "超出容量被淘汰的条目数", "evictions"),
+        ("company_cache_expirations_total", "counter", "过期被删除的条目数", "expirations"),
+        ("company_cache_invalidations_total", "counter", "写入后失效的条目数", "invalidations"),
+        ("company_cache_entries", "gauge", "当前缓存条目数", "size"),
+    ]
+    return [(name, kind, help_text, [({}, stats[key])]) for name, kind, help_text, key in metrics if key in stats]
+
+
+# 全局实例
+company_cache = CompanyStateCache(
+    create_cache_backend(settings.COMPANY_CACHE_BACKEND, max_size=settings.COMPANY_CACHE_MAX_SIZE)
+    if settings.COMPANY_CACHE_ENABLED else None,
+    settings.COMPANY_CACHE_TTL,
+    settings.DB_REPLICA_STICKY_SECONDS,
+)
+
+if settings.COMPANY_CACHE_ENABLED:
+    register_collector(company_cache_metrics)
@@ -0,0 +1,101 @@
+"""
+条件请求（ETag / Last-Modified）
+根据行版本（id + updated_at，未更新过时取 created_at）生成校验值，
+客户端携带 If-None-Match / If-Modified-Since 且资源未变化时直接返回304，不再序列化响应体；
+列表接口使用弱ETag（基于本页所有行的版本），不返回 Last-Modified：行被删除或移出本页时
+最大修改时间不变，按 If-Modified-Since 判断会返回过期内容，列表只按ETag判断
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+
+
+def row_version(obj) -> tuple:
+    """行版本：(id, 最后修改时间)"""
+    return obj.id, obj.updated_at or obj.created_at
+
+
+def _as_utc(value: datetime) -> datetime:
+    """数据库中的时间为UTC（不带时区），统一转换为带时区的UTC时间"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _opaque(tag: str) -> str:
+    """去掉弱校验前缀，用于弱比较"""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+class Validators:
+    """一个响应的校验值（ETag、Last-Modified）"""
+
+    def __init__(self, etag: str, last_modified: Optional[datetime]):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """
+        请求的条件头是否表明客户端缓存仍然有效
+        同时存在时以 If-None-Match 为准（弱比较）；If-Modified-Since 按秒比较
+        """
+        if request.method not in ("GET", "HEAD"):
+            return False
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            return _opaque(self.etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+    def not_modified(self) -> Response:
+        """304响应（不含响应体）"""
+        return Response(status_code=304, headers=self.headers)
+
+    def apply(self, result: Any, response: Optional[Response] = None) -> Any:
+        """为路由返回值附加校验头：Response 对象直接设置，其他返回值通过注入的 response 设置"""
+        target = result if isinstance(result, Response) else response
+        if target is not None:
+            target.headers.update(self.headers)
+        return result
+
+
+def validators_for(objs: Iterable, weak: bool = False, variant: Any = None) -> Validators:
+    """
+    根据行版本生成校验值
+    weak 为True时生成弱ETag（列表，不带 Last-Modified）；variant 为影响响应内容的其他参数（如 fields、分页游标）
+    """
+    versions = []
+    last_modified = None
+    for obj in objs:
+        row_id, modified = row_version(obj)
+        versions.append((row_id, modified.isoformat() if modified else None))
+        if modified is not None:
+            modified = _as_utc(modified)
+            if last_modified is None or modified > last_modified:
+                last_modified = modified
+    digest = hashlib.blake2b(repr((variant, versions)).encode(), digest_size=12).hexdigest()
+    if weak:
+        return Validators(f'W/"{digest}"', None)
+    return Validators(f'"{digest}"', last_modified)
@@ -0,0 +1,159 @@
+"""
+合同到期窗口的定时扫描
+lifespan 中启动，每隔 CONTRACT_EXPIRY_SCAN_INTERVAL 秒维护一次“未来 CONTRACT_EXPIRY_WINDOW_DAYS 天内到期”的合同集合，
+结果快照供仪表盘读取（GET /api/dashboard/stats 的 contracts.upcoming）：
+- 增量扫描：窗口随时间后移，只查询上次窗口终点到新终点之间新进入窗口的合同（ix_company_states_contract_expire_id 范围扫描），
+  已过期的从集合中移除
+- crud.company 中新建、修改、删除公司状态后通过 touch 标记，下次扫描按ID重新读取这些行；无法确定ID的写入（批量导入）触发全量扫描
+- 每隔 CONTRACT_EXPIRY_FULL_SCAN_INTERVAL 秒全量扫描一次窗口，纠正其他进程或直接修改数据库造成的偏差
+集合只保存在当前进程中，多进程模式下各工作进程各自扫描
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+from config.settings import settings
+from models.user import CompanyState, utcnow
+
+logger = logging.getLogger("contract_expiry")
+
+# 快照中列出的最近到期合同数
+UPCOMING_TOP = 10
+
+companies = CompanyState.__table__.c
+SCAN_COLUMNS = (companies.id, companies.framework_contract_expire, companies.company_name, companies.user_id)
+
+
+class ContractExpiryMonitor:
+    """窗口内到期合同的增量扫描与快照"""
+
+    def __init__(self, window_days: int, interval: float, full_scan_interval: float):
+        self.window = timedelta(days=window_days)
+        self.interval = interval
+        self.full_scan_interval = full_scan_interval
+        # 公司状态ID -> (到期时间, 公司名称, 用户ID)
+        self._entries: Dict[int, Tuple[datetime, str, int]] = {}
+        self._scanned_until: Optional[datetime] = None
+        self._next_full_scan = 0.0
+        self._dirty: Set[int] = set()
+        self._dirty_all = False
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.snapshot: Optional[dict] = None
+        self.scans = 0
+        self.full_scans = 0
+        self.rows_scanned = 0
+
+    def touch(self, ids: Optional[Iterable[int]] = None) -> None:
+        """标记已修改的公司状态（ids 为None时下次全量扫描）；未启动定时扫描时忽略"""
+        if self._task is None:
+            return
+        with self._lock:
+            if ids is None:
+                self._dirty_all = True
+            else:
+                self._dirty.update(ids)
+
+    def scan(self, now: Optional[datetime] = None) -> dict:
+        """执行一次扫描（同步，在线程池中调用），返回新的快照"""
+        from database.database import engine
+
+        now = now or utcnow()
+        end = now + self.window
+        with self._scan_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+                full = self._dirty_all or self._scanned_until is None or time.monotonic() >= self._next_full_scan
+                self._dirty_all = False
+            expire = companies.framework_contract_expire
+            with engine.connect() as conn:
+                if full:
+                    rows = conn.execute(select(*SCAN_COLUMNS).where(expire >= now, expire < end)).all()
+                    self._entries = {}
+                    self._next_full_scan = time.monotonic() + self.full_scan_interval
+                    self.full_scans += 1
+                else:
+                    # 新进入窗口的部分
+                    rows = conn.execute(
+                        select(*SCAN_COLUMNS).where(expire >= max(self._scanned_until, now), expire < end)
+                    ).all()
+                    if dirty:
+                        for company_id in dirty:
+                            self._entries.pop(company_id, None)
+                        rows += conn.execute(select(*SCAN_COLUMNS).where(companies.id.in_(dirty))).all()
+            for company_id, expires_at, name, user_id in rows:
+                if expires_at is not None and now <= expires_at < end:
+                    self._entries[company_id] = (expires_at, name, user_id)
+            # 已过期的移出窗口
+            for company_id in [key for key, entry in self._entries.items() if entry[0] < now]:
+                del self._entries[company_id]
+            self._scanned_until = end
+            self.scans += 1
+            self.rows_scanned += len(rows)
+
+            upcoming = sorted(self._entries.items(), key=lambda item: (item[1][0], item[0]))[:UPCOMING_TOP]
+            self.snapshot = {
+                "window_start": now.isoformat(),
+                "window_end": end.isoformat(),
+                "total": len(self._entries),
+                "soonest": [
+                    {"id": company_id, "company_name": name, "user_id": user_id, "framework_contract_expire": expires_at.isoformat()}
+                    for company_id, (expires_at, name, user_id) in upcoming
+                ],
+                "full_scan": full,
+                "scanned_rows": len(rows),
+            }
+            return self.snapshot
+
+    async def scan_async(self) -> dict:
+        return await run_in_threadpool(self.scan)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.scan_async()
+            except Exception:
+                logger.exception("合同到期扫描失败")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """启动定时扫描（应用启动时调用）"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止定时扫描（应用关闭时调用）"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.CONTRACT_EXPIRY_SCAN_ENABLED,
+            "window_days": self.window.days,
+            "interval": self.interval,
+            "entries": len(self._entries),
+            "scans": self.scans,
+            "full_scans": self.full_scans,
+            "rows_scanned": self.rows_scanned,
+        }
+
+
+# 全局实例
+contract_expiry = ContractExpiryMonitor(
+    settings.CONTRACT_EXPIRY_WINDOW_DAYS,
+    settings.CONTRACT_EXPIRY_SCAN_INTERVAL,
+    settings.CONTRACT_EXPIRY_FULL_SCAN_INTERVAL,
+)
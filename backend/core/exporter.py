@@ -0,0 +1,81 @@
+"""
+流式导出
+从服务端游标分批读取查询结果，逐批编码为 NDJSON / CSV 输出，
+不构造ORM对象，内存占用与表大小无关；CSV 格式可直接用于批量导入接口
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from config.settings import settings
+from core.importer import CSV, NDJSON, FORMAT_ALIASES
+from core.response import dumps
+from database.database import stream_rows
+
+MEDIA_TYPES = {
+    NDJSON: "application/x-ndjson",
+    CSV: "text/csv; charset=utf-8",
+}
+
+
+def parse_export_format(fmt: Optional[str]) -> str:
+    """解析导出格式，默认NDJSON"""
+    resolved = FORMAT_ALIASES.get((fmt or NDJSON).strip().lower())
+    if resolved is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="不支持的导出格式，仅支持 ndjson / csv"
+        )
+    return resolved
+
+
+def _csv_value(value: Any) -> Any:
+    """CSV单元格取值：None为空，日期用ISO格式，字典/列表编码为JSON"""
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def encode_ndjson(rows: Sequence, columns: Sequence[str]) -> bytes:
+    """将一批行编码为NDJSON"""
+    return b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def encode_csv(rows: Sequence) -> bytes:
+    """将一批行编码为CSV（不含表头）"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def export_stream(statement, fmt: str, batch_size: int) -> AsyncIterator[bytes]:
+    """按批读取并编码查询结果"""
+    columns = list(statement.selected_columns.keys())
+    if fmt == CSV:
+        # 表头先行输出，客户端无需等待查询返回即可收到首字节（带BOM便于Excel识别UTF-8）
+        header = io.StringIO()
+        csv.writer(header).writerow(columns)
+        yield "﻿".encode() + header.getvalue().encode()
+    async for rows in stream_rows(statement, batch_size):
+        yield encode_csv(rows) if fmt == CSV else encode_ndjson(rows, columns)
+
+
+def export_response(statement, fmt: str, filename: str, batch_size: Optional[int] = None) -> StreamingResponse:
+    """构造流式导出响应"""
+    extension = "csv" if fmt == CSV else "ndjson"
+    return StreamingResponse(
+        export_stream(statement, fmt, batch_size or settings.EXPORT_BATCH_SIZE),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
@@ -0,0 +1,60 @@
+"""
+稀疏字段集
+解析 fields=a,b,c 查询参数，并转换为 SQLAlchemy 的列加载选项，
+使未请求的列既不从数据库读取，也不参与序列化
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session, load_only
+
+
+def column_keys(model) -> List[str]:
+    """模型的全部列属性名"""
+    return [attr.key for attr in sa_inspect(model).column_attrs]
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """
+    解析逗号分隔的字段列表
+    未传时返回None（表示完整字段），包含未知字段时返回400
+    """
+    if fields is None:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in set(allowed)]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的字段: {', '.join(unknown)}"
+        )
+    # 去重并保持顺序
+    return list(dict.fromkeys(requested))
+
+
+# 指定 fields 时也总会加载的版本列（用于生成 ETag / Last-Modified）
+VERSION_KEYS = ("created_at", "updated_at")
+
+
+def load_options(model, fields: Optional[Sequence[str]] = None) -> list:
+    """
+    生成列加载选项
+    fields为None时加载全部列（包括默认延迟加载的大字段），否则只加载指定列（主键与版本列总会加载）
+    """
+    if fields is None:
+        keys = column_keys(model)
+    else:
+        keys = list(dict.fromkeys([*fields, *[key for key in VERSION_KEYS if hasattr(model, key)]]))
+    return [load_only(*[getattr(model, key) for key in keys])]
+
+
+def refresh_full(db: Session, obj) -> None:
+    """刷新对象的全部列（Session.refresh 默认不会加载延迟列）"""
+    db.refresh(obj, column_keys(type(obj)))
+
+
+def project(obj, fields: Sequence[str]) -> Dict[str, Any]:
+    """按字段列表投影对象"""
+    return {key: getattr(obj, key) for key in fields}
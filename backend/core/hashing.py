@@ -0,0 +1,106 @@
+"""
+密码哈希执行器
+bcrypt/PBKDF2 属于CPU密集计算，放在独立的进程池中执行，避免登录高峰占满请求线程池；
+通过并发上限、排队上限与超时控制保护其他接口
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from config.settings import settings
+from core.security import get_password_hash, verify_and_update_password
+
+
+class PasswordHashBusyError(Exception):
+    """哈希任务排队已满或超时"""
+
+
+_executor: Optional[Executor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_waiting = 0
+
+
+def get_hash_executor() -> Optional[Executor]:
+    """获取哈希进程池（延迟创建），PASSWORD_HASH_WORKERS=0 时返回None（使用线程池）"""
+    global _executor
+    if _executor is None and settings.PASSWORD_HASH_WORKERS > 0:
+        # 使用spawn启动子进程，避免在多线程的服务进程中fork
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """获取并发控制信号量"""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(max(1, settings.PASSWORD_HASH_MAX_CONCURRENCY))
+    return _semaphore
+
+
+async def _submit(fn, *args):
+    """排队并执行哈希任务"""
+    global _waiting
+    if _waiting >= settings.PASSWORD_HASH_QUEUE_SIZE:
+        raise PasswordHashBusyError("密码哈希任务排队已满")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.PASSWORD_HASH_TIMEOUT
+    semaphore = _get_semaphore()
+
+    _waiting += 1
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=settings.PASSWORD_HASH_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise PasswordHashBusyError("密码哈希任务排队超时")
+    finally:
+        _waiting -= 1
+
+    try:
+        executor = get_hash_executor()
+        if executor is None:
+            task = run_in_threadpool(fn, *args)
+        else:
+            task = loop.run_in_executor(executor, fn, *args)
+        return await asyncio.wait_for(task, timeout=max(0.0, deadline - loop.time()))
+    except asyncio.TimeoutError:
+        raise PasswordHashBusyError("密码哈希任务执行超时")
+    finally:
+        semaphore.release()
+
+
+async def hash_password_async(password: str) -> str:
+    """异步计算密码哈希"""
+    return await _submit(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    异步验证密码
+    返回 (是否通过, 新哈希或None)，哈希参数变化时返回新哈希用于登录时透明升级
+    """
+    return await _submit(verify_and_update_password, plain_password, hashed_password)
+
+
+def get_hash_stats() -> dict:
+    """当前哈希队列状态"""
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "max_concurrency": settings.PASSWORD_HASH_MAX_CONCURRENCY,
+        "waiting": _waiting,
+    }
+
+
+def shutdown_hash_executor() -> None:
+    """关闭哈希进程池"""
+    global _executor, _semaphore
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    _semaphore = None
@@ -0,0 +1,135 @@
+"""
+批量导入解析
+逐行解析上传的 NDJSON / CSV 文件并用 pydantic 模型校验，按批次产出，
+整个文件不会一次性读入内存
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+NDJSON = "ndjson"
+CSV = "csv"
+
+FORMAT_ALIASES = {
+    "ndjson": NDJSON,
+    "jsonl": NDJSON,
+    "application/x-ndjson": NDJSON,
+    "application/jsonl": NDJSON,
+    "csv": CSV,
+    "text/csv": CSV,
+    "application/csv": CSV,
+}
+
+# 解析结果：(行号, 数据字典或None, 错误信息或None)
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+# 校验结果：(行号, 模型实例或None, 错误信息列表)
+ValidatedRow = Tuple[int, Optional[BaseModel], List[str]]
+
+
+def detect_format(explicit: Optional[str], filename: Optional[str], content_type: Optional[str]) -> str:
+    """按 显式参数 > 文件扩展名 > Content-Type 判断文件格式，无法识别时返回400"""
+    if explicit:
+        candidates = [explicit]
+    else:
+        candidates = [filename.rsplit(".", 1)[-1] if filename and "." in filename else None,
+                      content_type.split(";")[0] if content_type else None]
+    for candidate in candidates:
+        fmt = FORMAT_ALIASES.get((candidate or "").strip().lower())
+        if fmt:
+            return fmt
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="无法识别的导入格式，仅支持 ndjson / csv"
+    )
+
+
+def _text_stream(binary: BinaryIO) -> io.TextIOWrapper:
+    """将上传的二进制文件包装为文本流（兼容带BOM的UTF-8）"""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+def iter_ndjson(binary: BinaryIO) -> Iterator[ParsedRow]:
+    """逐行解析NDJSON，空行跳过"""
+    for line_no, line in enumerate(_text_stream(binary), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"JSON格式错误: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "每行必须是JSON对象"
+            continue
+        yield line_no, record, None
+
+
+def iter_csv(binary: BinaryIO, json_columns: Tuple[str, ...] = ()) -> Iterator[ParsedRow]:
+    """
+    逐行解析CSV（首行为表头）
+    空单元格视为未填写，json_columns 中的列按JSON解析
+    """
+    reader = csv.DictReader(_text_stream(binary))
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield reader.line_num, None, f"CSV格式错误: {e}"
+            return
+        line_no = reader.line_num
+        if None in row:
+            yield line_no, None, "列数多于表头"
+            continue
+        record: Dict[str, Any] = {}
+        error = None
+        for key, value in row.items():
+            if value is None or value == "":
+                continue
+            if key in json_columns:
+                try:
+                    value = json.loads(value)
+                except ValueError as e:
+                    error = f"{key}: JSON格式错误: {e}"
+                    break
+            record[key] = value
+        yield line_no, (None if error else record), error
+
+
+def iter_rows(binary: BinaryIO, fmt: str, json_columns: Tuple[str, ...] = ()) -> Iterator[ParsedRow]:
+    """按格式逐行解析"""
+    if fmt == CSV:
+        return iter_csv(binary, json_columns)
+    return iter_ndjson(binary)
+
+
+def format_validation_error(error: ValidationError) -> List[str]:
+    """将pydantic校验错误转换为 "字段: 原因" 列表"""
+    return [
+        f"{'.'.join(str(part) for part in item['loc']) or '__root__'}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+
+def validate_rows(rows: Iterator[ParsedRow], schema: Type[BaseModel]) -> Iterator[ValidatedRow]:
+    """用 schema 校验解析后的行"""
+    for line_no, record, error in rows:
+        if error is not None:
+            yield line_no, None, [error]
+            continue
+        try:
+            yield line_no, schema.model_validate(record), []
+        except ValidationError as e:
+            yield line_no, None, format_validation_error(e)
+
+
+def next_batch(rows: Iterator[ValidatedRow], size: int) -> List[ValidatedRow]:
+    """从迭代器中取下一批数据，读完时返回空列表（同步阻塞，路由中放入线程池调用）"""
+    return list(islice(rows, size))
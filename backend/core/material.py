@@ -0,0 +1,149 @@
+"""
+物料信息（material_info JSON）查询
+MATERIAL_INFO_INDEXED_PATHS 中声明的JSON路径会在 company_states 上建立表达式索引
+（json_extract(material_info, '$.路径')），查询时生成完全相同的表达式以命中索引；
+只允许按已声明的路径过滤，避免退化为全表扫描。默认路径的索引由迁移 0003 创建，
+配置中新增的路径由启动时的 database.schema.check_schema 补建（ensure_material_indexes）。
+json_extract 表达式索引仅SQLite支持，其他数据库不建索引（过滤退化为全表扫描）
+"""
+
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Index, func, literal_column, text
+from sqlalchemy.engine import Connection
+
+from config.settings import settings
+from models.user import CompanyState
+
+TEXT = "text"
+NUMBER = "number"
+
+# 路径只允许字母、数字、下划线并以 . 分隔，可安全地作为SQL字面量
+PATH_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+OPERATORS = {
+    "eq": lambda expr, value: expr == value,
+    "gt": lambda expr, value: expr > value,
+    "gte": lambda expr, value: expr >= value,
+    "lt": lambda expr, value: expr < value,
+    "lte": lambda expr, value: expr <= value,
+}
+
+# (路径, 运算符, 取值)
+MaterialCondition = Tuple[str, str, Any]
+
+
+def _load_paths(declared: Dict[str, str]) -> Dict[str, str]:
+    """校验配置中声明的路径及类型"""
+    paths = {}
+    for path, value_type in declared.items():
+        if not PATH_PATTERN.match(path):
+            raise ValueError(f"MATERIAL_INFO_INDEXED_PATHS 中的路径不合法: {path}")
+        if value_type not in (TEXT, NUMBER):
+            raise ValueError(f"MATERIAL_INFO_INDEXED_PATHS 中 {path} 的类型必须为 text 或 number")
+        paths[path] = value_type
+    return paths
+
+
+# 已声明（建有索引）的路径 -> 取值类型
+INDEXED_PATHS = _load_paths(settings.MATERIAL_INFO_INDEXED_PATHS)
+
+
+def material_value(path: str):
+    """material_info 中指定路径的取值表达式（路径以字面量写入SQL，与索引表达式一致）"""
+    return func.json_extract(CompanyState.material_info, literal_column(f"'$.{path}'"))
+
+
+def material_index_name(path: str) -> str:
+    """路径对应的索引名"""
+    return f"ix_company_states_material_{path.replace('.', '_')}"
+
+
+# 为每个声明的路径定义表达式索引（默认路径由迁移创建，其余由启动检查补建）
+MATERIAL_INDEXES = {path: Index(material_index_name(path), material_value(path)) for path in INDEXED_PATHS}
+
+
+def missing_material_indexes(conn: Connection) -> List[str]:
+    """
+    已声明但数据库中不存在索引的路径（表达式索引无法反射，直接查询 sqlite_master 中的索引名）
+    表达式索引仅SQLite支持，其他数据库返回空列表
+    """
+    if conn.dialect.name != "sqlite":
+        return []
+    existing = set(conn.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+        {"table": CompanyState.__tablename__},
+    ).scalars())
+    return [path for path in INDEXED_PATHS if material_index_name(path) not in existing]
+
+
+def ensure_material_indexes(conn: Connection) -> List[str]:
+    """为缺少索引的已声明路径建立表达式索引，返回新建索引的路径"""
+    missing = missing_material_indexes(conn)
+    for path in missing:
+        MATERIAL_INDEXES[path].create(conn)
+    return missing
+
+
+def _convert(path: str, raw: str) -> Any:
+    """按路径声明的类型转换查询参数"""
+    if INDEXED_PATHS[path] == TEXT:
+        return raw
+    try:
+        number = float(raw)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{path} 的取值必须为数字"
+        )
+    return int(number) if number.is_integer() else number
+
+
+def parse_material_conditions(params: Sequence[Tuple[str, str]]) -> List[MaterialCondition]:
+    """
+    解析查询参数中的物料过滤条件
+    格式为 路径=值（等于）或 路径__运算符=值（gt/gte/lt/lte），路径必须已在 MATERIAL_INFO_INDEXED_PATHS 中声明
+    """
+    conditions = []
+    for key, raw in params:
+        path, _, operator = key.partition("__")
+        operator = operator or "eq"
+        if path not in INDEXED_PATHS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"不支持按 {path} 过滤，可用路径: {', '.join(INDEXED_PATHS) or '无'}"
+            )
+        if operator not in OPERATORS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"不支持的运算符: {operator}，可用: {', '.join(OPERATORS)}"
+            )
+        conditions.append((path, operator, _convert(path, raw)))
+    if not conditions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="至少需要一个物料过滤条件"
+        )
+    return conditions
+
+
+def material_filters(conditions: Sequence[MaterialCondition]) -> list:
+    """将过滤条件转换为SQL表达式"""
+    return [OPERATORS[operator](material_value(path), value) for path, operator, value in conditions]
+
+
+def explain_plan(db, query) -> List[str]:
+    """返回查询的 EXPLAIN QUERY PLAN 明细（仅SQLite）"""
+    statement = query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}").fetchall()
+    return [row[-1] for row in rows]
+
+
+def indexes_used(plan: Sequence[str]) -> List[str]:
+    """从查询计划中提取使用到的物料路径索引名"""
+    return [
+        material_index_name(path) for path in INDEXED_PATHS
+        if any(re.search(rf"\bINDEX {re.escape(material_index_name(path))}\b", line) for line in plan)
+    ]
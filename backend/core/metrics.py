@@ -0,0 +1,208 @@
+"""
+运行指标（Prometheus 文本格式）
+不依赖 prometheus_client：计数器/直方图只在内存中累加，渲染时才生成文本，热路径上每次记录只是一次
+二分查找与几次加法；SQL语句数与耗时通过引擎的 before/after_cursor_execute 事件采集，
+并按请求（contextvars）汇总，连接池与准入控制状态在抓取时读取
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 请求延迟分桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 单条SQL耗时分桶（秒）
+STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+# 每个请求的SQL语句数分桶
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """单调递增计数器"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge:
+    """当前值（可增减）"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.labelnames = ()
+        self.value = 0
+
+    def samples(self) -> Iterable[str]:
+        yield f"{self.name} {_format_value(self.value)}"
+
+
+class Histogram:
+    """分桶直方图（各桶分别计数，渲染时再累加为 le 形式）"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        # labels -> [各桶计数..., +Inf桶计数, 总和]
+        self._values: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(labels, list(counts)) for labels, counts in self._values.items()]
+        for labels, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(counts[-1])}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "请求数", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "请求耗时（至响应发送完毕）", LATENCY_BUCKETS, ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "正在处理的请求数")
+REQUEST_STATEMENTS = Histogram("db_statements_per_request", "每个请求执行的SQL语句数", STATEMENT_COUNT_BUCKETS, ("method", "route"))
+REQUEST_DB_TIME = Histogram("db_time_per_request_seconds", "每个请求的SQL执行总耗时", LATENCY_BUCKETS, ("method", "route"))
+DB_STATEMENTS = Counter("db_statements_total", "执行的SQL语句数", ("engine",))
+DB_STATEMENT_LATENCY = Histogram("db_statement_duration_seconds", "单条SQL执行耗时", STATEMENT_BUCKETS, ("engine",))
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "从连接池取出连接的次数", ("engine",))
+
+METRICS = [
+    HTTP_REQUESTS, HTTP_LATENCY, HTTP_IN_FLIGHT, REQUEST_STATEMENTS, REQUEST_DB_TIME,
+    DB_STATEMENTS, DB_STATEMENT_LATENCY, DB_POOL_CHECKOUTS,
+]
+
+# 当前请求的SQL统计 [语句数, 耗时]；线程池中执行的查询共享同一个列表（run_in_threadpool 会复制上下文）
+request_db_stats: ContextVar[Optional[List[float]]] = ContextVar("request_db_stats", default=None)
+
+# 已挂载事件的引擎：名称 -> 引擎（抓取时读取连接池状态）
+_engines: Dict[str, Engine] = {}
+
+# 抓取时额外输出的指标：返回 [(名称, 类型, 说明, [(标签字典, 值)])]
+_collectors: List[Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]] = []
+
+
+def instrument_engine(sync_engine: Engine, name: str) -> None:
+    """为引擎挂载SQL耗时与连接池事件（异步引擎传入其 sync_engine）"""
+    if name in _engines:
+        return
+    _engines[name] = sync_engine
+    labels = (name,)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        DB_STATEMENTS.inc(labels)
+        DB_STATEMENT_LATENCY.observe(elapsed, labels)
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+
+    @event.listens_for(sync_engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc(labels)
+
+
+def register_collector(collector: Callable) -> None:
+    """注册抓取时调用的指标收集函数"""
+    _collectors.append(collector)
+
+
+def _pool_metrics():
+    """连接池当前状态（只有 QueuePool 等带容量的连接池才有这些指标）"""
+    gauges = {
+        "db_pool_size": ("连接池容量", "size"),
+        "db_pool_checked_out": ("已取出的连接数", "checkedout"),
+        "db_pool_checked_in": ("池中空闲的连接数", "checkedin"),
+        "db_pool_overflow": ("超出容量的连接数（负数表示尚未建立的容量）", "overflow"),
+    }
+    result = []
+    for metric, (help_text, method) in gauges.items():
+        samples = [
+            ({"engine": name}, getattr(sync_engine.pool, method)())
+            for name, sync_engine in _engines.items() if hasattr(sync_engine.pool, method)
+        ]
+        if samples:
+            result.append((metric, "gauge", help_text, samples))
+    return result
+
+
+def render_metrics() -> str:
+    """生成 Prometheus 文本格式的指标"""
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    for collector in [_pool_metrics, *_collectors]:
+        for name, kind, help_text, samples in collector():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
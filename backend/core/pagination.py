@@ -0,0 +1,104 @@
+"""
+键集（游标）分页
+按排序列的取值定位下一页，不再扫描并丢弃前面的行，深翻页耗时与页码无关
+游标为 base64url 编码的JSON，对前端不透明（日期时间列以 ISO 格式字符串保存）
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.orm import Query
+
+NEXT = "n"
+PREV = "p"
+
+
+def encode_cursor(key: Sequence[Any], direction: str = NEXT) -> str:
+    """编码游标"""
+    raw = json.dumps({"k": list(key), "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_size: int) -> Tuple[List[Any], str]:
+    """解码游标，格式不正确时返回400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key, direction = data["k"], data["d"]
+        if not isinstance(key, list) or len(key) != key_size or direction not in (NEXT, PREV):
+            raise ValueError(cursor)
+        return key, direction
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的分页游标"
+        )
+
+
+def _row_key(row, columns: Sequence) -> List[Any]:
+    """提取行的排序键（日期时间转为 ISO 格式字符串）"""
+    key = [getattr(row, column.key) for column in columns]
+    return [value.isoformat() if isinstance(value, datetime) else value for value in key]
+
+
+def _parse_key(key: List[Any], columns: Sequence) -> List[Any]:
+    """把游标中的排序键还原为列类型（日期时间列解析 ISO 字符串），格式不正确时返回400"""
+    try:
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) and value is not None else value
+            for value, column in zip(key, columns)
+        ]
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的分页游标"
+        )
+
+
+def keyset_paginate(query: Query, columns: Sequence, cursor: Optional[str], limit: int, prefix: Sequence = ()):
+    """
+    对查询执行键集分页
+    columns 为游标排序列（最后一列必须唯一，如 id）
+    prefix 为已被等值条件固定的前导排序列（如按用户分页时的 user_id），只参与排序、不进入游标，
+    使 SQLite 能在 (prefix..., columns...) 复合索引上做范围扫描
+    返回 (本页数据, 下一页游标, 上一页游标)
+    """
+    key_expr = tuple_(*columns) if len(columns) > 1 else columns[0]
+    direction = NEXT
+    key = None
+    if cursor:
+        key, direction = decode_cursor(cursor, len(columns))
+        key = _parse_key(key, columns)
+        bound = tuple_(*key) if len(columns) > 1 else key[0]
+        query = query.filter(key_expr > bound if direction == NEXT else key_expr < bound)
+
+    order_columns = list(prefix) + list(columns)
+    if direction == NEXT:
+        query = query.order_by(*order_columns)
+    else:
+        query = query.order_by(*[column.desc() for column in order_columns])
+
+    # 多取一行用于判断是否还有更多数据
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == PREV:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if direction == NEXT:
+            if has_more:
+                next_cursor = encode_cursor(_row_key(rows[-1], columns), NEXT)
+            if key is not None:
+                prev_cursor = encode_cursor(_row_key(rows[0], columns), PREV)
+        else:
+            next_cursor = encode_cursor(_row_key(rows[-1], columns), NEXT)
+            if has_more:
+                prev_cursor = encode_cursor(_row_key(rows[0], columns), PREV)
+    return rows, next_cursor, prev_cursor
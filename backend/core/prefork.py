@@ -0,0 +1,270 @@
+"""
+多进程服务（预先fork）
+主进程导入应用并完成数据库结构检查后监听端口，再fork出多个工作进程共享同一个监听套接字，
+应用代码只导入一次，工作进程与主进程共享只读内存页；
+工作进程处理 WEB_MAX_REQUESTS 个请求或常驻内存超过 WEB_MAX_MEMORY_MB 后处理完进行中的请求再退出，由主进程补齐；
+主进程收到 SIGHUP 时先启动一组新的工作进程，再让旧的工作进程平滑退出（SIGTERM），重载期间不中断服务
+"""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+
+from config.settings import settings
+
+logger = logging.getLogger("prefork")
+
+# 工作进程启动失败（导入/启动阶段出错）的退出码，主进程据此停止服务而不是反复重启
+WORKER_BOOT_ERROR = 3
+# 工作进程启动完成后异常退出的退出码，主进程只补齐该工作进程
+WORKER_CRASHED = 1
+
+
+def default_workers() -> int:
+    """工作进程数：WEB_WORKERS 为0时使用CPU核数"""
+    return settings.WEB_WORKERS if settings.WEB_WORKERS > 0 else (os.cpu_count() or 1)
+
+
+def current_rss_mb() -> float:
+    """当前进程的常驻内存（MB）"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        # 非Linux：退化为峰值常驻内存（macOS 单位为字节，其他为KB）
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """创建由所有工作进程共享的监听套接字"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _watch_memory(server: uvicorn.Server, limit_mb: int, interval: float) -> None:
+    """内存超过上限时通知工作进程平滑退出"""
+    while not server.should_exit:
+        time.sleep(interval)
+        rss = current_rss_mb()
+        if rss > limit_mb:
+            logger.warning("工作进程 %s 内存 %.0fMB 超过上限 %sMB，处理完进行中的请求后退出", os.getpid(), rss, limit_mb)
+            server.should_exit = True
+            return
+
+
+def _disable_process_local_caches() -> None:
+    """
+    多个工作进程时停用进程内缓存：写入后的失效只作用于处理该请求的工作进程，
+    其他工作进程会在TTL内继续返回已修改、删除或禁用的数据
+    """
+    from core.company_cache import company_cache
+    from core.principal_cache import principal_cache
+
+    if company_cache.disable_process_local():
+        logger.warning("多进程模式下停用进程内公司状态缓存（COMPANY_CACHE_BACKEND=%s）", settings.COMPANY_CACHE_BACKEND)
+    if principal_cache.max_size > 0:
+        principal_cache.disable()
+        logger.warning("多进程模式下停用认证主体缓存")
+
+
+def _reset_worker_state() -> None:
+    """
+    fork 后丢弃从主进程继承的数据库连接（close=False：不关闭主进程仍持有的连接），
+    工作进程按需建立自己的连接
+    """
+    from database.database import engine, async_engine, replica_engines, async_replica_engines
+
+    for sync_engine in [engine, *replica_engines]:
+        sync_engine.dispose(close=False)
+    for async_db_engine in [async_engine, *async_replica_engines]:
+        if async_db_engine is not None:
+            async_db_engine.sync_engine.dispose(close=False)
+
+
+class Arbiter:
+    """主进程：维持工作进程数量，处理重载与退出信号"""
+
+    def __init__(self, app, host: str, port: int, workers: int):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.num_workers = max(1, workers)
+        self.sock: Optional[socket.socket] = None
+        # 工作进程 pid -> 启动时间
+        self.workers: Dict[int, float] = {}
+        # 正在平滑退出的工作进程 pid -> 强制结束的期限
+        self.retiring: Dict[int, float] = {}
+        self._signals: List[int] = []
+        self._halt = False
+        # 工作进程中运行的服务（fork后设置，用于区分启动失败与运行中崩溃）
+        self._server: Optional[uvicorn.Server] = None
+
+    def run(self) -> None:
+        self.sock = bind_socket(self.host, self.port, settings.WEB_BACKLOG)
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda signum, frame: self._signals.append(signum))
+        # 导入阶段产生的对象不再参与GC扫描，避免工作进程中的GC写入共享页导致复制
+        gc.freeze()
+        logger.info("主进程 %s 监听 %s:%s，工作进程数 %s", os.getpid(), self.host, self.port, self.num_workers)
+        try:
+            while not self._halt:
+                self._reap()
+                while self._signals:
+                    signum = self._signals.pop(0)
+                    if signum == signal.SIGHUP:
+                        self.reload()
+                    else:
+                        self._halt = True
+                if self._halt:
+                    break
+                self._kill_overdue()
+                self._spawn_missing()
+                time.sleep(0.1)
+        finally:
+            self.stop()
+            self.sock.close()
+
+    def reload(self) -> None:
+        """平滑重载：先启动新的工作进程，再让旧的处理完进行中的请求后退出"""
+        logger.info("重载：替换 %s 个工作进程", len(self.workers))
+        old = list(self.workers)
+        self.workers = {}
+        self._spawn_missing()
+        for pid in old:
+            self._retire(pid)
+
+    def stop(self) -> None:
+        """平滑停止所有工作进程，超过 WEB_GRACEFUL_TIMEOUT 仍未退出的强制结束"""
+        for pid in list(self.workers):
+            self._retire(pid)
+        self.workers = {}
+        while self.retiring:
+            self._reap()
+            self._kill_overdue()
+            time.sleep(0.05)
+
+    def _spawn_missing(self) -> None:
+        while len(self.workers) < self.num_workers and not self._halt:
+            self._spawn()
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return
+        # 工作进程
+        code = WORKER_BOOT_ERROR
+        try:
+            code = self._run_worker()
+        except BaseException:
+            logger.exception("工作进程 %s 异常退出", os.getpid())
+            if self._server is not None and self._server.started:
+                code = WORKER_CRASHED
+        finally:
+            os._exit(code)
+
+    def _run_worker(self) -> int:
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+        _reset_worker_state()
+
+        config = uvicorn.Config(
+            self.app,
+            host=self.host,
+            port=self.port,
+            lifespan="on",
+            log_level="info",
+            access_log=settings.DEBUG,
+            limit_max_requests=settings.WEB_MAX_REQUESTS or None,
+            limit_max_requests_jitter=settings.WEB_MAX_REQUESTS_JITTER,
+            timeout_graceful_shutdown=settings.WEB_GRACEFUL_TIMEOUT,
+        )
+        server = self._server = uvicorn.Server(config)
+        if settings.WEB_MAX_MEMORY_MB > 0:
+            threading.Thread(
+                target=_watch_memory,
+                args=(server, settings.WEB_MAX_MEMORY_MB, settings.WEB_MEMORY_CHECK_INTERVAL),
+                daemon=True,
+            ).start()
+        server.run(sockets=[self.sock])
+        return 0 if server.started else WORKER_BOOT_ERROR
+
+    def _retire(self, pid: int) -> None:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        self.retiring[pid] = time.monotonic() + settings.WEB_GRACEFUL_TIMEOUT + 5
+
+    def _kill_overdue(self) -> None:
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now >= deadline:
+                logger.warning("工作进程 %s 未在期限内退出，强制结束", pid)
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self.retiring[pid] = now + 5
+
+    def _reap(self) -> None:
+        """回收已退出的工作进程"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.retiring.pop(pid, None)
+            if self.workers.pop(pid, None) is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code == WORKER_BOOT_ERROR:
+                logger.error("工作进程 %s 启动失败，停止服务", pid)
+                self._halt = True
+            elif code == WORKER_CRASHED:
+                logger.warning("工作进程 %s 运行中异常退出，启动新的工作进程", pid)
+            else:
+                # 达到请求数/内存上限后退出，或被信号结束，由主循环补齐
+                logger.info("工作进程 %s 已退出（%s），启动新的工作进程", pid, code)
+
+
+def serve(app_path: str = "main:app", workers: Optional[int] = None,
+          host: str = settings.HOST, port: int = settings.PORT) -> None:
+    """预先导入应用并以多进程方式提供服务"""
+    from uvicorn.importer import import_from_string
+    from database.database import engine, is_sqlite_memory
+    from database.schema import check_schema
+
+    workers = workers or default_workers()
+    if workers > 1 and is_sqlite_memory(settings.DATABASE_URL):
+        raise RuntimeError("内存SQLite数据库无法在多个工作进程间共享，请使用数据库文件或 --workers 1")
+
+    app = import_from_string(app_path)
+    # 结构检查/迁移只在主进程执行一次，避免多个工作进程同时迁移
+    if check_schema(engine):
+        print("数据库迁移完成")
+    engine.dispose()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(name)s] %(message)s")
+    if workers > 1:
+        # 在fork之前停用，工作进程继承停用后的状态
+        _disable_process_local_caches()
+    Arbiter(app, host, port, workers).run()
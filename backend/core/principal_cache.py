@@ -0,0 +1,110 @@
+"""
+认证主体缓存
+get_current_user 每次请求都要按令牌中的 sub 查询用户，这里在进程内缓存用户快照：
+- 以用户名（令牌 sub）为键，LRU 淘汰
+- 过期时间取 令牌exp 与 PRINCIPAL_CACHE_TTL 中较早者
+- crud.user 中修改/删除用户后按用户名精确失效；失效只作用于当前进程，多进程服务（core.prefork）中停用
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from config.settings import settings
+from models.user import User
+from core.fieldsets import column_keys
+
+USER_COLUMNS = column_keys(User)
+
+
+def snapshot_user(user: User) -> User:
+    """复制用户已加载的列数据为一个独立（不属于任何会话）的对象，避免会话提交/关闭后属性过期"""
+    loaded = user.__dict__
+    return User(**{key: loaded[key] for key in USER_COLUMNS if key in loaded})
+
+
+class PrincipalCache:
+    """线程安全的LRU + TTL 用户缓存"""
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[User, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 每次失效时递增；加载期间发生失效则丢弃加载结果，避免回填旧数据
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, username: str) -> Optional[User]:
+        """获取缓存的用户，不存在或已过期返回None"""
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None:
+                user, expires_at = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(username)
+                    self.hits += 1
+                    return user
+                del self._entries[username]
+            self.misses += 1
+            return None
+
+    def put(self, username: str, user: User, token_exp: Optional[float], generation: int) -> None:
+        """写入缓存；generation 为开始加载时读取的值，期间发生过失效则不写入"""
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        snapshot = snapshot_user(user)
+        with self._lock:
+            if generation != self.generation or self.max_size <= 0:
+                return
+            self._entries[username] = (snapshot, expires_at)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, username: str) -> None:
+        """使指定用户的缓存失效"""
+        with self._lock:
+            self.generation += 1
+            if self._entries.pop(username, None) is not None:
+                self.invalidations += 1
+
+    def disable(self) -> None:
+        """停用缓存：清空并不再写入"""
+        with self._lock:
+            self.max_size = 0
+            self.generation += 1
+            self._entries.clear()
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# 全局缓存实例
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE if settings.PRINCIPAL_CACHE_ENABLED else 0,
+    ttl=settings.PRINCIPAL_CACHE_TTL
+)
@@ -0,0 +1,42 @@
+"""
+当前请求上下文
+RequestContextMiddleware 把ASGI scope 写入 ContextVar，数据库事件等不直接接触请求对象的代码据此获取当前路由
+（run_in_threadpool / run_sync 会复制上下文，线程池与异步会话中执行的查询同样可用）
+"""
+
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.types import Scope
+
+# 未匹配到路由（404、被准入控制拒绝等）的请求统一使用该标签
+UNMATCHED_ROUTE = "unmatched"
+
+current_scope: ContextVar[Optional[Scope]] = ContextVar("current_scope", default=None)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    请求匹配到的完整路由模板，如 /api/company/{company_state_id}
+    include_router 挂载的子路由在 scope["route"] 中只有子路由内的路径，需用实际路径补全前缀
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return UNMATCHED_ROUTE
+    local = path_format
+    for name, value in scope.get("path_params", {}).items():
+        local = local.replace("{" + name + "}", str(value))
+    path = scope["path"]
+    if not path.endswith(local):
+        return path_format
+    return path[:len(path) - len(local)] + path_format
+
+
+def current_route() -> Optional[str]:
+    """当前请求的 "方法 路由模板"，不在请求中（启动任务、脚本）时返回None"""
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    return f"{scope['method']} {route_template(scope)}"
+
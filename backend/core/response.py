@@ -1,12 +1,84 @@
 """
 统一响应格式模块
 提供标准化的API响应格式，确保前后端数据格式一致
+
+响应体直接编码为字节：SQLAlchemy模型、Pydantic模型、日期时间等类型按类型缓存编码函数，
+安装 orjson 时自动使用 orjson 作为JSON后端
 """
 
-from typing import Any, Dict, Optional
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
 from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Mapper
 import json
 
+from config.settings import settings
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+
+# 序列化ORM对象时排除的敏感字段
+SENSITIVE_FIELDS = frozenset({"hashed_password"})
+
+# 按类型缓存的编码函数
+_ENCODERS: Dict[type, Callable[[Any], Any]] = {}
+
+
+def _build_encoder(cls: type) -> Optional[Callable[[Any], Any]]:
+    """为指定类型构建编码函数，不支持的类型返回None"""
+    mapper = sa_inspect(cls, raiseerr=False)
+    if isinstance(mapper, Mapper):
+        keys = tuple(attr.key for attr in mapper.column_attrs if attr.key not in SENSITIVE_FIELDS)
+
+        def encode_model(obj):
+            # 只读取已加载的列，不会触发延迟加载
+            loaded = obj.__dict__
+            return {key: loaded[key] for key in keys if key in loaded}
+        return encode_model
+    if issubclass(cls, BaseModel):
+        return lambda obj: obj.model_dump(mode="json")
+    if issubclass(cls, (datetime, date, time)):
+        return lambda obj: obj.isoformat()
+    if issubclass(cls, Enum):
+        return lambda obj: obj.value
+    if issubclass(cls, (Decimal, UUID)):
+        return str
+    if issubclass(cls, (set, frozenset, tuple)):
+        return list
+    if issubclass(cls, bytes):
+        return lambda obj: obj.decode()
+    return None
+
+
+def _default(obj: Any) -> Any:
+    """JSON编码回调：处理标准JSON不支持的类型"""
+    cls = type(obj)
+    try:
+        encoder = _ENCODERS[cls]
+    except KeyError:
+        encoder = _ENCODERS[cls] = _build_encoder(cls)
+    if encoder is None:
+        raise TypeError(f"Object of type {cls.__name__} is not JSON serializable")
+    return encoder(obj)
+
+
+if orjson is not None and settings.JSON_BACKEND in ("auto", "orjson"):
+    def dumps(obj: Any) -> bytes:
+        """编码为JSON字节（orjson）"""
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def dumps(obj: Any) -> bytes:
+        """编码为JSON字节（标准库json）"""
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode()
+
 
 class ResponseModel:
     """响应数据模型"""
@@ -24,14 +96,18 @@ class ResponseModel:
             "data": self.data
         }
     
+    def to_bytes(self) -> bytes:
+        """直接编码为响应体字节，不构造中间字典"""
+        return b'{"code":%d,"msg":%s,"data":%s}' % (self.code, dumps(self.msg), dumps(self.data))
+    
     def to_json_response(self) -> Response:
         """转换为JSON响应"""
-        json_str = json.dumps(
-            self.to_dict(), 
-            ensure_ascii=False, 
-            separators=(',', ':')
-        )
-        return Response(content=json_str, media_type="application/json")
+        return Response(content=self.to_bytes(), media_type="application/json")
+
+
+def json_response(data: Any) -> Response:
+    """不带统一响应包装的JSON响应（使用相同的编码器）"""
+    return Response(content=dumps(data), media_type="application/json")
 
 
 def success_response(data: Any = None, msg: str = "成功") -> Response:
@@ -59,6 +135,11 @@ def token_expired_error_response(msg: str = "令牌已过期") -> Response:
     return error_response(code=50014, msg=msg)
 
 
+def service_busy_error_response(msg: str = "服务繁忙，请稍后重试") -> Response:
+    """服务繁忙错误响应"""
+    return error_response(code=50300, msg=msg)
+
+
 # 常用错误码定义
 ERROR_CODES = {
     "SUCCESS": 20000,
@@ -66,4 +147,5 @@ ERROR_CODES = {
     "UNAUTHORIZED": 50008,
     "TOKEN_EXPIRED": 50014,
     "OTHER_CLIENT_LOGIN": 50012,
+    "SERVICE_BUSY": 50300,
 }
\ No newline at end of file
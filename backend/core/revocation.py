@@ -0,0 +1,308 @@
+"""
+令牌吊销名单
+令牌携带唯一的 jti，登出时把 jti 连同令牌的过期时间写入吊销名单，verify_token 据此拒绝已吊销的令牌：
+- 按过期时间分桶保存（每桶 TOKEN_DENYLIST_BUCKET_SECONDS 秒），整桶过期后直接丢弃，
+  内存占用只与令牌有效期内的吊销数量有关
+- 前置布隆过滤器：绝大多数（未吊销的）令牌一次位运算即可判定；命中时只查令牌过期时间所在的分桶，判断为 O(1)
+- is_revoked 只访问内存，不做任何文件IO；文件读写、分桶过期与压缩都由 lifespan 中启动的后台任务
+  每 TOKEN_DENYLIST_REFRESH_INTERVAL 秒在线程池中执行一次（maintain）。后台任务只在更新内存结构时短暂持锁：
+  文件读写与布隆过滤器重建都在锁外进行，重建完成后一次赋值替换
+- 吊销记录由后台任务批量追加写入本地文件（TOKEN_DENYLIST_FILE），重启后重新加载，应用关闭时写入剩余记录；
+  多进程部署时各进程在同一周期内读取其他进程追加的记录
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from config.settings import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows：不加文件锁
+    fcntl = None
+
+logger = logging.getLogger("revocation")
+
+BLOOM_HASHES = 4
+# 名单文件超过该大小且大部分记录已过期时压缩
+COMPACT_MIN_BYTES = 1 << 20
+
+
+class BloomFilter:
+    """固定大小的布隆过滤器（只增不删，需要删除时整体重建）"""
+
+    def __init__(self, bits: int):
+        self.bits = max(8, bits)
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=8 * BLOOM_HASHES).digest()
+        for i in range(BLOOM_HASHES):
+            yield int.from_bytes(digest[i * 8:(i + 1) * 8], "little") % self.bits
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class _FileLock:
+    """进程间互斥访问名单文件（追加与压缩）"""
+
+    def __init__(self, f):
+        self.f = f
+
+    def __enter__(self):
+        if fcntl is not None:
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_EX)
+        return self.f
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_UN)
+
+
+class TokenDenylist:
+    """按过期时间分桶、前置布隆过滤器的吊销名单"""
+
+    def __init__(self, path: Optional[str], bucket_seconds: int, bloom_bits: int, refresh_interval: float):
+        self.path = path
+        self.bucket_seconds = max(1, bucket_seconds)
+        self.bloom_bits = bloom_bits
+        self.refresh_interval = refresh_interval
+        # 桶序号（过期时间 // bucket_seconds）-> jti 集合
+        self._buckets: Dict[int, Set[str]] = {}
+        self._bloom = BloomFilter(bloom_bits)
+        self._lock = threading.Lock()
+        # 已读取到的文件位置及文件标识（压缩后文件被替换，需要重新加载）
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self._oldest_bucket: Optional[int] = None
+        # 重建布隆过滤器期间新加入的 jti（重建完成后补入新的过滤器），未在重建时为None
+        self._rebuilding: Optional[List[str]] = None
+        # 尚未写入文件的吊销记录（由后台任务批量追加）
+        self._pending: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+        self.checks = 0
+        self.bloom_hits = 0
+        self.revoked = 0
+        if path:
+            self.load()
+
+    # ---- 内存结构 ----
+
+    def _add(self, jti: str, exp: float) -> bool:
+        bucket = int(exp) // self.bucket_seconds
+        if bucket < int(time.time()) // self.bucket_seconds:
+            return False
+        self._buckets.setdefault(bucket, set()).add(jti)
+        self._bloom.add(jti)
+        if self._rebuilding is not None:
+            self._rebuilding.append(jti)
+        if self._oldest_bucket is None or bucket < self._oldest_bucket:
+            self._oldest_bucket = bucket
+        return True
+
+    def _expire(self, now: float) -> None:
+        """
+        丢弃已整体过期的分桶，并按剩余条目重建布隆过滤器
+        持锁只摘除过期分桶（与分桶数量有关）；重建在锁外进行，期间仍使用旧的过滤器（只会多判定命中，由分桶确认），
+        完成后补入重建期间新加入的 jti 并一次赋值替换
+        """
+        current = int(now) // self.bucket_seconds
+        with self._lock:
+            if self._oldest_bucket is None or self._oldest_bucket >= current or self._rebuilding is not None:
+                return
+            for bucket in [bucket for bucket in self._buckets if bucket < current]:
+                del self._buckets[bucket]
+            self._oldest_bucket = min(self._buckets) if self._buckets else None
+            remaining = list(self._buckets.values())
+            self._rebuilding = []
+        bloom = BloomFilter(self.bloom_bits)
+        for jtis in remaining:
+            # set.copy 为单次C调用，不会与持锁的 _add 交错；之后加入的 jti 记录在 _rebuilding 中
+            for jti in jtis.copy():
+                bloom.add(jti)
+        with self._lock:
+            for jti in self._rebuilding:
+                bloom.add(jti)
+            self._bloom, self._rebuilding = bloom, None
+
+    def is_revoked(self, jti: str, exp: float) -> bool:
+        """jti 是否已吊销（exp 为令牌过期时间戳；只访问内存，只查所在的分桶）"""
+        with self._lock:
+            self.checks += 1
+            if jti not in self._bloom:
+                return False
+            self.bloom_hits += 1
+            return jti in self._buckets.get(int(exp) // self.bucket_seconds, ())
+
+    def revoke(self, jti: str, exp: float) -> None:
+        """吊销令牌（exp 为令牌过期时间戳，过期后条目自动丢弃）；后台任务运行时由其写入文件"""
+        with self._lock:
+            if not self._add(jti, exp):
+                return
+            self.revoked += 1
+            if self.path:
+                self._pending.append(f"{jti} {int(exp)}\n")
+        if self.path and self._task is None:
+            # 未启动后台任务（命令行、脚本）时直接写入
+            self.flush()
+
+    # ---- 后台维护 ----
+
+    def maintain(self) -> None:
+        """写入新的吊销记录、读取其他进程追加的记录、丢弃过期分桶，必要时压缩文件（在线程池中执行）"""
+        if self.path:
+            self.flush()
+            self.refresh()
+        self._expire(time.time())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await run_in_threadpool(self.maintain)
+            except Exception:
+                logger.exception("令牌吊销名单维护失败")
+
+    def start(self) -> None:
+        """启动后台维护（应用启动时调用）"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台维护并写入剩余的吊销记录（应用关闭时调用）"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.path:
+            await run_in_threadpool(self.flush)
+
+    # ---- 持久化 ----
+
+    def flush(self) -> None:
+        """把尚未写入的吊销记录追加到文件"""
+        with self._lock:
+            lines, self._pending = self._pending, []
+        if not lines:
+            return
+        while True:
+            with open(self.path, "a", encoding="utf-8") as f, _FileLock(f):
+                # 等待锁期间文件可能已被其他进程压缩替换，需重新打开
+                if os.fstat(f.fileno()).st_ino != os.stat(self.path).st_ino:
+                    continue
+                f.writelines(lines)
+                return
+
+    def _read_from(self, offset: int) -> Tuple[List[Tuple[str, float]], int]:
+        """读取文件中 offset 之后的完整行（不持锁），返回 (jti, 过期时间) 列表与新的位置"""
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        entries = []
+        for raw in data[:end].splitlines():
+            parts = raw.decode("utf-8", "replace").split()
+            if len(parts) == 2:
+                try:
+                    entries.append((parts[0], float(parts[1])))
+                except ValueError:
+                    continue
+        return entries, offset + end
+
+    def _load_from(self, offset: int) -> None:
+        """读取 offset 之后的记录并加入名单（只在加入内存时持锁）"""
+        entries, self._offset = self._read_from(offset)
+        with self._lock:
+            for jti, exp in entries:
+                self._add(jti, exp)
+
+    def load(self) -> None:
+        """启动时加载名单文件，并压缩掉已过期的记录"""
+        if not os.path.exists(self.path):
+            return
+        self._inode = os.stat(self.path).st_ino
+        with self._lock:
+            self._buckets.clear()
+            self._bloom = BloomFilter(self.bloom_bits)
+            self._oldest_bucket = None
+        self._load_from(0)
+        self.compact()
+
+    def refresh(self) -> None:
+        """读取其他进程追加的记录（文件被压缩替换时重新加载）；文件位置只由后台维护访问，不需要持锁"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._offset = 0
+            self._inode = stat.st_ino
+        if stat.st_size != self._offset:
+            self._load_from(self._offset)
+        if stat.st_size > COMPACT_MIN_BYTES and stat.st_size > 4 * 64 * max(1, self.stats()["entries"]):
+            self.compact()
+
+    def compact(self) -> None:
+        """把仍有效的记录写入新文件后替换原文件"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(self.path, "a", encoding="utf-8") as f, _FileLock(f):
+            if os.fstat(f.fileno()).st_ino != self._inode:
+                # 其他进程已完成压缩，由 refresh 重新加载
+                return
+            # 持文件锁期间其他进程无法追加，先读完最新记录
+            self._load_from(self._offset)
+            self._expire(time.time())
+            with self._lock:
+                buckets = list(self._buckets.items())
+            # 只保留分桶，写回的过期时间取所在分桶的最后一秒（不早于实际过期时间）；
+            # 之后本进程新吊销的记录在 _pending 中，由 flush 追加到新文件
+            lines = [
+                f"{jti} {(bucket + 1) * self.bucket_seconds - 1}\n"
+                for bucket, jtis in buckets for jti in jtis.copy()
+            ]
+            with open(tmp_path, "w", encoding="utf-8") as tmp:
+                tmp.writelines(lines)
+            os.replace(tmp_path, self.path)
+            stat = os.stat(self.path)
+            self._offset, self._inode = stat.st_size, stat.st_ino
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.TOKEN_REVOCATION_ENABLED,
+                "entries": sum(len(jtis) for jtis in self._buckets.values()),
+                "buckets": len(self._buckets),
+                "bloom_bits": self._bloom.bits,
+                "bloom_entries": self._bloom.count,
+                "checks": self.checks,
+                "bloom_hits": self.bloom_hits,
+                "revoked": self.revoked,
+            }
+
+
+# 全局实例
+token_denylist = TokenDenylist(
+    settings.TOKEN_DENYLIST_FILE if settings.TOKEN_REVOCATION_ENABLED else None,
+    settings.TOKEN_DENYLIST_BUCKET_SECONDS,
+    settings.TOKEN_DENYLIST_BLOOM_BITS,
+    settings.TOKEN_DENYLIST_REFRESH_INTERVAL,
+)
@@ -0,0 +1,90 @@
+"""
+公司状态全文检索
+SQLite 下使用 FTS5 外部内容表 company_states_fts 镜像 company_states 的可检索列，
+由触发器随插入/更新/删除同步（批量导入等绕过ORM的写入同样生效），检索表与触发器由迁移创建；
+trigram 分词支持任意位置的子串匹配，结果按 bm25 相关度排序
+其他数据库退化为 LIKE 查询
+"""
+
+from typing import List, Optional, Sequence
+
+from sqlalchemy import column, literal_column, or_, table
+from sqlalchemy.engine import Engine
+
+from config.settings import settings
+from database.database import is_sqlite
+from models.user import CompanyState
+
+FTS_TABLE = "company_states_fts"
+
+# 参与检索的列
+SEARCH_COLUMNS = ("company_name", "company_code", "bank_name", "bank_account")
+
+# trigram 分词下可走索引的最短检索词长度
+MIN_TERM_LENGTH = 3
+
+fts = table(FTS_TABLE, column("rowid"))
+
+
+def fts_enabled(engine: Engine) -> bool:
+    """当前数据库是否使用FTS5检索"""
+    return settings.COMPANY_SEARCH_FTS_ENABLED and is_sqlite(str(engine.url))
+
+
+def rebuild_company_search_index(engine: Engine) -> None:
+    """按 company_states 全量重建检索索引"""
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def split_terms(q: str) -> List[str]:
+    """按空白拆分检索词（多个词之间为"且"关系）"""
+    return [term for term in q.split() if term]
+
+
+def _quote(term: str) -> str:
+    """将检索词转为FTS5字符串（按字面匹配，不解析查询语法）"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _like(term: str) -> str:
+    """转义LIKE通配符"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def match_expression(terms: Sequence[str], columns: Sequence[str]) -> Optional[str]:
+    """
+    生成FTS5 MATCH表达式，长度不足 MIN_TERM_LENGTH 的词无法使用trigram索引，不放入表达式
+    columns 为检索的列子集
+    """
+    indexed = [_quote(term) for term in terms if len(term) >= MIN_TERM_LENGTH]
+    if not indexed:
+        return None
+    prefix = "" if tuple(columns) == SEARCH_COLUMNS else "{" + " ".join(columns) + "} : "
+    return prefix + "(" + " AND ".join(indexed) + ")"
+
+
+def like_conditions(columns: Sequence, terms: Sequence[str]) -> list:
+    """每个检索词在任一列中出现（LIKE，不区分大小写）"""
+    return [or_(*[col.ilike(_like(term), escape="\\") for col in columns]) for term in terms]
+
+
+def apply_search(query, engine: Engine, terms: Sequence[str], columns: Sequence[str] = SEARCH_COLUMNS):
+    """
+    为公司状态查询附加检索条件与排序
+    FTS5：JOIN 检索表按 MATCH 过滤并按 bm25 相关度排序，短词再以 LIKE 过滤已命中的行；
+    全部为短词或非SQLite数据库时，在 company_states 上使用 LIKE，按ID排序
+    """
+    model_columns = [getattr(CompanyState, name) for name in columns]
+    expression = match_expression(terms, columns) if fts_enabled(engine) else None
+    if expression is None:
+        return query.filter(*like_conditions(model_columns, terms)).order_by(CompanyState.id)
+
+    short_terms = [term for term in terms if len(term) < MIN_TERM_LENGTH]
+    query = (
+        query.join(fts, fts.c.rowid == CompanyState.id)
+        .filter(literal_column(FTS_TABLE).op("MATCH")(expression))
+        .filter(*like_conditions(model_columns, short_terms))
+    )
+    return query.order_by(literal_column(f"{FTS_TABLE}.rank"), CompanyState.id)
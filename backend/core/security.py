@@ -1,61 +1,119 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
+import binascii
 import jwt
 import hashlib
 import secrets
 from config.settings import settings
+from core.revocation import token_denylist
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
-    # 使用更安全的密码验证方式
+# PBKDF2 哈希格式：
+#   旧格式 "salt:hash"（固定 100000 次迭代）
+#   新格式 "pbkdf2_sha256$迭代次数$salt$hash"（迭代次数随 PASSWORD_PBKDF2_ITERATIONS 调整）
+PBKDF2_SCHEME = "pbkdf2_sha256"
+LEGACY_PBKDF2_ITERATIONS = 100000
+
+
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    """获取bcrypt密码上下文（每个进程只构建一次），bcrypt不可用时返回None"""
     try:
-        # 尝试使用bcrypt（如果可用）
         from passlib.context import CryptContext
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        return pwd_context.verify(plain_password, hashed_password)
-    except:
-        # 如果bcrypt不可用，使用安全的替代方案
-        # 使用PBKDF2进行密码哈希验证
-        import hashlib
-        import binascii
-        
-        # 解析哈希值（格式：salt:hash）
-        if ':' not in hashed_password:
-            return False
+        pwd_context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS
+        )
+        # 提前加载bcrypt后端，不可用时在这里抛出异常
+        pwd_context.handler("bcrypt").get_backend()
+        return pwd_context
+    except Exception:
+        return None
+
+
+def _pbkdf2_hex(password: str, salt: str, iterations: int) -> str:
+    """计算PBKDF2哈希（十六进制）"""
+    dk = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations)
+    return binascii.hexlify(dk).decode()
+
+
+def _parse_pbkdf2(hashed_password: str) -> Optional[Tuple[int, str, str]]:
+    """解析PBKDF2哈希，返回 (迭代次数, 盐值, 哈希值)"""
+    if hashed_password.startswith(PBKDF2_SCHEME + "$"):
+        parts = hashed_password.split("$")
+        if len(parts) != 4 or not parts[1].isdigit():
+            return None
+        return int(parts[1]), parts[2], parts[3]
+    if ':' in hashed_password:
         salt, stored_hash = hashed_password.split(':', 1)
-        
-        # 计算PBKDF2哈希
-        dk = hashlib.pbkdf2_hmac('sha256', plain_password.encode(), salt.encode(), 100000)
-        computed_hash = binascii.hexlify(dk).decode()
-        
-        return secrets.compare_digest(computed_hash, stored_hash)
+        return LEGACY_PBKDF2_ITERATIONS, salt, stored_hash
+    return None
+
+
+def _is_bcrypt_hash(hashed_password: str) -> bool:
+    """是否为bcrypt哈希"""
+    return hashed_password.startswith("$2")
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """验证密码"""
+    if _is_bcrypt_hash(hashed_password):
+        pwd_context = get_pwd_context()
+        if pwd_context is None:
+            return False
+        try:
+            return pwd_context.verify(plain_password, hashed_password)
+        except ValueError:
+            return False
+
+    # PBKDF2 哈希验证
+    parsed = _parse_pbkdf2(hashed_password)
+    if parsed is None:
+        return False
+    iterations, salt, stored_hash = parsed
+    return secrets.compare_digest(_pbkdf2_hex(plain_password, salt, iterations), stored_hash)
 
 
 def get_password_hash(password: str) -> str:
     """获取密码哈希值"""
-    # 使用更安全的密码哈希方式
-    try:
-        # 尝试使用bcrypt（如果可用）
-        from passlib.context import CryptContext
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    # 优先使用bcrypt，不可用时使用PBKDF2
+    pwd_context = get_pwd_context()
+    if pwd_context is not None:
         return pwd_context.hash(password)
-    except:
-        # 如果bcrypt不可用，使用安全的替代方案
-        # 使用PBKDF2进行密码哈希
-        import hashlib
-        import binascii
-        import secrets
-        
-        # 生成随机盐值
-        salt = secrets.token_hex(16)
-        
-        # 计算PBKDF2哈希
-        dk = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-        hash_value = binascii.hexlify(dk).decode()
-        
-        # 返回格式：salt:hash
+
+    salt = secrets.token_hex(16)
+    iterations = settings.PASSWORD_PBKDF2_ITERATIONS
+    hash_value = _pbkdf2_hex(password, salt, iterations)
+    if iterations == LEGACY_PBKDF2_ITERATIONS:
+        # 保持旧格式，兼容已有数据
         return f"{salt}:{hash_value}"
+    return f"{PBKDF2_SCHEME}${iterations}${salt}${hash_value}"
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """哈希算法或成本参数与当前配置不一致时需要重新哈希"""
+    pwd_context = get_pwd_context()
+    if _is_bcrypt_hash(hashed_password):
+        return pwd_context is not None and pwd_context.needs_update(hashed_password)
+    if pwd_context is not None:
+        # bcrypt可用时，将PBKDF2哈希迁移到bcrypt
+        return True
+    parsed = _parse_pbkdf2(hashed_password)
+    return parsed is not None and parsed[0] != settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    验证密码，验证通过且需要重新哈希时一并返回新哈希
+    返回 (是否通过, 新哈希或None)
+    """
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    if password_needs_rehash(hashed_password):
+        return True, get_password_hash(plain_password)
+    return True, None
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -65,7 +123,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    # jti：令牌唯一标识，用于吊销
+    to_encode.update({"exp": expire, "jti": secrets.token_urlsafe(12)})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -74,6 +133,24 @@ def verify_token(token: str) -> Optional[dict]:
     """验证令牌"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except jwt.InvalidTokenError:
-        return None
\ No newline at end of file
+        return None
+    if not settings.TOKEN_REVOCATION_ENABLED:
+        return payload
+    # 启用吊销后拒绝没有 jti 或 exp 的令牌（启用前签发的令牌无法吊销，需重新登录）
+    jti, exp = payload.get("jti"), payload.get("exp")
+    if jti is None or exp is None:
+        return None
+    # 已吊销（登出）的令牌：只在内存中判断，不访问数据库
+    if token_denylist.is_revoked(jti, exp):
+        return None
+    return payload
+
+
+def revoke_token(payload: dict) -> bool:
+    """吊销令牌（verify_token 返回的载荷），未启用吊销时返回False"""
+    jti = payload.get("jti")
+    if jti is None or not settings.TOKEN_REVOCATION_ENABLED:
+        return False
+    token_denylist.revoke(jti, float(payload["exp"]))
+    return True
\ No newline at end of file
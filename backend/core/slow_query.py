@@ -0,0 +1,177 @@
+"""
+慢查询日志
+通过引擎的 before/after_cursor_execute 事件计时，超过 SLOW_QUERY_THRESHOLD_MS 的语句记录日志
+（含参数与来源路由），并按语句形态（IN 列表长度不同的语句视为同一形态）聚合次数与耗时；
+每种形态首次变慢时在同一连接上执行一次 EXPLAIN QUERY PLAN 并保存结果，供管理接口输出 Top-N 报告
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config.settings import settings
+from core.request_context import current_route
+
+logger = logging.getLogger("slow_query")
+
+# 参数中需要脱敏的绑定名
+SENSITIVE_PARAMETER = re.compile(r"password|secret|token", re.IGNORECASE)
+# 展开后的 IN (?, ?, ...) 列表
+IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+# 支持 EXPLAIN QUERY PLAN 的语句
+EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE|INSERT)\b", re.IGNORECASE)
+
+MAX_PARAMETER_LENGTH = 200
+
+_instrumented: Dict[str, Engine] = {}
+
+
+def statement_shape(statement: str) -> str:
+    """语句形态：合并IN列表并压缩空白"""
+    return " ".join(IN_LIST.sub("(?, ...)", statement).split())
+
+
+def _redact(context, parameters) -> Any:
+    """按绑定名脱敏密码等参数，并截断过长的值"""
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        # executemany：只记录第一组参数
+        parameters = parameters[0]
+    names = getattr(getattr(context, "compiled", None), "positiontup", None)
+
+    def clean(name, value):
+        if name and SENSITIVE_PARAMETER.search(name):
+            return "***"
+        if isinstance(value, (str, bytes)) and len(value) > MAX_PARAMETER_LENGTH:
+            return value[:MAX_PARAMETER_LENGTH] + "..."
+        return value
+
+    if isinstance(parameters, dict):
+        return {key: clean(key, value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if names is None or len(names) != len(parameters):
+            names = [None] * len(parameters)
+        return [clean(name, value) for name, value in zip(names, parameters)]
+    return parameters
+
+
+class SlowQueryLog:
+    """按语句形态聚合的慢查询记录"""
+
+    def __init__(self, max_shapes: int, recent_size: int):
+        self.max_shapes = max_shapes
+        self._shapes: Dict[str, Dict[str, Any]] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=recent_size)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def record(self, conn, statement: str, parameters, context, elapsed_ms: float, executemany: bool) -> None:
+        shape = statement_shape(statement)
+        shape_id = hashlib.blake2b(shape.encode(), digest_size=6).hexdigest()
+        route = current_route()
+        params = _redact(context, parameters) if settings.SLOW_QUERY_LOG_PARAMETERS else None
+        now = datetime.utcnow()
+
+        with self._lock:
+            self.total += 1
+            entry = self._shapes.get(shape_id)
+            is_new = entry is None
+            if is_new:
+                if len(self._shapes) >= self.max_shapes:
+                    # 形态数达到上限时淘汰累计耗时最少的形态
+                    del self._shapes[min(self._shapes, key=lambda key: self._shapes[key]["total_ms"])]
+                entry = self._shapes[shape_id] = {
+                    "id": shape_id,
+                    "statement": shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": {},
+                    "plan": None,
+                    "first_seen": now,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["last_seen"] = now
+            entry["last_parameters"] = params
+            if route is not None:
+                entry["routes"][route] = entry["routes"].get(route, 0) + 1
+            self._recent.append({
+                "id": shape_id, "elapsed_ms": round(elapsed_ms, 3), "route": route, "parameters": params, "at": now,
+            })
+
+        logger.warning("慢查询 %.1fms [%s] %s 参数=%r", elapsed_ms, route or "-", shape, params)
+        if is_new and settings.SLOW_QUERY_EXPLAIN and EXPLAINABLE.match(statement):
+            plan = self._explain(conn, statement, parameters, executemany)
+            with self._lock:
+                if shape_id in self._shapes:
+                    self._shapes[shape_id]["plan"] = plan
+
+    @staticmethod
+    def _explain(conn, statement: str, parameters, executemany: bool) -> List[str]:
+        """在同一连接上执行 EXPLAIN QUERY PLAN（直接使用DBAPI游标，不会再次触发引擎事件）"""
+        if executemany and parameters:
+            parameters = parameters[0]
+        try:
+            cursor = conn.connection.cursor()
+            try:
+                prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+                cursor.execute(prefix + statement, parameters or ())
+                return [str(row[-1]) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as e:
+            return [f"EXPLAIN 失败: {e}"]
+
+    def report(self, limit: int, sort: str = "total_ms") -> Dict[str, Any]:
+        """按 total_ms / max_ms / count 排序的 Top-N 慢查询形态"""
+        with self._lock:
+            shapes = [dict(entry, routes=dict(entry["routes"])) for entry in self._shapes.values()]
+            recent = list(self._recent)
+        shapes.sort(key=lambda entry: entry[sort], reverse=True)
+        for entry in shapes:
+            entry["avg_ms"] = round(entry["total_ms"] / entry["count"], 3)
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+            entry["routes"] = sorted(entry["routes"].items(), key=lambda item: item[1], reverse=True)
+        return {
+            "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+            "total": self.total,
+            "shapes": len(shapes),
+            "top": shapes[:limit],
+            "recent": recent[-limit:][::-1],
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+            self._recent.clear()
+            self.total = 0
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_MAX_SHAPES, settings.SLOW_QUERY_RECENT_SIZE)
+
+
+def instrument_engine(sync_engine: Engine, name: str) -> None:
+    """为引擎挂载慢查询计时事件（异步引擎传入其 sync_engine）"""
+    if name in _instrumented:
+        return
+    _instrumented[name] = sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._slow_query_started) * 1000
+        if elapsed_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+            slow_query_log.record(conn, statement, parameters, context, elapsed_ms, executemany)
@@ -0,0 +1,172 @@
+"""
+个人信息延迟写入（write-behind）
+开启 PROFILE_WRITE_BEHIND_ENABLED 后，PUT /api/user/profile 不再逐次提交事务，而是把字段更新按用户合并在内存中
+（同一字段只保留最后一次的值），每隔 PROFILE_WRITE_BEHIND_INTERVAL 秒或待写入用户数达到
+PROFILE_WRITE_BEHIND_MAX_PENDING 时在一个事务中批量写入；
+写入前 get_current_user 返回的用户叠加尚未落库的字段，保证读到自己的修改；应用关闭时写入全部剩余数据。
+待写入数据只保存在当前进程中，进程异常退出时最多丢失一个周期内的修改
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam
+
+from config.settings import settings
+from core.principal_cache import principal_cache, snapshot_user
+from models.user import User, utcnow
+
+logger = logging.getLogger("write_behind")
+
+users_table = User.__table__
+
+
+class ProfileWriteBuffer:
+    """按用户合并的个人信息待写入队列"""
+
+    def __init__(self, interval: float, max_pending: int):
+        self.interval = interval
+        self.max_pending = max(1, max_pending)
+        # 用户ID -> (用户名, 待写入字段)
+        self._pending: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+        # 正在写入（已取出但尚未提交）的数据，提交前同样叠加到读取结果上
+        self._flushing: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.submitted = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.flushed_users = 0
+        self.failures = 0
+
+    def submit(self, user: User, update_data: Dict[str, Any]) -> None:
+        """加入待写入队列（同一用户的多次修改合并）"""
+        if not update_data:
+            return
+        fields = dict(update_data, updated_at=utcnow())
+        with self._lock:
+            self.submitted += 1
+            entry = self._pending.get(user.id)
+            if entry is None:
+                self._pending[user.id] = (user.username, fields)
+            else:
+                self.coalesced += 1
+                entry[1].update(fields)
+            full = len(self._pending) >= self.max_pending
+        if full and self._wakeup is not None:
+            self._wakeup.set()
+
+    def overlay(self, user: User) -> User:
+        """叠加尚未落库的字段，返回新的用户对象（不修改传入的对象，可能是缓存中的快照）"""
+        with self._lock:
+            changes = [entry[1] for entry in (self._flushing.get(user.id), self._pending.get(user.id)) if entry]
+        if not changes:
+            return user
+        overlaid = snapshot_user(user)
+        for fields in changes:
+            for field, value in fields.items():
+                setattr(overlaid, field, value)
+        return overlaid
+
+    def has_pending(self, user_id: int) -> bool:
+        with self._lock:
+            return user_id in self._pending or user_id in self._flushing
+
+    def flush(self) -> int:
+        """把当前所有待写入数据写入数据库（同步，在线程池中调用），返回写入的用户数"""
+        from database.database import engine
+
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                self._flushing, self._pending = self._pending, {}
+            batch = self._flushing
+            try:
+                self._write(engine, batch)
+            except Exception:
+                logger.exception("批量写入个人信息失败，改为逐个用户写入")
+                for user_id, entry in batch.items():
+                    try:
+                        self._write(engine, {user_id: entry})
+                    except Exception:
+                        self.failures += 1
+                        logger.exception("写入用户 %s 的个人信息失败，丢弃本次修改: %r", user_id, entry[1])
+            for username, _ in batch.values():
+                principal_cache.invalidate(username)
+            with self._lock:
+                self._flushing = {}
+                self.flushes += 1
+                self.flushed_users += len(batch)
+            return len(batch)
+
+    @staticmethod
+    def _write(engine, batch: Dict[int, Tuple[str, Dict[str, Any]]]) -> None:
+        """一个事务内写入：字段集合相同的用户合并为一条 executemany 语句"""
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for user_id, (_, fields) in batch.items():
+            keys = tuple(sorted(fields))
+            groups.setdefault(keys, []).append({"b_id": user_id, **{f"b_{key}": fields[key] for key in keys}})
+        with engine.begin() as conn:
+            for keys, rows in groups.items():
+                statement = (
+                    users_table.update()
+                    .where(users_table.c.id == bindparam("b_id"))
+                    .values({key: bindparam(f"b_{key}") for key in keys})
+                )
+                conn.execute(statement, rows)
+
+    async def flush_async(self) -> int:
+        return await run_in_threadpool(self.flush)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush_async()
+            except Exception:
+                logger.exception("个人信息延迟写入失败")
+
+    def start(self) -> None:
+        """启动定时写入任务（应用启动时调用）"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止定时写入并写入全部剩余数据（应用关闭时调用）"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush_async()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.PROFILE_WRITE_BEHIND_ENABLED,
+                "interval": self.interval,
+                "max_pending": self.max_pending,
+                "pending_users": len(self._pending),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "flushed_users": self.flushed_users,
+                "failures": self.failures,
+            }
+
+
+# 全局实例
+profile_writes = ProfileWriteBuffer(settings.PROFILE_WRITE_BEHIND_INTERVAL, settings.PROFILE_WRITE_BEHIND_MAX_PENDING)
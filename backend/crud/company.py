@@ -1,22 +1,147 @@
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from models.user import CompanyState
+from models.user import User, CompanyState
 from schemas.company import CompanyStateCreate, CompanyStateUpdate
-from typing import List, Optional
+from database.database import DBSession, run_db
+from core.company_cache import company_cache
+from core.contract_expiry import contract_expiry
+from crud.dashboard import apply_counter_deltas, company_keys_of, counter_deltas, lock_for_counters
+from core.pagination import keyset_paginate
+from core.fieldsets import load_options, refresh_full
+from core.search import SEARCH_COLUMNS, apply_search
+from core.material import MaterialCondition, material_filters
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 
 
-def get_company_state_by_id(db: Session, company_state_id: int) -> Optional[CompanyState]:
-    """根据ID获取公司状态"""
-    return db.query(CompanyState).filter(CompanyState.id == company_state_id).first()
+def _load_company_states(db: Session, condition, fields: Optional[Sequence[str]] = None) -> List[CompanyState]:
+    """按条件查询公司状态（fields 指定时只加载这些列）"""
+    return db.query(CompanyState).options(*load_options(CompanyState, fields)).filter(condition).all()
 
 
-def get_company_state_by_name(db: Session, company_name: str) -> Optional[CompanyState]:
-    """根据公司名称获取公司状态"""
-    return db.query(CompanyState).filter(CompanyState.company_name == company_name).first()
+def _cached_company_states(db: Session, key: str, condition, fields: Optional[Sequence[str]],
+                           cache_empty: bool) -> List[CompanyState]:
+    """
+    开启公司状态缓存时先查缓存（缓存完整的行）
+    指定 fields 时不经过缓存，直接按投影查询，只读取请求的列（不加载 material_info 等大字段）
+    """
+    if not company_cache.enabled or fields is not None:
+        return _load_company_states(db, condition, fields)
+    return company_cache.get_or_load(key, lambda: _load_company_states(db, condition), cache_empty)
 
 
-def get_company_states_by_user_id(db: Session, user_id: int) -> List[CompanyState]:
-    """根据用户ID获取公司状态列表"""
-    return db.query(CompanyState).filter(CompanyState.user_id == user_id).all()
+def get_company_state_by_id(db: Session, company_state_id: int, fields: Optional[Sequence[str]] = None) -> Optional[CompanyState]:
+    """根据ID获取公司状态（fields 指定时只加载这些列）"""
+    found = _cached_company_states(db, f"company:id:{company_state_id}", CompanyState.id == company_state_id,
+                                   fields, cache_empty=False)
+    return found[0] if found else None
+
+
+def get_company_state_by_name(db: Session, company_name: str, fields: Optional[Sequence[str]] = None) -> Optional[CompanyState]:
+    """根据公司名称获取公司状态（fields 指定时只加载这些列）"""
+    found = _cached_company_states(db, f"company:name:{company_name}", CompanyState.company_name == company_name,
+                                   fields, cache_empty=False)
+    return found[0] if found else None
+
+
+def get_company_states_by_user_id(db: Session, user_id: int, fields: Optional[Sequence[str]] = None) -> List[CompanyState]:
+    """根据用户ID获取公司状态列表（fields 指定时只加载这些列）"""
+    return _cached_company_states(db, f"company:user:{user_id}", CompanyState.user_id == user_id,
+                                  fields, cache_empty=True)
+
+
+def get_company_states(db: Session, skip: int = 0, limit: int = 100, fields: Optional[Sequence[str]] = None) -> List[CompanyState]:
+    """获取公司状态列表（fields 指定时只加载这些列）"""
+    return db.query(CompanyState).options(*load_options(CompanyState, fields)).offset(skip).limit(limit).all()
+
+
+def get_company_states_batch(db: Session, ids: Sequence[int] = (), names: Sequence[str] = (), user_ids: Sequence[int] = (),
+                             fields: Optional[Sequence[str]] = None) -> List[CompanyState]:
+    """
+    按ID、公司名称、用户ID批量获取公司状态（一条 IN 查询，结果为并集，按ID排序）
+    fields 指定时只加载这些列（另外总会加载用于匹配的 id、company_name、user_id）
+    """
+    conditions = []
+    if ids:
+        conditions.append(CompanyState.id.in_(set(ids)))
+    if names:
+        conditions.append(CompanyState.company_name.in_(set(names)))
+    if user_ids:
+        conditions.append(CompanyState.user_id.in_(set(user_ids)))
+    if not conditions:
+        return []
+    if fields is not None:
+        fields = list(dict.fromkeys([*fields, "id", "company_name", "user_id"]))
+    return (
+        db.query(CompanyState)
+        .options(*load_options(CompanyState, fields))
+        .filter(or_(*conditions))
+        .order_by(CompanyState.id)
+        .all()
+    )
+
+
+def get_company_states_page(db: Session, cursor: Optional[str] = None, limit: int = 100, user_id: Optional[int] = None,
+                            fields: Optional[Sequence[str]] = None):
+    """
+    键集分页获取公司状态列表，返回 (列表, 下一页游标, 上一页游标)
+    指定 user_id 时按 (user_id, id) 分页，由 ix_company_states_user_id_id 索引支撑
+    """
+    query = db.query(CompanyState).options(*load_options(CompanyState, fields))
+    if user_id is None:
+        return keyset_paginate(query, [CompanyState.id], cursor, limit)
+    query = query.filter(CompanyState.user_id == user_id)
+    return keyset_paginate(query, [CompanyState.id], cursor, limit, prefix=[CompanyState.user_id])
+
+
+def company_states_by_material_query(db: Session, conditions: Sequence[MaterialCondition],
+                                     fields: Optional[Sequence[str]] = None):
+    """按 material_info 中已建索引的JSON路径过滤公司状态的查询"""
+    return db.query(CompanyState).options(*load_options(CompanyState, fields)).filter(*material_filters(conditions))
+
+
+def get_company_states_by_material(db: Session, conditions: Sequence[MaterialCondition], cursor: Optional[str] = None,
+                                   limit: int = 100, fields: Optional[Sequence[str]] = None):
+    """按物料信息过滤并键集分页获取公司状态，返回 (列表, 下一页游标, 上一页游标)"""
+    query = company_states_by_material_query(db, conditions, fields)
+    return keyset_paginate(query, [CompanyState.id], cursor, limit)
+
+
+def get_company_states_expiring(db: Session, start: datetime, end: datetime, cursor: Optional[str] = None,
+                                limit: int = 100, fields: Optional[Sequence[str]] = None):
+    """
+    框架合同到期时间在 [start, end) 内的公司状态，按 (到期时间, ID) 键集分页，返回 (列表, 下一页游标, 上一页游标)
+    由 ix_company_states_contract_expire_id 索引支撑范围扫描与排序
+    """
+    expire = CompanyState.framework_contract_expire
+    if fields is not None:
+        fields = list(dict.fromkeys([*fields, "framework_contract_expire"]))
+    query = db.query(CompanyState).options(*load_options(CompanyState, fields)).filter(expire >= start, expire < end)
+    return keyset_paginate(query, [expire, CompanyState.id], cursor, limit)
+
+
+def search_company_states(db: Session, terms: Sequence[str], skip: int = 0, limit: int = 20, user_id: Optional[int] = None,
+                          columns: Sequence[str] = SEARCH_COLUMNS,
+                          fields: Optional[Sequence[str]] = None) -> Tuple[List[CompanyState], int]:
+    """
+    检索公司状态（名称、编码、开户银行、银行账号的子串匹配，多个词为"且"关系）
+    按相关度排序分页，返回 (本页列表, 命中总数)
+    """
+    query = db.query(CompanyState).options(*load_options(CompanyState, fields))
+    if user_id is not None:
+        query = query.filter(CompanyState.user_id == user_id)
+    query = apply_search(query, db.get_bind(), terms, columns)
+    total = query.order_by(None).count()
+    return query.offset(skip).limit(limit).all(), total
+
+
+def company_states_export_statement(columns: Sequence[str], user_id: Optional[int] = None):
+    """导出公司状态的查询语句（按ID排序，指定 user_id 时走 (user_id, id) 索引）"""
+    statement = select(*[CompanyState.__table__.c[key] for key in columns])
+    if user_id is None:
+        return statement.order_by(CompanyState.id)
+    return statement.where(CompanyState.user_id == user_id).order_by(CompanyState.user_id, CompanyState.id)
 
 
 def create_company_state(db: Session, company_state: CompanyStateCreate) -> CompanyState:
@@ -35,28 +160,194 @@ def create_company_state(db: Session, company_state: CompanyStateCreate) -> Comp
         user_id=company_state.user_id
     )
     db.add(db_company_state)
+    apply_counter_deltas(db, counter_deltas(added=company_keys_of(db_company_state)))
     db.commit()
-    db.refresh(db_company_state)
+    refresh_full(db, db_company_state)
+    company_cache.invalidate(ids=[db_company_state.id], names=[db_company_state.company_name],
+                             user_ids=[db_company_state.user_id])
+    contract_expiry.touch([db_company_state.id])
     return db_company_state
 
 
+def import_company_states(db: Session, rows: Sequence[Tuple[int, CompanyStateCreate]],
+                          seen_names: Set[str]) -> Tuple[int, List[Dict]]:
+    """
+    批量导入一批已校验的公司状态，单个事务内 executemany 插入
+    公司名称（含本次导入中已出现的 seen_names）与用户ID按集合一次性查重
+    返回 (插入行数, 行错误列表[{"line", "errors"}])
+    """
+    errors: List[Dict] = []
+    names = {item.company_name for _, item in rows}
+    user_ids = {item.user_id for _, item in rows}
+    existing_names = set(db.execute(
+        select(CompanyState.company_name).where(CompanyState.company_name.in_(names))
+    ).scalars()) if names else set()
+    existing_users = set(db.execute(
+        select(User.id).where(User.id.in_(user_ids))
+    ).scalars()) if user_ids else set()
+
+    pending: List[Tuple[int, Dict]] = []
+    for line_no, item in rows:
+        if item.company_name in existing_names or item.company_name in seen_names:
+            errors.append({"line": line_no, "errors": ["company_name: 公司名称已存在"]})
+            continue
+        if item.user_id not in existing_users:
+            errors.append({"line": line_no, "errors": ["user_id: 用户不存在"]})
+            continue
+        seen_names.add(item.company_name)
+        pending.append((line_no, item.model_dump()))
+
+    if not pending:
+        return 0, errors
+
+    # 使用Core insert，跳过ORM逐行状态处理
+    statement = insert(CompanyState.__table__)
+    try:
+        db.execute(statement, [values for _, values in pending])
+        added = [key for _, values in pending for key in company_keys_of(values)]
+        apply_counter_deltas(db, counter_deltas(added=added))
+        db.commit()
+        _invalidate_imported(pending)
+        return len(pending), errors
+    except IntegrityError:
+        # 查重后被并发写入抢先，退回逐行插入以定位冲突行
+        db.rollback()
+
+    inserted = 0
+    added = []
+    for line_no, values in pending:
+        try:
+            with db.begin_nested():
+                db.execute(statement, [values])
+            inserted += 1
+            added.extend(company_keys_of(values))
+        except IntegrityError as e:
+            seen_names.discard(values["company_name"])
+            errors.append({"line": line_no, "errors": [f"数据冲突: {e.orig}"]})
+    apply_counter_deltas(db, counter_deltas(added=added))
+    db.commit()
+    _invalidate_imported(pending)
+    return inserted, errors
+
+
+def _invalidate_imported(pending: Sequence[Tuple[int, Dict]]) -> None:
+    """导入后使涉及的公司名称与用户ID的缓存失效（导入前不存在的行不会有按ID缓存的条目）"""
+    company_cache.invalidate(names=[values["company_name"] for _, values in pending],
+                             user_ids={values["user_id"] for _, values in pending})
+    if any(values.get("framework_contract_expire") is not None for _, values in pending):
+        contract_expiry.touch()
+
+
 def update_company_state(db: Session, company_state_id: int, company_state_update: CompanyStateUpdate) -> Optional[CompanyState]:
-    """更新公司状态"""
-    db_company_state = get_company_state_by_id(db, company_state_id)
+    """更新公司状态（旧值在写锁内重新读取，用于计算汇总计数的增量）"""
+    lock_for_counters(db)
+    db_company_state = (
+        db.query(CompanyState).options(*load_options(CompanyState)).filter(CompanyState.id == company_state_id)
+        .populate_existing().with_for_update().first()
+    )
     if db_company_state:
+        old_name, old_user_id = db_company_state.company_name, db_company_state.user_id
+        old_keys = company_keys_of(db_company_state)
         update_data = company_state_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_company_state, field, value)
+        apply_counter_deltas(db, counter_deltas(old_keys, company_keys_of(db_company_state)))
         db.commit()
-        db.refresh(db_company_state)
+        refresh_full(db, db_company_state)
+        company_cache.invalidate(ids=[company_state_id], names={old_name, db_company_state.company_name},
+                                 user_ids={old_user_id, db_company_state.user_id})
+        contract_expiry.touch([company_state_id])
     return db_company_state
 
 
 def delete_company_state(db: Session, company_state_id: int) -> bool:
-    """删除公司状态"""
-    db_company_state = get_company_state_by_id(db, company_state_id)
+    """删除公司状态（旧值在写锁内重新读取，用于计算汇总计数的增量）"""
+    lock_for_counters(db)
+    db_company_state = (
+        db.query(CompanyState).filter(CompanyState.id == company_state_id)
+        .populate_existing().with_for_update().first()
+    )
     if db_company_state:
+        name, user_id = db_company_state.company_name, db_company_state.user_id
         db.delete(db_company_state)
+        apply_counter_deltas(db, counter_deltas(removed=company_keys_of(db_company_state)))
         db.commit()
+        company_cache.invalidate(ids=[company_state_id], names=[name], user_ids=[user_id])
+        contract_expiry.touch([company_state_id])
         return True
-    return False
\ No newline at end of file
+    return False
+
+# 异步版本：db 可以是 AsyncSession（异步模式）或 Session（同步模式，自动放入线程池）
+
+async def get_company_state_by_id_async(db: DBSession, company_state_id: int, fields: Optional[Sequence[str]] = None) -> Optional[CompanyState]:
+    """根据ID获取公司状态（异步）"""
+    return await run_db(db, get_company_state_by_id, company_state_id, fields=fields)
+
+
+async def get_company_state_by_name_async(db: DBSession, company_name: str, fields: Optional[Sequence[str]] = None) -> Optional[CompanyState]:
+    """根据公司名称获取公司状态（异步）"""
+    return await run_db(db, get_company_state_by_name, company_name, fields=fields)
+
+
+async def get_company_states_by_user_id_async(db: DBSession, user_id: int, fields: Optional[Sequence[str]] = None) -> List[CompanyState]:
+    """根据用户ID获取公司状态列表（异步）"""
+    return await run_db(db, get_company_states_by_user_id, user_id, fields=fields)
+
+
+async def get_company_states_async(db: DBSession, skip: int = 0, limit: int = 100, fields: Optional[Sequence[str]] = None) -> List[CompanyState]:
+    """获取公司状态列表（异步）"""
+    return await run_db(db, get_company_states, skip=skip, limit=limit, fields=fields)
+
+
+async def get_company_states_batch_async(db: DBSession, ids: Sequence[int] = (), names: Sequence[str] = (),
+                                         user_ids: Sequence[int] = (), fields: Optional[Sequence[str]] = None) -> List[CompanyState]:
+    """按ID、公司名称、用户ID批量获取公司状态（异步）"""
+    return await run_db(db, get_company_states_batch, ids=ids, names=names, user_ids=user_ids, fields=fields)
+
+
+async def get_company_states_page_async(db: DBSession, cursor: Optional[str] = None, limit: int = 100, user_id: Optional[int] = None,
+                                        fields: Optional[Sequence[str]] = None):
+    """键集分页获取公司状态列表（异步）"""
+    return await run_db(db, get_company_states_page, cursor=cursor, limit=limit, user_id=user_id, fields=fields)
+
+
+async def get_company_states_by_material_async(db: DBSession, conditions: Sequence[MaterialCondition],
+                                               cursor: Optional[str] = None, limit: int = 100,
+                                               fields: Optional[Sequence[str]] = None):
+    """按物料信息过滤并键集分页获取公司状态（异步）"""
+    return await run_db(db, get_company_states_by_material, conditions, cursor=cursor, limit=limit, fields=fields)
+
+
+async def get_company_states_expiring_async(db: DBSession, start: datetime, end: datetime, cursor: Optional[str] = None,
+                                            limit: int = 100, fields: Optional[Sequence[str]] = None):
+    """框架合同在指定时间窗口内到期的公司状态（异步）"""
+    return await run_db(db, get_company_states_expiring, start, end, cursor=cursor, limit=limit, fields=fields)
+
+
+async def search_company_states_async(db: DBSession, terms: Sequence[str], skip: int = 0, limit: int = 20,
+                                      user_id: Optional[int] = None, columns: Sequence[str] = SEARCH_COLUMNS,
+                                      fields: Optional[Sequence[str]] = None) -> Tuple[List[CompanyState], int]:
+    """检索公司状态（异步）"""
+    return await run_db(db, search_company_states, terms, skip=skip, limit=limit, user_id=user_id,
+                        columns=columns, fields=fields)
+
+
+async def create_company_state_async(db: DBSession, company_state: CompanyStateCreate) -> CompanyState:
+    """创建公司状态（异步）"""
+    return await run_db(db, create_company_state, company_state)
+
+
+async def import_company_states_async(db: DBSession, rows: Sequence[Tuple[int, CompanyStateCreate]],
+                                      seen_names: Set[str]) -> Tuple[int, List[Dict]]:
+    """批量导入一批公司状态（异步）"""
+    return await run_db(db, import_company_states, rows, seen_names)
+
+
+async def update_company_state_async(db: DBSession, company_state_id: int, company_state_update: CompanyStateUpdate) -> Optional[CompanyState]:
+    """更新公司状态（异步）"""
+    return await run_db(db, update_company_state, company_state_id, company_state_update)
+
+
+async def delete_company_state_async(db: DBSession, company_state_id: int) -> bool:
+    """删除公司状态（异步）"""
+    return await run_db(db, delete_company_state, company_state_id)
@@ -0,0 +1,284 @@
+"""
+仪表盘汇总计数
+dashboard_counters 表按 (指标, 分组值) 保存计数，由 crud.user / crud.company 的写入路径在同一事务内增量更新，
+仪表盘统计只读取这张小表，不扫描 users / company_states：
+- users_by_role：分组值为 "角色:是否启用(0/1)"
+- companies_by_user：分组值为用户ID
+- companies_by_warranty_year：分组值为质保年（未填写为空字符串）
+- contracts_by_expiry_date：分组值为框架合同到期日期 YYYY-MM-DD（未填写不计）
+rebuild_counters 按全表 GROUP BY 重新计算，check_counters 比较两者的差异。
+
+命令行（在 backend 目录下执行）：
+    python -m crud.dashboard check     # 不一致时以非零状态码退出
+    python -m crud.dashboard rebuild
+"""
+
+import sys
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, delete, false, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from database.database import DBSession, run_db
+from models.user import User, CompanyState, DashboardCounter, utcnow
+
+USERS_BY_ROLE = "users_by_role"
+COMPANIES_BY_USER = "companies_by_user"
+COMPANIES_BY_WARRANTY_YEAR = "companies_by_warranty_year"
+CONTRACTS_BY_EXPIRY_DATE = "contracts_by_expiry_date"
+
+# 仪表盘统计的合同到期窗口（天）
+EXPIRY_WINDOWS = (30, 60, 90)
+TOP_USERS = 10
+
+CounterKey = Tuple[str, str]
+
+counters_table = DashboardCounter.__table__
+
+
+def user_counter_keys(role: Optional[str], is_active: Optional[bool]) -> List[CounterKey]:
+    """一个用户计入的计数"""
+    return [(USERS_BY_ROLE, f"{role or 'user'}:{int(is_active is not False)}")]
+
+
+def company_counter_keys(user_id: int, warranty_year: Optional[int],
+                         framework_contract_expire: Optional[datetime]) -> List[CounterKey]:
+    """一条公司状态计入的计数"""
+    keys = [
+        (COMPANIES_BY_USER, str(user_id)),
+        (COMPANIES_BY_WARRANTY_YEAR, "" if warranty_year is None else str(warranty_year)),
+    ]
+    if framework_contract_expire is not None:
+        keys.append((CONTRACTS_BY_EXPIRY_DATE, framework_contract_expire.date().isoformat()))
+    return keys
+
+
+def company_keys_of(company) -> List[CounterKey]:
+    """公司状态对象（或列字典）计入的计数"""
+    get = company.get if isinstance(company, dict) else lambda key: getattr(company, key)
+    return company_counter_keys(get("user_id"), get("warranty_year"), get("framework_contract_expire"))
+
+
+def counter_deltas(removed: Iterable[CounterKey] = (), added: Iterable[CounterKey] = ()) -> Counter:
+    """由移除与新增的计数键得到增量（相同的键相互抵消）"""
+    deltas = Counter(added)
+    deltas.subtract(Counter(removed))
+    return deltas
+
+
+def lock_for_counters(db: Session) -> None:
+    """
+    在读取将被修改行的旧值之前调用，使“读旧值、算增量、写入”处于同一个写事务内
+    pysqlite 的 SELECT 在隐式 BEGIN 之前执行、不在写事务中，两个并发事务会减去同一组旧计数；
+    SQLite 下先执行一条不删除任何行的 DELETE 取得数据库写锁，其他写事务等待本事务提交后才能读取旧值。
+    其他数据库由读取旧值时的 SELECT ... FOR UPDATE 锁定行
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(delete(counters_table).where(false()))
+
+
+def apply_counter_deltas(db: Session, deltas: Counter) -> None:
+    """
+    在当前事务内累加计数（INSERT ... ON CONFLICT DO UPDATE），与业务写入一起提交或回滚
+    减到0的分组删除，避免汇总表随历史数据增长
+    """
+    rows = [{"metric": metric, "bucket": bucket, "value": delta} for (metric, bucket), delta in deltas.items() if delta]
+    if not rows:
+        return
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = insert(counters_table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[counters_table.c.metric, counters_table.c.bucket],
+        set_={"value": counters_table.c.value + statement.excluded.value},
+    )
+    db.execute(statement, rows)
+    decreased = [(row["metric"], row["bucket"]) for row in rows if row["value"] < 0]
+    if decreased:
+        db.execute(delete(counters_table).where(
+            tuple_(counters_table.c.metric, counters_table.c.bucket).in_(decreased),
+            counters_table.c.value == 0,
+        ))
+
+
+# ---- 统计查询 ----
+
+def _bucket_values(db: Session, metric: str, *conditions) -> List[Tuple[str, int]]:
+    return db.execute(
+        select(counters_table.c.bucket, counters_table.c.value)
+        .where(counters_table.c.metric == metric, *conditions)
+    ).all()
+
+
+def _bucket_sum(db: Session, metric: str, *conditions) -> int:
+    return db.execute(
+        select(func.coalesce(func.sum(counters_table.c.value), 0))
+        .where(counters_table.c.metric == metric, *conditions)
+    ).scalar()
+
+
+def _bucket_count(db: Session, metric: str) -> int:
+    return db.execute(
+        select(func.count()).select_from(counters_table)
+        .where(counters_table.c.metric == metric, counters_table.c.value > 0)
+    ).scalar()
+
+
+def get_dashboard_stats(db: Session, today: Optional[date] = None) -> Dict:
+    """仪表盘统计（只读取汇总表）"""
+    today = today or utcnow().date()
+
+    by_role: Dict[str, Dict[str, int]] = {}
+    for bucket, value in _bucket_values(db, USERS_BY_ROLE):
+        role, active = bucket.rsplit(":", 1)
+        counts = by_role.setdefault(role, {"active": 0, "inactive": 0})
+        counts["active" if active == "1" else "inactive"] += value
+    active_users = sum(counts["active"] for counts in by_role.values())
+    inactive_users = sum(counts["inactive"] for counts in by_role.values())
+
+    by_year = {bucket or "unknown": value for bucket, value in _bucket_values(db, COMPANIES_BY_WARRANTY_YEAR)}
+    total_companies = sum(by_year.values())
+    users_with_companies = _bucket_count(db, COMPANIES_BY_USER)
+    top_users = db.execute(
+        select(counters_table.c.bucket, counters_table.c.value)
+        .where(counters_table.c.metric == COMPANIES_BY_USER)
+        .order_by(counters_table.c.value.desc(), counters_table.c.bucket)
+        .limit(TOP_USERS)
+    ).all()
+
+    expiry = counters_table.c.bucket
+    today_text = today.isoformat()
+    expiring = {
+        f"within_{days}_days": _bucket_sum(
+            db, CONTRACTS_BY_EXPIRY_DATE,
+            and_(expiry >= today_text, expiry <= (today + timedelta(days=days)).isoformat()),
+        )
+        for days in EXPIRY_WINDOWS
+    }
+    expiring["expired"] = _bucket_sum(db, CONTRACTS_BY_EXPIRY_DATE, expiry < today_text)
+
+    return {
+        "users": {
+            "total": active_users + inactive_users,
+            "active": active_users,
+            "inactive": inactive_users,
+            "by_role": by_role,
+        },
+        "companies": {
+            "total": total_companies,
+            "users_with_companies": users_with_companies,
+            "per_user_avg": total_companies / users_with_companies if users_with_companies else 0.0,
+            "top_users": [{"user_id": int(bucket), "companies": value} for bucket, value in top_users],
+            "by_warranty_year": dict(sorted(by_year.items())),
+        },
+        "contracts": {"date": today_text, **expiring},
+    }
+
+
+# ---- 重建与一致性检查 ----
+
+def compute_counters(conn) -> Counter:
+    """按 users / company_states 全表 GROUP BY 计算全部计数"""
+    counts: Counter = Counter()
+    users = User.__table__.c
+    for role, is_active, value in conn.execute(
+        select(users.role, users.is_active, func.count()).group_by(users.role, users.is_active)
+    ):
+        for key in user_counter_keys(role, is_active):
+            counts[key] += value
+    companies = CompanyState.__table__.c
+    for user_id, value in conn.execute(select(companies.user_id, func.count()).group_by(companies.user_id)):
+        counts[(COMPANIES_BY_USER, str(user_id))] += value
+    for year, value in conn.execute(select(companies.warranty_year, func.count()).group_by(companies.warranty_year)):
+        counts[(COMPANIES_BY_WARRANTY_YEAR, "" if year is None else str(year))] += value
+    for expire, value in conn.execute(
+        select(companies.framework_contract_expire, func.count())
+        .where(companies.framework_contract_expire.is_not(None))
+        .group_by(companies.framework_contract_expire)
+    ):
+        counts[(CONTRACTS_BY_EXPIRY_DATE, expire.date().isoformat())] += value
+    return counts
+
+
+def stored_counters(conn) -> Counter:
+    """汇总表中的全部计数"""
+    return Counter({(metric, bucket): value for metric, bucket, value in conn.execute(
+        select(counters_table.c.metric, counters_table.c.bucket, counters_table.c.value)
+    ) if value})
+
+
+def rebuild_counters_on(conn: Connection) -> int:
+    """
+    在给定连接（调用方负责事务）上重建汇总表，返回分组数
+    先执行删除以取得写锁（SQLite），统计期间其他写入等待本事务提交，不会丢失增量
+    """
+    conn.execute(delete(counters_table))
+    counts = compute_counters(conn)
+    if counts:
+        conn.execute(counters_table.insert(), [
+            {"metric": metric, "bucket": bucket, "value": value} for (metric, bucket), value in counts.items()
+        ])
+    return len(counts)
+
+
+def rebuild_counters(db: Session) -> int:
+    """重建汇总表（一个事务内完成）"""
+    buckets = rebuild_counters_on(db.connection())
+    db.commit()
+    return buckets
+
+
+def check_counters(db: Session) -> Dict:
+    """比较汇总表与全表统计，返回不一致的分组（期望值、实际值）"""
+    expected = compute_counters(db)
+    stored = stored_counters(db)
+    mismatches = [
+        {"metric": metric, "bucket": bucket, "expected": expected.get((metric, bucket), 0),
+         "stored": stored.get((metric, bucket), 0)}
+        for metric, bucket in sorted(set(expected) | set(stored))
+        if expected.get((metric, bucket), 0) != stored.get((metric, bucket), 0)
+    ]
+    return {"consistent": not mismatches, "buckets": len(expected), "mismatches": mismatches}
+
+# 异步版本：db 可以是 AsyncSession（异步模式）或 Session（同步模式，自动放入线程池）
+
+async def get_dashboard_stats_async(db: DBSession, today: Optional[date] = None) -> Dict:
+    """仪表盘统计（异步）"""
+    return await run_db(db, get_dashboard_stats, today)
+
+
+async def rebuild_counters_async(db: DBSession) -> int:
+    """重建汇总表（异步）"""
+    return await run_db(db, rebuild_counters)
+
+
+async def check_counters_async(db: DBSession) -> Dict:
+    """一致性检查（异步）"""
+    return await run_db(db, check_counters)
+
+
+def main(argv: Sequence[str]) -> None:
+    from database.database import SessionLocal
+
+    if len(argv) != 1 or argv[0] not in ("check", "rebuild"):
+        print("用法: python -m crud.dashboard check|rebuild")
+        sys.exit(2)
+    with SessionLocal() as db:
+        if argv[0] == "rebuild":
+            print(f"已重建 {rebuild_counters(db)} 个分组")
+            return
+        result = check_counters(db)
+    for item in result["mismatches"]:
+        print(f"{item['metric']}[{item['bucket']}]: 期望 {item['expected']}，汇总表 {item['stored']}")
+    if not result["consistent"]:
+        print(f"{len(result['mismatches'])} 个分组不一致，可执行 python -m crud.dashboard rebuild 重建")
+        sys.exit(1)
+    print(f"一致（{result['buckets']} 个分组）")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
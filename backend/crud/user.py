@@ -1,19 +1,30 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from models.user import User
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import or_, select
+from models.user import User, CompanyState
 from schemas.user import UserCreate, UserUpdate
-from core.security import get_password_hash, verify_password
-from typing import Optional, List
+from core.security import get_password_hash, verify_and_update_password
+from core.hashing import hash_password_async, verify_password_async
+from core.principal_cache import principal_cache
+from core.company_cache import company_cache
+from core.contract_expiry import contract_expiry
+from crud.dashboard import apply_counter_deltas, company_keys_of, counter_deltas, lock_for_counters, user_counter_keys
+from core.pagination import keyset_paginate
+from core.fieldsets import load_options, refresh_full
+from database.database import DBSession, run_db
+from typing import Optional, List, Sequence, Union
 
+# 登录校验必须加载的列
+AUTH_FIELDS = ("id", "username", "hashed_password", "is_active")
 
-def get_user(db: Session, user_id: int) -> Optional[User]:
-    """根据ID获取用户"""
-    return db.query(User).filter(User.id == user_id).first()
 
+def get_user(db: Session, user_id: int, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+    """根据ID获取用户（fields 指定时只加载这些列）"""
+    return db.query(User).options(*load_options(User, fields)).filter(User.id == user_id).first()
 
-def get_user_by_username(db: Session, username: str) -> Optional[User]:
-    """根据用户名获取用户"""
-    return db.query(User).filter(User.username == username).first()
+
+def get_user_by_username(db: Session, username: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+    """根据用户名获取用户（fields 指定时只加载这些列）"""
+    return db.query(User).options(*load_options(User, fields)).filter(User.username == username).first()
 
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
@@ -21,14 +32,43 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    """获取用户列表"""
-    return db.query(User).offset(skip).limit(limit).all()
+def get_user_by_login(db: Session, username: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+    """根据用户名或邮箱获取用户（登录使用，fields 指定时只加载这些列）"""
+    return db.query(User).options(*load_options(User, fields)).filter(
+        or_(User.username == username, User.email == username)
+    ).first()
 
 
-def create_user(db: Session, user: UserCreate) -> User:
-    """创建新用户"""
-    hashed_password = get_password_hash(user.password)
+def get_users(db: Session, skip: int = 0, limit: int = 100, fields: Optional[Sequence[str]] = None) -> List[User]:
+    """获取用户列表（fields 指定时只加载这些列）"""
+    return db.query(User).options(*load_options(User, fields)).offset(skip).limit(limit).all()
+
+
+def get_users_page(db: Session, cursor: Optional[str] = None, limit: int = 100, fields: Optional[Sequence[str]] = None):
+    """按 id 键集分页获取用户列表，返回 (用户列表, 下一页游标, 上一页游标)"""
+    query = db.query(User).options(*load_options(User, fields))
+    return keyset_paginate(query, [User.id], cursor, limit)
+
+
+def users_export_statement(columns: Sequence[str]):
+    """导出用户的查询语句（只选取给定的列，按ID排序）"""
+    return select(*[User.__table__.c[key] for key in columns]).order_by(User.id)
+
+
+def get_users_with_companies_page(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    """
+    键集分页获取用户及其公司状态，返回 (列表, 下一页游标, 上一页游标)
+    公司状态通过 selectinload 一次 IN 查询批量加载，避免逐个用户懒加载（N+1）
+    """
+    query = db.query(User).options(
+        *load_options(User),
+        selectinload(User.company_states).options(*load_options(CompanyState)),
+    )
+    return keyset_paginate(query, [User.id], cursor, limit)
+
+
+def _insert_user(db: Session, user: UserCreate, hashed_password: str) -> User:
+    """写入新用户（密码已完成哈希）"""
     db_user = User(
         username=user.username,
         email=user.email,
@@ -38,40 +78,155 @@ def create_user(db: Session, user: UserCreate) -> User:
         is_active=user.is_active
     )
     db.add(db_user)
+    apply_counter_deltas(db, counter_deltas(added=user_counter_keys(user.role, user.is_active)))
     db.commit()
-    db.refresh(db_user)
+    refresh_full(db, db_user)
     return db_user
 
 
-def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[User]:
-    """更新用户信息"""
-    db_user = db.query(User).filter(User.id == user_id).first()
+def create_user(db: Session, user: UserCreate) -> User:
+    """创建新用户"""
+    hashed_password = get_password_hash(user.password)
+    return _insert_user(db, user, hashed_password)
+
+
+def update_user(db: Session, user_id: int, user_update: Union[UserUpdate, dict]) -> Optional[User]:
+    """更新用户信息（旧的角色与启用状态在写锁内重新读取，用于计算汇总计数的增量）"""
+    lock_for_counters(db)
+    db_user = db.query(User).filter(User.id == user_id).populate_existing().with_for_update().first()
     if db_user:
-        update_data = user_update.model_dump(exclude_unset=True)
+        if isinstance(user_update, dict):
+            update_data = user_update
+        else:
+            update_data = user_update.model_dump(exclude_unset=True)
+        old_keys = user_counter_keys(db_user.role, db_user.is_active)
         for field, value in update_data.items():
             setattr(db_user, field, value)
+        apply_counter_deltas(db, counter_deltas(old_keys, user_counter_keys(db_user.role, db_user.is_active)))
         db.commit()
-        db.refresh(db_user)
+        refresh_full(db, db_user)
+        principal_cache.invalidate(db_user.username)
     return db_user
 
 
-def delete_user(db: Session, user_id: int) -> bool:
-    """删除用户"""
+def update_password_hash(db: Session, user_id: int, hashed_password: str) -> None:
+    """更新用户密码哈希（登录时哈希参数升级使用）"""
     db_user = db.query(User).filter(User.id == user_id).first()
     if db_user:
+        db_user.hashed_password = hashed_password
+        db.commit()
+        principal_cache.invalidate(db_user.username)
+
+
+def delete_user(db: Session, user_id: int) -> bool:
+    """删除用户（用户及其公司状态在写锁内重新读取，用于计算汇总计数的增量）"""
+    lock_for_counters(db)
+    db_user = (
+        db.query(User).options(selectinload(User.company_states)).filter(User.id == user_id)
+        .populate_existing().with_for_update().first()
+    )
+    if db_user:
+        username = db_user.username
+        # 级联删除的公司状态同样需要使缓存失效
+        companies = [(company.id, company.company_name) for company in db_user.company_states]
+        removed = user_counter_keys(db_user.role, db_user.is_active)
+        for company in db_user.company_states:
+            removed.extend(company_keys_of(company))
         db.delete(db_user)
+        apply_counter_deltas(db, counter_deltas(removed=removed))
         db.commit()
+        principal_cache.invalidate(username)
+        company_cache.invalidate(ids=[company_id for company_id, _ in companies],
+                                 names=[name for _, name in companies], user_ids=[user_id])
+        contract_expiry.touch([company_id for company_id, _ in companies])
         return True
     return False
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
-    """用户认证"""
-    user = db.query(User).filter(
-        or_(User.username == username, User.email == username)
-    ).first()
+def _auth_fields(fields: Optional[Sequence[str]]) -> Optional[List[str]]:
+    """在指定字段基础上补充登录校验所需的列"""
+    if fields is None:
+        return None
+    return list(dict.fromkeys([*AUTH_FIELDS, *fields]))
+
+
+def authenticate_user(db: Session, username: str, password: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+    """用户认证（fields 指定时只额外加载这些列）"""
+    user = get_user_by_login(db, username, fields=_auth_fields(fields))
+    if not user:
+        return None
+    verified, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not verified:
+        return None
+    if new_hash:
+        update_password_hash(db, user.id, new_hash)
+    return user
+
+
+# 异步版本：db 可以是 AsyncSession（异步模式）或 Session（同步模式，自动放入线程池）
+
+async def get_user_async(db: DBSession, user_id: int, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+    """根据ID获取用户（异步）"""
+    return await run_db(db, get_user, user_id, fields=fields)
+
+
+async def get_user_by_username_async(db: DBSession, username: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+    """根据用户名获取用户（异步）"""
+    return await run_db(db, get_user_by_username, username, fields=fields)
+
+
+async def get_user_by_email_async(db: DBSession, email: str) -> Optional[User]:
+    """根据邮箱获取用户（异步）"""
+    return await run_db(db, get_user_by_email, email)
+
+
+async def get_user_by_login_async(db: DBSession, username: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+    """根据用户名或邮箱获取用户（异步）"""
+    return await run_db(db, get_user_by_login, username, fields=fields)
+
+
+async def get_users_async(db: DBSession, skip: int = 0, limit: int = 100, fields: Optional[Sequence[str]] = None) -> List[User]:
+    """获取用户列表（异步）"""
+    return await run_db(db, get_users, skip=skip, limit=limit, fields=fields)
+
+
+async def get_users_page_async(db: DBSession, cursor: Optional[str] = None, limit: int = 100, fields: Optional[Sequence[str]] = None):
+    """按 id 键集分页获取用户列表（异步）"""
+    return await run_db(db, get_users_page, cursor=cursor, limit=limit, fields=fields)
+
+
+async def get_users_with_companies_page_async(db: DBSession, cursor: Optional[str] = None, limit: int = 100):
+    """键集分页获取用户及其公司状态（异步）"""
+    return await run_db(db, get_users_with_companies_page, cursor=cursor, limit=limit)
+
+
+async def create_user_async(db: DBSession, user: UserCreate) -> User:
+    """创建新用户（异步，密码哈希在独立哈希进程池中计算）"""
+    hashed_password = await hash_password_async(user.password)
+    return await run_db(db, _insert_user, user, hashed_password)
+
+
+async def update_user_async(db: DBSession, user_id: int, user_update: Union[UserUpdate, dict]) -> Optional[User]:
+    """更新用户信息（异步）"""
+    return await run_db(db, update_user, user_id, user_update)
+
+
+async def delete_user_async(db: DBSession, user_id: int) -> bool:
+    """删除用户（异步）"""
+    return await run_db(db, delete_user, user_id)
+
+
+async def authenticate_user_async(db: DBSession, username: str, password: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+    """
+    用户认证（异步，密码校验在独立哈希进程池中计算，不阻塞事件循环）
+    哈希排队已满或超时时抛出 PasswordHashBusyError
+    """
+    user = await get_user_by_login_async(db, username, fields=_auth_fields(fields))
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await verify_password_async(password, user.hashed_password)
+    if not verified:
         return None
-    return user
\ No newline at end of file
+    if new_hash:
+        await run_db(db, update_password_hash, user.id, new_hash)
+    return user
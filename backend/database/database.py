@@ -1,34 +1,213 @@
-from sqlalchemy import create_engine
+import itertools
+from contextvars import ContextVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Union
+from fastapi.concurrency import run_in_threadpool
 from config.settings import settings
 
+
+def is_sqlite(url: str) -> bool:
+    """是否为SQLite数据库"""
+    return url.startswith("sqlite")
+
+
+def is_sqlite_memory(url: str) -> bool:
+    """是否为内存SQLite数据库"""
+    return is_sqlite(url) and (":memory:" in url or url.rstrip("/").endswith(":"))
+
+
+def get_engine_options(url: str) -> Dict[str, Any]:
+    """根据配置生成引擎参数（连接池大小、溢出、回收时间等）"""
+    options: Dict[str, Any] = {}
+    if is_sqlite(url) and "aiosqlite" not in url:
+        options["connect_args"] = {"check_same_thread": False}
+    if not is_sqlite_memory(url):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """新连接建立时设置SQLite PRAGMA（WAL、同步级别、缓存、mmap、忙等待）"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def set_sqlite_query_only(dbapi_connection, connection_record) -> None:
+    """只读副本连接禁止写入（在其他 PRAGMA 之后设置）"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def configure_engine(sync_engine: Engine, read_only: bool = False) -> Engine:
+    """为引擎挂载连接事件（异步引擎传入其 sync_engine）"""
+    if is_sqlite(str(sync_engine.url)):
+        if settings.SQLITE_TUNING_ENABLED:
+            event.listen(sync_engine, "connect", set_sqlite_pragmas)
+        if read_only:
+            event.listen(sync_engine, "connect", set_sqlite_query_only)
+    return sync_engine
+
+
+def create_db_engine(url: str = settings.DATABASE_URL, read_only: bool = False) -> Engine:
+    """按配置创建同步数据库引擎"""
+    return configure_engine(create_engine(url, **get_engine_options(url)), read_only)
+
+
 # 创建数据库引擎
-engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+engine = create_db_engine()
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 只读副本引擎（DATABASE_REPLICA_URLS），读请求按轮询使用
+replica_engines: List[Engine] = [create_db_engine(url, read_only=True) for url in settings.DATABASE_REPLICA_URLS]
+
+# 当前请求的读取是否使用副本，由 DBRoutingMiddleware 按请求方法与粘滞Cookie设置；默认使用主库
+use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+
+_next_replica = itertools.cycle(range(len(replica_engines))) if replica_engines else None
+
+
+def get_read_engine() -> Engine:
+    """当前请求的读取引擎：需要使用副本时轮询选择，否则为主库"""
+    if _next_replica is None or not use_replica.get():
+        return engine
+    return replica_engines[next(_next_replica)]
+
 # 创建基类
 Base = declarative_base()
 
 
+# 同步驱动 -> 异步驱动 的URL映射
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def to_async_url(url: str) -> str:
+    """同步连接地址转换为对应异步驱动的地址"""
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+def get_async_database_url() -> str:
+    """获取异步数据库连接地址"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return to_async_url(settings.DATABASE_URL)
+
+
+# 异步引擎与会话工厂（仅在异步模式下创建，避免同步模式依赖异步驱动）
+async_engine = None
+AsyncSessionLocal = None
+async_replica_engines: list = []
+if settings.DB_ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    _async_url = get_async_database_url()
+    async_engine = create_async_engine(_async_url, **get_engine_options(_async_url))
+    configure_engine(async_engine.sync_engine)
+    # expire_on_commit=False：提交后对象属性仍可直接读取，避免在事件循环中触发隐式IO
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    for _url in map(to_async_url, settings.DATABASE_REPLICA_URLS):
+        _replica = create_async_engine(_url, **get_engine_options(_url))
+        configure_engine(_replica.sync_engine, read_only=True)
+        async_replica_engines.append(_replica)
+
+
+def get_async_read_engine():
+    """当前请求的异步读取引擎"""
+    if _next_replica is None or not use_replica.get():
+        return async_engine
+    return async_replica_engines[next(_next_replica)]
+
+
 def get_db():
     """
-    获取数据库会话的依赖函数
+    获取数据库会话的依赖函数（只读请求绑定副本引擎）
     """
-    db = SessionLocal()
+    db = SessionLocal(bind=get_read_engine())
     try:
         yield db
     finally:
         db.close()
 
 
-def create_tables():
+async def get_async_db():
+    """
+    获取异步数据库会话的依赖函数
+    """
+    async with AsyncSessionLocal(bind=get_async_read_engine()) as db:
+        yield db
+
+
+# 路由/CRUD中通用的会话类型（同步模式下不导入 sqlalchemy.ext.asyncio，缩短启动时间）
+if TYPE_CHECKING or settings.DB_ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    DBSession = Union[Session, AsyncSession]
+else:
+    DBSession = Session
+
+# 路由使用的会话依赖，由 DB_ASYNC_MODE 决定同步/异步实现
+get_session = get_async_db if settings.DB_ASYNC_MODE else get_db
+
+
+async def run_db(db: DBSession, fn, *args, **kwargs):
     """
-    创建所有表
+    在给定会话上执行同步CRUD函数
+    异步会话通过 run_sync 在事件循环内执行（IO由异步驱动完成），
+    同步会话则放入线程池执行，避免阻塞事件循环
     """
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    if settings.DB_ASYNC_MODE:
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def stream_rows(statement, batch_size: int = 1000) -> AsyncIterator[List[Any]]:
+    """
+    通过服务端游标分批读取查询结果（每批最多 batch_size 行），内存占用与结果集大小无关
+    使用独立连接而非请求会话，适合在 StreamingResponse 中边查询边输出（只读请求使用副本）
+    """
+    if settings.DB_ASYNC_MODE:
+        async with get_async_read_engine().connect() as conn:
+            result = await conn.stream(statement.execution_options(yield_per=batch_size))
+            async for partition in result.partitions(batch_size):
+                yield partition
+        return
+
+    conn = await run_in_threadpool(get_read_engine().connect)
+    try:
+        result = await run_in_threadpool(
+            conn.execution_options(stream_results=True, yield_per=batch_size).execute, statement
+        )
+        while True:
+            partition = await run_in_threadpool(result.fetchmany, batch_size)
+            if not partition:
+                break
+            yield partition
+    finally:
+        await run_in_threadpool(conn.close)
+
@@ -0,0 +1,56 @@
+"""
+SQLite 副本同步（本地测试用）
+生产环境的只读副本由数据库自身的复制维护；本地使用SQLite时，可配置第二个数据库文件作为副本，
+由 DB_REPLICA_SYNC_INTERVAL 定期通过 SQLite 在线备份接口把主库完整复制过去，两次同步之间的时间即模拟的复制延迟
+"""
+
+import asyncio
+import logging
+import sqlite3
+from typing import List
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import make_url
+
+from config.settings import settings
+from database.database import is_sqlite, is_sqlite_memory
+
+logger = logging.getLogger("replica")
+
+
+def sqlite_replica_paths() -> List[str]:
+    """需要同步的副本文件路径（主库与副本均为SQLite文件时）"""
+    if not is_sqlite(settings.DATABASE_URL) or is_sqlite_memory(settings.DATABASE_URL):
+        return []
+    return [
+        make_url(url).database for url in settings.DATABASE_REPLICA_URLS
+        if is_sqlite(url) and not is_sqlite_memory(url)
+    ]
+
+
+def sync_sqlite_replicas() -> int:
+    """把主库复制到各副本文件，返回同步的副本数"""
+    paths = sqlite_replica_paths()
+    if not paths:
+        return 0
+    source = sqlite3.connect(make_url(settings.DATABASE_URL).database)
+    try:
+        for path in paths:
+            target = sqlite3.connect(path, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+    finally:
+        source.close()
+    return len(paths)
+
+
+async def replica_sync_loop(interval: float) -> None:
+    """定期同步副本（在应用生命周期内运行）"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(sync_sqlite_replicas)
+        except Exception:
+            logger.exception("副本同步失败")
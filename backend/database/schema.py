@@ -0,0 +1,80 @@
+"""
+数据库结构版本
+表结构由 Alembic 迁移（migrations/）维护，启动时只查询一次 alembic_version 与代码期望的版本比较，
+不再逐表反射执行 create_all；版本落后时按 DB_AUTO_MIGRATE 自动升级或拒绝启动。
+MATERIAL_INFO_INDEXED_PATHS 来自配置，迁移只为默认路径建立索引，启动时同样检查并补建其余路径的表达式索引（仅SQLite）
+"""
+
+import os
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from config.settings import settings
+
+# 代码期望的结构版本（新增迁移时同步修改）
+SCHEMA_VERSION = "0006_contract_expire_index"
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def get_schema_version(engine: Engine) -> Optional[str]:
+    """数据库当前的结构版本，未执行过迁移时返回 None"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except Exception:
+        return None
+
+
+def upgrade_schema(engine: Engine, revision: str = "head") -> None:
+    """执行迁移到指定版本（alembic 仅在需要迁移时导入）"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, revision)
+
+
+def check_material_indexes(engine: Engine) -> bool:
+    """
+    检查 MATERIAL_INFO_INDEXED_PATHS 中每个路径都建有表达式索引，返回是否新建了索引
+    缺少索引时 DB_AUTO_MIGRATE 开启则补建，关闭则抛出异常（避免已声明的路径退化为全表扫描）；
+    json_extract 表达式索引仅SQLite支持，其他数据库跳过检查
+    """
+    from core.material import ensure_material_indexes, missing_material_indexes
+
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as conn:
+        missing = missing_material_indexes(conn)
+    if not missing:
+        return False
+    if not settings.DB_AUTO_MIGRATE:
+        raise RuntimeError(
+            f"MATERIAL_INFO_INDEXED_PATHS 中的路径 {', '.join(missing)} 没有表达式索引，"
+            f"请开启 DB_AUTO_MIGRATE 启动一次以补建索引"
+        )
+    with engine.begin() as conn:
+        ensure_material_indexes(conn)
+    return True
+
+
+def check_schema(engine: Engine) -> bool:
+    """
+    启动时检查结构版本与物料路径索引，返回是否修改了数据库结构
+    已是最新版本时只有一次版本查询；否则 DB_AUTO_MIGRATE 开启时自动升级，关闭时抛出异常
+    """
+    current = get_schema_version(engine)
+    migrated = False
+    if current != SCHEMA_VERSION:
+        if not settings.DB_AUTO_MIGRATE:
+            raise RuntimeError(
+                f"数据库结构版本为 {current or '未初始化'}，需要 {SCHEMA_VERSION}，请先执行 alembic upgrade head"
+            )
+        upgrade_schema(engine)
+        migrated = True
+    return check_material_indexes(engine) or migrated
@@ -1,22 +1,57 @@
+import asyncio
+
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 
-from database.database import create_tables
+from database.database import engine, async_engine, replica_engines, async_replica_engines
+from database.schema import check_schema
+from database.replica import replica_sync_loop, sync_sqlite_replicas
+from core.hashing import shutdown_hash_executor
+from core.write_behind import profile_writes
+from core.contract_expiry import contract_expiry
+from core.revocation import token_denylist
+from core import metrics, slow_query
+from core.metrics import CONTENT_TYPE, render_metrics
 from routers import api_router
 from middleware.cors import add_cors_middleware
+from middleware.admission import add_admission_middleware
+from middleware.metrics import add_metrics_middleware
+from middleware.request_context import add_request_context_middleware
+from middleware.db_routing import add_db_routing_middleware
 from config.settings import settings
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
-    # 启动时创建数据库表
-    create_tables()
-    print("数据库表创建完成")
+    # 启动时检查数据库结构版本（一次查询），落后时执行迁移
+    if check_schema(engine):
+        print("数据库迁移完成")
+    # 本地SQLite副本：启动时先同步一次，之后定期同步
+    replica_sync = None
+    if settings.DB_REPLICA_SYNC_INTERVAL > 0 and sync_sqlite_replicas():
+        replica_sync = asyncio.create_task(replica_sync_loop(settings.DB_REPLICA_SYNC_INTERVAL))
+    if settings.PROFILE_WRITE_BEHIND_ENABLED:
+        profile_writes.start()
+    if settings.CONTRACT_EXPIRY_SCAN_ENABLED:
+        contract_expiry.start()
+    if settings.TOKEN_REVOCATION_ENABLED:
+        token_denylist.start()
     yield
     # 关闭时清理资源
     print("应用正在关闭...")
+    if settings.PROFILE_WRITE_BEHIND_ENABLED:
+        # 写入全部尚未落库的个人信息修改
+        await profile_writes.stop()
+    if settings.CONTRACT_EXPIRY_SCAN_ENABLED:
+        await contract_expiry.stop()
+    if settings.TOKEN_REVOCATION_ENABLED:
+        # 写入尚未落盘的吊销记录
+        await token_denylist.stop()
+    if replica_sync is not None:
+        replica_sync.cancel()
+    shutdown_hash_executor()
 
 
 # 创建FastAPI应用
@@ -27,9 +62,35 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# 添加准入控制中间件（先添加，位于CORS中间件内层）
+add_admission_middleware(app)
+
 # 添加CORS中间件
 add_cors_middleware(app)
 
+# 添加读写分离中间件（配置了只读副本时）
+add_db_routing_middleware(app)
+
+# 添加请求上下文中间件（慢查询日志据此记录来源路由）
+add_request_context_middleware(app)
+
+# 添加指标中间件（最外层）
+add_metrics_middleware(app)
+
+# 为数据库引擎挂载SQL统计与慢查询事件
+db_engines = {"sync": engine}
+if async_engine is not None:
+    db_engines["async"] = async_engine.sync_engine
+for index, replica in enumerate(replica_engines):
+    db_engines[f"replica{index}"] = replica
+for index, replica in enumerate(async_replica_engines):
+    db_engines[f"async_replica{index}"] = replica.sync_engine
+for name, sync_engine in db_engines.items():
+    if settings.METRICS_ENABLED:
+        metrics.instrument_engine(sync_engine, name)
+    if settings.SLOW_QUERY_ENABLED:
+        slow_query.instrument_engine(sync_engine, name)
+
 # 注册API路由
 app.include_router(api_router, prefix="/api")
 
@@ -50,6 +111,13 @@ def health_check():
     return {"status": "healthy"}
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        """运行指标（Prometheus 文本格式）"""
+        return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+
 # 全局异常处理
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
@@ -0,0 +1,203 @@
+"""
+准入控制（负载削减）中间件
+按路由分组（auth / list / write / read）限制同时处理的请求数，超出上限的请求在有界队列中等待，
+队列已满或等待超过期限时立即返回503并附带 Retry-After，避免请求无限排队拖垮所有接口；
+健康检查与CORS预检不受限制，单条读取等轻量请求使用独立的分组，不会被列表查询或登录高峰阻塞
+"""
+
+import asyncio
+import math
+import re
+from collections import deque
+from typing import Deque, Dict, List, Optional, Pattern, Tuple
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config.settings import settings
+from core.response import service_busy_error_response
+from core.metrics import register_collector
+
+AUTH = "auth"
+LIST = "list"
+WRITE = "write"
+READ = "read"
+
+# 不受准入控制的路径
+EXEMPT_PATHS = {"/", "/health", "/metrics"}
+
+# (请求方法, 路径正则, 分组)，按顺序匹配，未匹配的写请求归入 write，读请求归入 read
+ROUTE_GROUPS: List[Tuple[Tuple[str, ...], Pattern, str]] = [
+    (("POST",), re.compile(r"^/api/user/(login|register)$"), AUTH),
+    (("GET", "POST"), re.compile(r"^/api/user/info$"), READ),
+    (("POST",), re.compile(r"^/api/user/logout$"), READ),
+    (("POST",), re.compile(r"^/api/company/batch$"), LIST),
+    (("GET",), re.compile(r"^/api/(users|company)/?$"), LIST),
+    (("GET",), re.compile(r"^/api/(users|company)/(page|with-companies|export|search|material|expiring)$"), LIST),
+    (("GET",), re.compile(r"^/api/company/(user|user-info)/[^/]+(/page)?$"), LIST),
+]
+
+
+class AdmissionRejected(Exception):
+    """请求未获准入（队列已满或等待超时）"""
+
+
+class AdmissionGroup:
+    """一个路由分组的并发上限与等待队列"""
+
+    def __init__(self, name: str, max_concurrency: int, queue_size: int, timeout: float):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.active = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        # 等待中的请求；释放时直接把名额转交给队首，保证先到先得
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        """获取处理名额，失败时抛出 AdmissionRejected"""
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(f"{self.name} 排队已满")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise AdmissionRejected(f"{self.name} 排队超时")
+        except asyncio.CancelledError:
+            # 客户端断开时若名额已转交则归还
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.admitted += 1
+
+    def release(self) -> None:
+        """释放名额：优先转交给仍在等待的请求"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_size": self.queue_size,
+            "timeout": self.timeout,
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+def build_groups() -> Dict[str, AdmissionGroup]:
+    """按配置创建各路由分组"""
+    return {
+        AUTH: AdmissionGroup(AUTH, settings.ADMISSION_AUTH_CONCURRENCY, settings.ADMISSION_AUTH_QUEUE_SIZE, settings.ADMISSION_AUTH_TIMEOUT),
+        LIST: AdmissionGroup(LIST, settings.ADMISSION_LIST_CONCURRENCY, settings.ADMISSION_LIST_QUEUE_SIZE, settings.ADMISSION_LIST_TIMEOUT),
+        WRITE: AdmissionGroup(WRITE, settings.ADMISSION_WRITE_CONCURRENCY, settings.ADMISSION_WRITE_QUEUE_SIZE, settings.ADMISSION_WRITE_TIMEOUT),
+        READ: AdmissionGroup(READ, settings.ADMISSION_READ_CONCURRENCY, settings.ADMISSION_READ_QUEUE_SIZE, settings.ADMISSION_READ_TIMEOUT),
+    }
+
+
+# 全局分组实例（系统管理接口读取统计）
+admission_groups = build_groups()
+exempt_requests = 0
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """请求所属的分组，None 表示不受准入控制"""
+    if method == "OPTIONS" or path in EXEMPT_PATHS:
+        return None
+    for methods, pattern, group in ROUTE_GROUPS:
+        if method in methods and pattern.match(path):
+            return group
+    return READ if method in ("GET", "HEAD") else WRITE
+
+
+def get_admission_stats() -> dict:
+    """各分组当前排队深度与拒绝计数"""
+    return {
+        "enabled": settings.ADMISSION_CONTROL_ENABLED,
+        "exempt": exempt_requests,
+        "groups": {name: group.stats() for name, group in admission_groups.items()},
+    }
+
+
+def admission_metrics():
+    """准入控制状态（供 /metrics 输出）"""
+    gauges = [
+        ("admission_active", "gauge", "各分组正在处理的请求数", "active"),
+        ("admission_waiting", "gauge", "各分组排队等待的请求数", "waiting"),
+        ("admission_rejected_total", "counter", "各分组被拒绝的请求数", None),
+    ]
+    result = []
+    for metric, kind, help_text, key in gauges:
+        samples = []
+        for name, group in admission_groups.items():
+            stats = group.stats()
+            if key is not None:
+                samples.append(({"group": name}, stats[key]))
+            else:
+                samples.append(({"group": name, "reason": "queue_full"}, stats["rejected_queue_full"]))
+                samples.append(({"group": name, "reason": "timeout"}, stats["rejected_timeout"]))
+        result.append((metric, kind, help_text, samples))
+    return result
+
+
+if settings.ADMISSION_CONTROL_ENABLED:
+    register_collector(admission_metrics)
+
+
+class AdmissionControlMiddleware:
+    """ASGI准入控制中间件：名额在整个响应（含流式响应）发送完毕后释放"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        global exempt_requests
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        name = classify(scope["method"], scope["path"])
+        if name is None:
+            exempt_requests += 1
+            await self.app(scope, receive, send)
+            return
+
+        group = admission_groups[name]
+        try:
+            await group.acquire()
+        except AdmissionRejected:
+            response = service_busy_error_response()
+            response.status_code = 503
+            response.headers["Retry-After"] = str(max(1, math.ceil(settings.ADMISSION_RETRY_AFTER)))
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.release()
+
+
+def add_admission_middleware(app: FastAPI):
+    """添加准入控制中间件（需在CORS中间件之前添加，使503响应同样带有CORS头）"""
+    if settings.ADMISSION_CONTROL_ENABLED:
+        app.add_middleware(AdmissionControlMiddleware)
@@ -0,0 +1,84 @@
+"""
+读写分离中间件
+只读请求（GET/HEAD，以及 READ_ONLY_ROUTES 中只查询数据的POST接口）的数据库会话绑定只读副本，其余请求使用主库；
+写请求成功后下发粘滞Cookie，DB_REPLICA_STICKY_SECONDS 秒内同一客户端的读取仍使用主库，保证读到自己刚写入的数据
+（不受副本复制延迟影响）。未配置 DATABASE_REPLICA_URLS 时不启用
+"""
+
+import re
+import time
+from http.cookies import SimpleCookie
+from typing import List, Pattern, Tuple
+
+from fastapi import FastAPI
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.settings import settings
+from database.database import replica_engines, use_replica
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# 只查询数据的非GET接口 (请求方法, 路径正则)
+READ_ONLY_ROUTES: List[Tuple[str, Pattern]] = [
+    ("POST", re.compile(r"^/api/company/batch$")),
+    ("POST", re.compile(r"^/api/user/(info|logout)$")),
+]
+
+
+def is_read_only(method: str, path: str) -> bool:
+    """请求是否只读取数据"""
+    if method in SAFE_METHODS:
+        return True
+    return any(method == m and pattern.match(path) for m, pattern in READ_ONLY_ROUTES)
+
+
+def sticky_until(scope: Scope) -> float:
+    """粘滞Cookie中记录的截止时间（时间戳），没有时返回0"""
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            morsel = SimpleCookie(value.decode("latin-1")).get(settings.DB_REPLICA_STICKY_COOKIE)
+            if morsel is not None:
+                try:
+                    return float(morsel.value)
+                except ValueError:
+                    return 0.0
+    return 0.0
+
+
+class DBRoutingMiddleware:
+    """按请求设置读取使用副本还是主库的ASGI中间件"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        read_only = is_read_only(scope["method"], scope["path"])
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                # 写入成功：之后一段时间内该客户端的读取使用主库
+                seconds = settings.DB_REPLICA_STICKY_SECONDS
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{settings.DB_REPLICA_STICKY_COOKIE}={time.time() + seconds:.3f}; "
+                    f"Max-Age={int(seconds) + 1}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        token = use_replica.set(read_only and sticky_until(scope) <= time.time())
+        try:
+            await self.app(scope, receive, send if read_only else send_with_cookie)
+        finally:
+            use_replica.reset(token)
+
+
+def add_db_routing_middleware(app: FastAPI):
+    """添加读写分离中间件（仅在配置了只读副本时）"""
+    if replica_engines:
+        app.add_middleware(DBRoutingMiddleware)
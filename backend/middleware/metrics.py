@@ -0,0 +1,63 @@
+"""
+请求指标中间件
+记录每个路由（按路由模板，如 /api/company/{company_state_id}，避免路径参数导致标签爆炸）的请求数、
+耗时直方图、正在处理的请求数，以及每个请求执行的SQL语句数与耗时
+"""
+
+import time
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.settings import settings
+from core.request_context import route_template
+from core.metrics import (
+    HTTP_IN_FLIGHT,
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    REQUEST_DB_TIME,
+    REQUEST_STATEMENTS,
+    request_db_stats,
+)
+
+
+class MetricsMiddleware:
+    """ASGI指标中间件：耗时统计到响应（含流式响应）发送完毕"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = [0, 0.0]
+        token = request_db_stats.set(stats)
+        HTTP_IN_FLIGHT.value += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.value -= 1
+            request_db_stats.reset(token)
+            labels = (scope["method"], route_template(scope))
+            HTTP_REQUESTS.inc(labels + (str(status_code),))
+            HTTP_LATENCY.observe(elapsed, labels)
+            REQUEST_STATEMENTS.observe(stats[0], labels)
+            REQUEST_DB_TIME.observe(stats[1], labels)
+
+
+def add_metrics_middleware(app: FastAPI):
+    """添加指标中间件（最后添加，位于最外层，被准入控制拒绝的请求同样计入）"""
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,26 @@
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.request_context import current_scope
+
+
+class RequestContextMiddleware:
+    """记录当前请求（供慢查询日志等获取来源路由）的ASGI中间件"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
+
+
+def add_request_context_middleware(app: FastAPI):
+    """添加请求上下文中间件"""
+    app.add_middleware(RequestContextMiddleware)
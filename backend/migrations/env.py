@@ -0,0 +1,66 @@
+"""
+Alembic 迁移环境
+命令行执行时使用 config.settings 中的数据库地址；应用启动时自动迁移则通过 config.attributes["connection"] 传入连接
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+
+from config.settings import settings
+from database.database import Base, engine
+import models.user  # noqa: F401  注册模型到 Base.metadata
+
+config = context.config
+connection = config.attributes.get("connection")
+
+# 只在命令行执行时配置日志，避免应用启动时覆盖已有的日志配置
+if connection is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """
+    autogenerate 时忽略由迁移直接维护的对象：
+    SQLite 反射不到表达式索引（物料路径索引），全文检索虚拟表及其影子表也不在模型中
+    """
+    if type_ == "index" and name and name.startswith("ix_company_states_material_"):
+        return False
+    if type_ == "table" and name and name.startswith("company_states_fts"):
+        return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    """生成SQL脚本（alembic upgrade --sql）"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(conn) -> None:
+    context.configure(
+        connection=conn,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif connection is not None:
+    run_migrations(connection)
+else:
+    with engine.connect() as conn:
+        run_migrations(conn)
@@ -0,0 +1,75 @@
+"""初始表结构：users、company_states
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2026-10-17
+
+使用 IF NOT EXISTS，此前由 create_all 建表的已有数据库可直接执行迁移
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_initial"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(length=50), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("hashed_password", sa.String(length=255), nullable=False),
+        sa.Column("full_name", sa.String(length=100), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("role", sa.String(length=20), nullable=True),
+        sa.Column("avatar", sa.String(length=500), nullable=True),
+        sa.Column("job", sa.String(length=100), nullable=True),
+        sa.Column("organization", sa.String(length=100), nullable=True),
+        sa.Column("location", sa.String(length=100), nullable=True),
+        sa.Column("introduction", sa.String(length=500), nullable=True),
+        sa.Column("personal_website", sa.String(length=200), nullable=True),
+        sa.Column("job_name", sa.String(length=100), nullable=True),
+        sa.Column("organization_name", sa.String(length=100), nullable=True),
+        sa.Column("location_name", sa.String(length=100), nullable=True),
+        sa.Column("phone", sa.String(length=20), nullable=True),
+        sa.Column("certification", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_users_id", "users", ["id"], if_not_exists=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True, if_not_exists=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True, if_not_exists=True)
+
+    op.create_table(
+        "company_states",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("company_name", sa.String(length=100), nullable=False),
+        sa.Column("company_code", sa.String(length=50), nullable=True),
+        sa.Column("company_phone", sa.String(length=20), nullable=True),
+        sa.Column("warranty_year", sa.Integer(), nullable=True),
+        sa.Column("eps_account", sa.String(length=100), nullable=True),
+        sa.Column("eps_password", sa.String(length=255), nullable=True),
+        sa.Column("bank_name", sa.String(length=100), nullable=True),
+        sa.Column("bank_account", sa.String(length=50), nullable=True),
+        sa.Column("framework_contract_expire", sa.DateTime(), nullable=True),
+        sa.Column("material_info", sa.JSON(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_company_states_id", "company_states", ["id"], if_not_exists=True)
+    op.create_index("ix_company_states_company_name", "company_states", ["company_name"], unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table("company_states")
+    op.drop_table("users")
@@ -0,0 +1,22 @@
+"""按用户键集分页的复合索引
+
+Revision ID: 0002_company_user_keyset_index
+Revises: 0001_initial
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = "0002_company_user_keyset_index"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # WHERE user_id = ? AND id > ? ORDER BY user_id, id
+    op.create_index("ix_company_states_user_id_id", "company_states", ["user_id", "id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_company_states_user_id_id", table_name="company_states")
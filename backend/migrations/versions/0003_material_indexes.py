@@ -0,0 +1,42 @@
+"""material_info JSON路径表达式索引（仅SQLite）
+
+Revision ID: 0003_material_indexes
+Revises: 0002_company_user_keyset_index
+Create Date: 2026-10-17
+
+为默认声明的 MATERIAL_INFO_INDEXED_PATHS（code、quantity）建立 json_extract 表达式索引；
+表达式须与 core.material.material_value 生成的完全一致才能命中索引。
+配置中新增的路径由启动时的 database.schema.check_material_indexes 补建。其他数据库跳过
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_material_indexes"
+down_revision = "0002_company_user_keyset_index"
+branch_labels = None
+depends_on = None
+
+PATHS = ("code", "quantity")
+
+
+def index_name(path: str) -> str:
+    return f"ix_company_states_material_{path.replace('.', '_')}"
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for path in PATHS:
+        op.create_index(
+            index_name(path), "company_states",
+            [sa.text(f"json_extract(material_info, '$.{path}')")],
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for path in PATHS:
+        op.drop_index(index_name(path), table_name="company_states", if_exists=True)
@@ -0,0 +1,54 @@
+"""公司检索 FTS5 全文索引（仅SQLite）
+
+Revision ID: 0004_company_search_fts
+Revises: 0003_material_indexes
+Create Date: 2026-10-17
+
+创建 trigram 分词的外部内容表 company_states_fts 及同步触发器，并从 company_states 回填已有数据；
+其他数据库跳过（检索退化为 LIKE）
+"""
+
+from alembic import op
+
+revision = "0004_company_search_fts"
+down_revision = "0003_material_indexes"
+branch_labels = None
+depends_on = None
+
+FTS_TABLE = "company_states_fts"
+COLUMNS = ("company_name", "company_code", "bank_name", "bank_account")
+
+_columns = ", ".join(COLUMNS)
+_new_values = ", ".join(f"new.{name}" for name in COLUMNS)
+_old_values = ", ".join(f"old.{name}" for name in COLUMNS)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{_columns}, content='company_states', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON company_states BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON company_states BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {_columns} ON company_states BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END"
+    )
+    op.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for suffix in ("ai", "ad", "au"):
+        op.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+    op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
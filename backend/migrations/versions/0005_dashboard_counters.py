@@ -0,0 +1,55 @@
+"""仪表盘汇总计数表
+
+Revision ID: 0005_dashboard_counters
+Revises: 0004_company_search_fts
+Create Date: 2026-10-17
+
+创建 dashboard_counters 并按已有数据回填（之后由 crud 写入路径增量维护）
+回填使用固定的SQL，与本迁移创建时 crud.dashboard 的计数键一致；之后修改计数键需新建迁移重建汇总表，
+不能修改这里（迁移不导入应用代码，保证从旧数据库升级时行为不变）
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_dashboard_counters"
+down_revision = "0004_company_search_fts"
+branch_labels = None
+depends_on = None
+
+
+BACKFILL = (
+    # users_by_role：角色（空为 user）:是否启用（空视为启用）
+    "INSERT INTO dashboard_counters (metric, bucket, value) "
+    "SELECT 'users_by_role', COALESCE(role, 'user') || ':' || CASE WHEN is_active = 0 THEN '0' ELSE '1' END, COUNT(*) "
+    "FROM users GROUP BY 2",
+    # companies_by_user：用户ID
+    "INSERT INTO dashboard_counters (metric, bucket, value) "
+    "SELECT 'companies_by_user', CAST(user_id AS TEXT), COUNT(*) FROM company_states GROUP BY user_id",
+    # companies_by_warranty_year：质保年（未填写为空字符串）
+    "INSERT INTO dashboard_counters (metric, bucket, value) "
+    "SELECT 'companies_by_warranty_year', COALESCE(CAST(warranty_year AS TEXT), ''), COUNT(*) "
+    "FROM company_states GROUP BY warranty_year",
+    # contracts_by_expiry_date：框架合同到期日期 YYYY-MM-DD（未填写不计）
+    "INSERT INTO dashboard_counters (metric, bucket, value) "
+    "SELECT 'contracts_by_expiry_date', date(framework_contract_expire), COUNT(*) FROM company_states "
+    "WHERE framework_contract_expire IS NOT NULL GROUP BY date(framework_contract_expire)",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dashboard_counters",
+        sa.Column("metric", sa.String(length=50), nullable=False),
+        sa.Column("bucket", sa.String(length=100), nullable=False),
+        sa.Column("value", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("metric", "bucket"),
+        if_not_exists=True,
+    )
+    op.execute("DELETE FROM dashboard_counters")
+    for statement in BACKFILL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    op.drop_table("dashboard_counters")
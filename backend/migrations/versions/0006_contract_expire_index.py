@@ -0,0 +1,23 @@
+"""合同到期窗口查询的复合索引
+
+Revision ID: 0006_contract_expire_index
+Revises: 0005_dashboard_counters
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = "0006_contract_expire_index"
+down_revision = "0005_dashboard_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # WHERE framework_contract_expire >= ? AND framework_contract_expire < ? ORDER BY framework_contract_expire, id
+    op.create_index("ix_company_states_contract_expire_id", "company_states",
+                    ["framework_contract_expire", "id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_company_states_contract_expire_id", table_name="company_states")
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from database.database import Base
 from pydantic import BaseModel
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    """当前UTC时间（不带时区，与SQLite CURRENT_TIMESTAMP 一致），保留微秒以区分同一秒内的多次修改"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
 class User(Base):
@@ -24,7 +29,7 @@ class User(Base):
     job = Column(String(100), nullable=True)  # 职位
     organization = Column(String(100), nullable=True)  # 组织
     location = Column(String(100), nullable=True)  # 位置
-    introduction = Column(String(500), nullable=True)  # 个人介绍
+    introduction = deferred(Column(String(500), nullable=True), group="large")  # 个人介绍（默认延迟加载）
     personal_website = Column(String(200), nullable=True)  # 个人网站
     job_name = Column(String(100), nullable=True)  # 职位名称
     organization_name = Column(String(100), nullable=True)  # 组织名称
@@ -33,7 +38,7 @@ class User(Base):
     certification = Column(Integer, default=0)  # 认证状态
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
 
 
 # Pydantic模型
@@ -84,18 +89,35 @@ class CompanyState(Base):
     bank_name = Column(String(100), nullable=True)  # 开户银行
     bank_account = Column(String(50), nullable=True)  # 银行账号
     framework_contract_expire = Column(DateTime, nullable=True)  # 框架合同到期时间
-    material_info = Column(JSON, nullable=True)  # 物料信息
+    material_info = deferred(Column(JSON, nullable=True), group="large")  # 物料信息（默认延迟加载）
     
     # 与用户关联
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     user = relationship("User", back_populates="company_states")
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
+
+    __table_args__ = (
+        # 按用户的键集分页：WHERE user_id = ? AND id > ? ORDER BY user_id, id
+        Index("ix_company_states_user_id_id", "user_id", "id"),
+        # 合同到期窗口查询：WHERE framework_contract_expire >= ? AND framework_contract_expire < ? ORDER BY framework_contract_expire, id
+        Index("ix_company_states_contract_expire_id", "framework_contract_expire", "id"),
+    )
 
 
 # 在User模型中添加公司状态关联
 User.company_states = relationship("CompanyState", back_populates="user", cascade="all, delete-orphan")
 
 
+# 仪表盘计数模型
+class DashboardCounter(Base):
+    """仪表盘汇总计数（由 crud 写入路径增量维护，见 crud.dashboard）"""
+    __tablename__ = "dashboard_counters"
+
+    metric = Column(String(50), primary_key=True)  # 指标名
+    bucket = Column(String(100), primary_key=True)  # 分组值
+    value = Column(Integer, nullable=False, default=0)
+
+
 # 公司状态模型定义已移动到 schemas/company.py 文件中
\ No newline at end of file
@@ -4,7 +4,7 @@ API v1 路由注册
 
 from fastapi import APIRouter
 
-from . import user, users, company
+from . import user, users, company, dashboard, admin
 
 
 api_router = APIRouter()
@@ -16,4 +16,10 @@ api_router.include_router(user.router, prefix="/user", tags=["用户认证"])
 api_router.include_router(users.router, prefix="/users", tags=["用户管理"])
 
 # 注册公司状态路由
-api_router.include_router(company.router, prefix="/company", tags=["公司状态"])
\ No newline at end of file
+api_router.include_router(company.router, prefix="/company", tags=["公司状态"])
+
+# 注册仪表盘路由
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["仪表盘"])
+
+# 注册系统管理路由
+api_router.include_router(admin.router, prefix="/admin", tags=["系统管理"])
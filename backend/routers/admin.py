@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from core.principal_cache import principal_cache
+from core.hashing import get_hash_stats
+from core.slow_query import slow_query_log
+from core.write_behind import profile_writes
+from core.revocation import token_denylist
+from core.company_cache import company_cache
+from core.contract_expiry import contract_expiry
+from middleware.admission import get_admission_stats
+from core.response import success_response
+from crud.dashboard import check_counters_async, rebuild_counters_async
+from database.database import DBSession, get_session
+from schemas.user import UserResponse
+from routers.user import get_current_user
+
+router = APIRouter(tags=["系统管理"])
+
+
+def get_current_admin(current_user: UserResponse = Depends(get_current_user)):
+    """获取当前管理员用户（非管理员返回403）"""
+    if current_user.role not in ["admin", "root"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="权限不足"
+        )
+    return current_user
+
+
+@router.get("/principal-cache")
+async def get_principal_cache_stats(current_user: UserResponse = Depends(get_current_admin)):
+    """认证主体缓存命中统计"""
+    return success_response(principal_cache.stats(), "获取成功")
+
+
+@router.get("/password-hash")
+async def get_password_hash_stats(current_user: UserResponse = Depends(get_current_admin)):
+    """密码哈希队列状态"""
+    return success_response(get_hash_stats(), "获取成功")
+
+
+@router.get("/admission")
+async def get_admission_control_stats(current_user: UserResponse = Depends(get_current_admin)):
+    """准入控制各分组的并发、排队深度与拒绝计数"""
+    return success_response(get_admission_stats(), "获取成功")
+
+
+@router.get("/profile-writes")
+async def get_profile_write_stats(current_user: UserResponse = Depends(get_current_admin)):
+    """个人信息延迟写入队列状态"""
+    return success_response(profile_writes.stats(), "获取成功")
+
+
+@router.get("/token-denylist")
+async def get_token_denylist_stats(current_user: UserResponse = Depends(get_current_admin)):
+    """令牌吊销名单状态"""
+    return success_response(token_denylist.stats(), "获取成功")
+
+
+@router.get("/company-cache")
+async def get_company_cache_stats(current_user: UserResponse = Depends(get_current_admin)):
+    """公司状态缓存命中统计"""
+    return success_response(company_cache.stats(), "获取成功")
+
+
+@router.delete("/company-cache")
+async def clear_company_cache(current_user: UserResponse = Depends(get_current_admin)):
+    """清空公司状态缓存（直接修改数据库后使用）"""
+    company_cache.clear()
+    return success_response(None, "已清空")
+
+
+@router.get("/dashboard/check")
+async def check_dashboard_counters(db: DBSession = Depends(get_session),
+                                   current_user: UserResponse = Depends(get_current_admin)):
+    """仪表盘汇总表一致性检查（全表统计后与汇总表比较）"""
+    return success_response(await check_counters_async(db), "检查完成")
+
+
+@router.post("/dashboard/rebuild")
+async def rebuild_dashboard_counters(db: DBSession = Depends(get_session),
+                                     current_user: UserResponse = Depends(get_current_admin)):
+    """按全表统计重建仪表盘汇总表"""
+    return success_response({"buckets": await rebuild_counters_async(db)}, "重建完成")
+
+
+@router.get("/contract-expiry")
+async def get_contract_expiry_stats(current_user: UserResponse = Depends(get_current_admin)):
+    """合同到期定时扫描统计"""
+    return success_response(contract_expiry.stats(), "获取成功")
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    sort: str = Query("total_ms", pattern="^(total_ms|max_ms|count)$"),
+    current_user: UserResponse = Depends(get_current_admin)
+):
+    """慢查询 Top-N（按语句形态聚合，含来源路由与 EXPLAIN QUERY PLAN）"""
+    return success_response(slow_query_log.report(limit, sort), "获取成功")
+
+
+@router.delete("/slow-queries")
+async def clear_slow_queries(current_user: UserResponse = Depends(get_current_admin)):
+    """清空慢查询记录"""
+    slow_query_log.clear()
+    return success_response(None, "已清空")
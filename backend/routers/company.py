@@ -1,89 +1,316 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
 
-from database.database import get_db
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from database.database import DBSession, get_session
 from crud.company import (
-    get_company_state_by_id,
-    get_company_state_by_name,
-    get_company_states_by_user_id,
-    create_company_state,
-    update_company_state,
-    delete_company_state
+    get_company_state_by_id_async,
+    get_company_state_by_name_async,
+    get_company_states_by_user_id_async,
+    get_company_states_async,
+    get_company_states_page_async,
+    get_company_states_batch_async,
+    search_company_states_async,
+    get_company_states_by_material_async,
+    get_company_states_expiring_async,
+    company_states_export_statement,
+    create_company_state_async,
+    import_company_states_async,
+    update_company_state_async,
+    delete_company_state_async
 )
-from schemas.company import CompanyStateCreate, CompanyStateUpdate, CompanyStateResponse
-from core.response import success_response, error_response
+from schemas.company import CompanyStateCreate, CompanyStateUpdate, CompanyStateResponse, CompanyStatePage, CompanyStateBatchQuery, CompanyStateSearchResult
+from core.response import success_response, error_response, json_response
+from core.fieldsets import parse_fields, project
+from core.importer import detect_format, iter_rows, validate_rows, next_batch
+from core.exporter import parse_export_format, export_response
+from core.search import SEARCH_COLUMNS, split_terms
+from core.material import INDEXED_PATHS, parse_material_conditions
+from core.conditional import validators_for
+from routers.admin import get_current_admin
+from schemas.user import UserResponse
+from models.user import utcnow
+from config.settings import settings
+
+router = APIRouter(tags=["company"])
+
+# fields 参数可选的字段（与 CompanyStateResponse 一致）
+COMPANY_FIELDS = list(CompanyStateResponse.model_fields)
+# 导出默认不包含的敏感列，需在 fields 中显式指定
+EXPORT_SENSITIVE_FIELDS = {"eps_password"}
+COMPANY_EXPORT_FIELDS = [name for name in COMPANY_FIELDS if name not in EXPORT_SENSITIVE_FIELDS]
+
 
-router = APIRouter(prefix="/api/company", tags=["company"])
+def sparse(data, fields: Optional[List[str]]):
+    """按 fields 投影公司状态对象或列表，fields 为None时原样返回"""
+    if fields is None:
+        return data
+    if isinstance(data, list):
+        return [project(item, fields) for item in data]
+    return project(data, fields)
 
 
 @router.get("/", response_model=List[CompanyStateResponse])
-def get_company_states(
+async def get_company_states(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
+):
+    """获取所有公司状态（fields 可指定返回字段，逗号分隔）"""
+    response_fields = parse_fields(fields, COMPANY_FIELDS)
+    company_states = await get_company_states_async(db, skip=skip, limit=limit, fields=response_fields)
+    validators = validators_for(company_states, weak=True, variant=(response_fields, skip, limit))
+    if validators.matches(request):
+        return validators.not_modified()
+    if response_fields is not None:
+        return validators.apply(json_response(sparse(company_states, response_fields)))
+    return validators.apply(company_states, response)
+
+
+@router.get("/page", response_model=CompanyStatePage)
+async def get_company_states_page(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
+):
+    """键集分页获取公司状态（使用返回的 next_cursor / prev_cursor 翻页）"""
+    response_fields = parse_fields(fields, COMPANY_FIELDS)
+    items, next_cursor, prev_cursor = await get_company_states_page_async(
+        db, cursor=cursor, limit=limit, fields=response_fields
+    )
+    validators = validators_for(items, weak=True, variant=(response_fields, next_cursor, prev_cursor))
+    if validators.matches(request):
+        return validators.not_modified()
+    page = {"items": sparse(items, response_fields), "next_cursor": next_cursor, "prev_cursor": prev_cursor}
+    return validators.apply(json_response(page) if response_fields is not None else page, response)
+
+
+@router.get("/user/{user_id}/page", response_model=CompanyStatePage)
+async def get_company_states_by_user_page(
+    request: Request,
+    response: Response,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
+):
+    """键集分页获取用户的公司状态"""
+    response_fields = parse_fields(fields, COMPANY_FIELDS)
+    items, next_cursor, prev_cursor = await get_company_states_page_async(
+        db, cursor=cursor, limit=limit, user_id=user_id, fields=response_fields
+    )
+    validators = validators_for(items, weak=True, variant=(response_fields, next_cursor, prev_cursor))
+    if validators.matches(request):
+        return validators.not_modified()
+    page = {"items": sparse(items, response_fields), "next_cursor": next_cursor, "prev_cursor": prev_cursor}
+    return validators.apply(json_response(page) if response_fields is not None else page, response)
+
+
+@router.get("/search", response_model=CompanyStateSearchResult)
+async def search_company_states(
+    q: str = Query(..., min_length=1, max_length=200, description="检索词，空格分隔的多个词需同时命中"),
+    columns: Optional[str] = Query(None, description="检索的列，逗号分隔，默认 company_name,company_code,bank_name,bank_account"),
+    user_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
+):
+    """检索公司状态（子串匹配，按相关度排序）"""
+    terms = split_terms(q)
+    if not terms:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="检索词不能为空")
+    search_columns = parse_fields(columns, SEARCH_COLUMNS) or SEARCH_COLUMNS
+    response_fields = parse_fields(fields, COMPANY_FIELDS)
+    items, total = await search_company_states_async(
+        db, terms, skip=skip, limit=limit, user_id=user_id, columns=search_columns, fields=response_fields
+    )
+    result = {"items": sparse(items, response_fields), "total": total}
+    return json_response(result) if response_fields is not None else result
+
+
+@router.get("/material", response_model=CompanyStatePage)
+async def get_company_states_by_material(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
+):
+    """
+    按物料信息（material_info）过滤公司状态，键集分页
+    其余查询参数为过滤条件：路径=值 或 路径__gt/gte/lt/lte=值，如 ?code=M0001&quantity__gte=10，
+    路径须在 MATERIAL_INFO_INDEXED_PATHS 中声明（均建有表达式索引）
+    """
+    reserved = {"cursor", "limit", "fields"}
+    conditions = parse_material_conditions(
+        [(key, value) for key, value in request.query_params.multi_items() if key not in reserved]
+    )
+    response_fields = parse_fields(fields, COMPANY_FIELDS)
+    items, next_cursor, prev_cursor = await get_company_states_by_material_async(
+        db, conditions, cursor=cursor, limit=limit, fields=response_fields
+    )
+    page = {"items": sparse(items, response_fields), "next_cursor": next_cursor, "prev_cursor": prev_cursor}
+    return json_response(page) if response_fields is not None else page
+
+
+@router.get("/material/paths", response_model=dict)
+async def get_material_paths():
+    """可用于物料过滤的JSON路径及取值类型（统一响应格式）"""
+    return success_response(INDEXED_PATHS, "获取成功")
+
+
+@router.get("/expiring", response_model=CompanyStatePage)
+async def get_company_states_expiring(
+    request: Request,
+    response: Response,
+    days: int = Query(30, ge=1, le=3650, description="窗口长度（天），未指定 end 时使用"),
+    start: Optional[datetime] = Query(None, description="窗口起点，默认当前时间（UTC）"),
+    end: Optional[datetime] = Query(None, description="窗口终点（不含），默认 start + days"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
+):
+    """框架合同在 [start, end) 内到期的公司状态，按到期时间排序，键集分页"""
+    start = _as_naive_utc(start) if start is not None else utcnow()
+    end = _as_naive_utc(end) if end is not None else start + timedelta(days=days)
+    if end <= start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end 必须晚于 start")
+    response_fields = parse_fields(fields, COMPANY_FIELDS)
+    items, next_cursor, prev_cursor = await get_company_states_expiring_async(
+        db, start, end, cursor=cursor, limit=limit, fields=response_fields
+    )
+    validators = validators_for(items, weak=True, variant=(response_fields, start, end, next_cursor, prev_cursor))
+    if validators.matches(request):
+        return validators.not_modified()
+    page = {"items": sparse(items, response_fields), "next_cursor": next_cursor, "prev_cursor": prev_cursor}
+    return validators.apply(json_response(page) if response_fields is not None else page, response)
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    """带时区的时间转换为UTC并去掉时区（与数据库中保存的格式一致）"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@router.get("/export")
+async def export_company_states(
+    format: Optional[str] = Query(None, description="ndjson（默认）/ csv"),
+    user_id: Optional[int] = None,
+    fields: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_admin)
 ):
-    """获取所有公司状态"""
-    company_states = db.query(CompanyState).offset(skip).limit(limit).all()
-    return company_states
+    """流式导出公司状态（需要管理员权限；可按 user_id 过滤，fields 指定导出列，默认不含 eps_password）"""
+    fmt = parse_export_format(format)
+    columns = parse_fields(fields, COMPANY_FIELDS) or COMPANY_EXPORT_FIELDS
+    statement = company_states_export_statement(columns, user_id=user_id)
+    return export_response(statement, fmt, "company_states" if user_id is None else f"company_states_user_{user_id}")
 
 
 @router.get("/{company_state_id}", response_model=CompanyStateResponse)
-def get_company_state(company_state_id: int, db: Session = Depends(get_db)):
+async def get_company_state(
+    request: Request,
+    response: Response,
+    company_state_id: int,
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
+):
     """根据ID获取公司状态"""
-    company_state = get_company_state_by_id(db, company_state_id)
+    response_fields = parse_fields(fields, COMPANY_FIELDS)
+    company_state = await get_company_state_by_id_async(db, company_state_id, fields=response_fields)
     if not company_state:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="公司状态不存在"
         )
-    return company_state
+    validators = validators_for([company_state], variant=response_fields)
+    if validators.matches(request):
+        return validators.not_modified()
+    if response_fields is not None:
+        return validators.apply(json_response(sparse(company_state, response_fields)))
+    return validators.apply(company_state, response)
 
 
 @router.get("/name/{company_name}", response_model=CompanyStateResponse)
-def get_company_state_by_company_name(company_name: str, db: Session = Depends(get_db)):
+async def get_company_state_by_company_name(
+    request: Request,
+    response: Response,
+    company_name: str,
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
+):
     """根据公司名称获取公司状态"""
-    company_state = get_company_state_by_name(db, company_name)
+    response_fields = parse_fields(fields, COMPANY_FIELDS)
+    company_state = await get_company_state_by_name_async(db, company_name, fields=response_fields)
     if not company_state:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="公司状态不存在"
         )
-    return company_state
+    validators = validators_for([company_state], variant=response_fields)
+    if validators.matches(request):
+        return validators.not_modified()
+    if response_fields is not None:
+        return validators.apply(json_response(sparse(company_state, response_fields)))
+    return validators.apply(company_state, response)
 
 
 @router.get("/user/{user_id}", response_model=List[CompanyStateResponse])
-def get_company_states_by_user(user_id: int, db: Session = Depends(get_db)):
+async def get_company_states_by_user(
+    request: Request,
+    response: Response,
+    user_id: int,
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
+):
     """根据用户ID获取公司状态列表"""
-    company_states = get_company_states_by_user_id(db, user_id)
-    return company_states
+    response_fields = parse_fields(fields, COMPANY_FIELDS)
+    company_states = await get_company_states_by_user_id_async(db, user_id, fields=response_fields)
+    validators = validators_for(company_states, weak=True, variant=response_fields)
+    if validators.matches(request):
+        return validators.not_modified()
+    if response_fields is not None:
+        return validators.apply(json_response(sparse(company_states, response_fields)))
+    return validators.apply(company_states, response)
 
 
 @router.post("/", response_model=CompanyStateResponse)
-def create_new_company_state(
+async def create_new_company_state(
     company_state: CompanyStateCreate,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session)
 ):
     """创建公司状态"""
     # 检查公司名称是否已存在
-    existing_company = get_company_state_by_name(db, company_state.company_name)
+    existing_company = await get_company_state_by_name_async(db, company_state.company_name, fields=["id"])
     if existing_company:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="公司名称已存在"
         )
     
-    return create_company_state(db, company_state)
+    return await create_company_state_async(db, company_state)
 
 
 @router.put("/{company_state_id}", response_model=CompanyStateResponse)
-def update_existing_company_state(
+async def update_existing_company_state(
     company_state_id: int,
     company_state_update: CompanyStateUpdate,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session)
 ):
     """更新公司状态"""
-    company_state = update_company_state(db, company_state_id, company_state_update)
+    company_state = await update_company_state_async(db, company_state_id, company_state_update)
     if not company_state:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -93,9 +320,9 @@ def update_existing_company_state(
 
 
 @router.delete("/{company_state_id}")
-def delete_existing_company_state(company_state_id: int, db: Session = Depends(get_db)):
+async def delete_existing_company_state(company_state_id: int, db: DBSession = Depends(get_session)):
     """删除公司状态"""
-    if not delete_company_state(db, company_state_id):
+    if not await delete_company_state_async(db, company_state_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="公司状态不存在"
@@ -105,32 +332,118 @@ def delete_existing_company_state(company_state_id: int, db: Session = Depends(g
 
 # 统一响应格式的API端点
 @router.post("/create", response_model=dict)
-def create_company_state_with_response(
+async def create_company_state_with_response(
     company_state: CompanyStateCreate,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session)
 ):
     """创建公司状态（统一响应格式）"""
     try:
         # 检查公司名称是否已存在
-        existing_company = get_company_state_by_name(db, company_state.company_name)
+        existing_company = await get_company_state_by_name_async(db, company_state.company_name, fields=["id"])
         if existing_company:
             return error_response(40001, "公司名称已存在")
         
-        new_company_state = create_company_state(db, company_state)
+        new_company_state = await create_company_state_async(db, company_state)
         return success_response(new_company_state, "公司状态创建成功")
     except Exception as e:
         return error_response(50000, f"创建公司状态失败: {str(e)}")
 
 
+@router.post("/import", response_model=dict)
+async def import_company_states(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="ndjson / csv，默认按文件扩展名或Content-Type判断"),
+    batch_size: int = Query(settings.COMPANY_IMPORT_BATCH_SIZE, ge=1, le=settings.COMPANY_IMPORT_MAX_BATCH_SIZE),
+    db: DBSession = Depends(get_session)
+):
+    """
+    批量导入公司状态（统一响应格式）
+    上传 NDJSON（每行一个对象）或 CSV（首行为表头，material_info 列为JSON字符串），
+    按批次校验、查重并批量插入，每批一个事务；返回逐行错误报告
+    """
+    fmt = detect_format(format, file.filename, file.content_type)
+    rows = validate_rows(iter_rows(file.file, fmt, json_columns=("material_info",)), CompanyStateCreate)
+    seen_names = set()
+    total = inserted = failed = 0
+    errors = []
+
+    def report(row_errors):
+        nonlocal failed
+        failed += len(row_errors)
+        room = settings.COMPANY_IMPORT_MAX_ERRORS - len(errors)
+        if room > 0:
+            errors.extend(row_errors[:room])
+
+    upcoming = None
+    try:
+        # 解析与校验是同步CPU/文件操作，放入线程池执行；插入当前批次的同时预取下一批
+        upcoming = asyncio.ensure_future(run_in_threadpool(next_batch, rows, batch_size))
+        while True:
+            batch = await upcoming
+            if not batch:
+                break
+            upcoming = asyncio.ensure_future(run_in_threadpool(next_batch, rows, batch_size))
+            total += len(batch)
+            valid = [(line_no, item) for line_no, item, row_errors in batch if item is not None]
+            batch_errors = [{"line": line_no, "errors": row_errors} for line_no, item, row_errors in batch if item is None]
+            if valid:
+                batch_inserted, conflict_errors = await import_company_states_async(db, valid, seen_names)
+                inserted += batch_inserted
+                batch_errors.extend(conflict_errors)
+            report(sorted(batch_errors, key=lambda error: error["line"]))
+    except UnicodeDecodeError:
+        report([{"line": None, "errors": ["文件编码必须为UTF-8，导入已中止"]}])
+    except Exception as e:
+        return error_response(50000, f"导入公司状态失败: {str(e)}", {"inserted": inserted})
+    finally:
+        if upcoming is not None and not upcoming.done():
+            upcoming.cancel()
+
+    return success_response({
+        "format": fmt,
+        "total": total,
+        "inserted": inserted,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }, "导入完成")
+
+
+@router.post("/batch", response_model=dict)
+async def get_company_states_batch(
+    query: CompanyStateBatchQuery,
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
+):
+    """
+    批量获取公司状态（统一响应格式）
+    请求体可同时包含 ids、names、user_ids，一次查询返回并集；missing_ids / missing_names 为未找到的ID和名称
+    """
+    response_fields = parse_fields(fields, COMPANY_FIELDS)
+    try:
+        company_states = await get_company_states_batch_async(
+            db, ids=query.ids, names=query.names, user_ids=query.user_ids, fields=response_fields
+        )
+        found_ids = {company_state.id for company_state in company_states}
+        found_names = {company_state.company_name for company_state in company_states}
+        return success_response({
+            "items": sparse(company_states, response_fields),
+            "missing_ids": [i for i in dict.fromkeys(query.ids) if i not in found_ids],
+            "missing_names": [name for name in dict.fromkeys(query.names) if name not in found_names],
+        }, "获取公司状态成功")
+    except Exception as e:
+        return error_response(50000, f"获取公司状态失败: {str(e)}")
+
+
 @router.put("/update/{company_state_id}", response_model=dict)
-def update_company_state_with_response(
+async def update_company_state_with_response(
     company_state_id: int,
     company_state_update: CompanyStateUpdate,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session)
 ):
     """更新公司状态（统一响应格式）"""
     try:
-        company_state = update_company_state(db, company_state_id, company_state_update)
+        company_state = await update_company_state_async(db, company_state_id, company_state_update)
         if not company_state:
             return error_response(40400, "公司状态不存在")
         
@@ -140,23 +453,43 @@ def update_company_state_with_response(
 
 
 @router.get("/info/{company_state_id}", response_model=dict)
-def get_company_state_info(company_state_id: int, db: Session = Depends(get_db)):
+async def get_company_state_info(
+    request: Request,
+    response: Response,
+    company_state_id: int,
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
+):
     """获取公司状态信息（统一响应格式）"""
+    response_fields = parse_fields(fields, COMPANY_FIELDS)
     try:
-        company_state = get_company_state_by_id(db, company_state_id)
+        company_state = await get_company_state_by_id_async(db, company_state_id, fields=response_fields)
         if not company_state:
             return error_response(40400, "公司状态不存在")
-        
-        return success_response(company_state, "获取公司状态成功")
+
+        validators = validators_for([company_state], variant=response_fields)
+        if validators.matches(request):
+            return validators.not_modified()
+        return validators.apply(success_response(sparse(company_state, response_fields), "获取公司状态成功"), response)
     except Exception as e:
         return error_response(50000, f"获取公司状态失败: {str(e)}")
 
 
 @router.get("/user-info/{user_id}", response_model=dict)
-def get_user_company_states(user_id: int, db: Session = Depends(get_db)):
+async def get_user_company_states(
+    request: Request,
+    response: Response,
+    user_id: int,
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
+):
     """获取用户关联的公司状态列表（统一响应格式）"""
+    response_fields = parse_fields(fields, COMPANY_FIELDS)
     try:
-        company_states = get_company_states_by_user_id(db, user_id)
-        return success_response(company_states, "获取用户公司状态成功")
+        company_states = await get_company_states_by_user_id_async(db, user_id, fields=response_fields)
+        validators = validators_for(company_states, weak=True, variant=response_fields)
+        if validators.matches(request):
+            return validators.not_modified()
+        return validators.apply(success_response(sparse(company_states, response_fields), "获取用户公司状态成功"), response)
     except Exception as e:
         return error_response(50000, f"获取用户公司状态失败: {str(e)}")
\ No newline at end of file
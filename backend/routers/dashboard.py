@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+
+from database.database import DBSession, get_session
+from crud.dashboard import get_dashboard_stats_async
+from core.response import success_response
+from core.contract_expiry import contract_expiry
+from schemas.user import UserResponse
+from routers.user import get_current_user
+
+router = APIRouter(tags=["仪表盘"])
+
+
+@router.get("/stats", response_model=dict)
+async def get_stats(db: DBSession = Depends(get_session), current_user: UserResponse = Depends(get_current_user)):
+    """
+    仪表盘统计（统一响应格式）：用户按角色与启用状态、公司总数与按用户/质保年分布、
+    未来30/60/90天内到期及已到期的框架合同数；只读取增量维护的汇总表。
+    contracts.upcoming 为定时扫描缓存的最近到期合同（未开启扫描或尚未完成首次扫描时为null）
+    """
+    stats = await get_dashboard_stats_async(db)
+    stats["contracts"]["upcoming"] = contract_expiry.snapshot
+    return success_response(stats, "获取成功")
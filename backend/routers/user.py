@@ -1,22 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Form
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
 from datetime import timedelta
-from typing import Any
-
-from database.database import get_db
-from crud.user import authenticate_user, create_user, get_user_by_username, get_user_by_email
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from database.database import DBSession, get_session
+from crud.user import (
+    authenticate_user_async,
+    create_user_async,
+    get_user_by_username_async,
+    get_user_by_email_async,
+    update_user_async
+)
 from schemas.user import UserCreate, UserResponse, Token, LoginRequest
-from core.security import create_access_token, verify_token
-from core.response import success_response, error_response, unauthorized_error_response
+from core.security import create_access_token, verify_token, revoke_token
+from core.hashing import PasswordHashBusyError
+from core.principal_cache import principal_cache
+from core.write_behind import profile_writes
+from core.response import success_response, error_response, unauthorized_error_response, service_busy_error_response, json_response
+from core.fieldsets import parse_fields, project
+from core.conditional import validators_for
 from config.settings import settings
 
 router = APIRouter(tags=["用户认证"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="user/login")
-
-
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+# 登出接口：未携带令牌时同样返回成功
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="user/login", auto_error=False)
+
+# 前端 userInfo 字段 -> (依赖的数据库列, 取值函数)
+USER_INFO_FIELDS: Dict[str, Tuple[Tuple[str, ...], Callable[[Any], Any]]] = {
+    "name": (("full_name", "username"), lambda u: u.full_name or u.username),
+    "avatar": (("avatar",), lambda u: u.avatar),
+    "job": (("job",), lambda u: u.job),
+    "organization": (("organization",), lambda u: u.organization),
+    "location": (("location",), lambda u: u.location),
+    "email": (("email",), lambda u: u.email),
+    "introduction": (("introduction",), lambda u: u.introduction),
+    "personalWebsite": (("personal_website",), lambda u: u.personal_website),
+    "jobName": (("job_name",), lambda u: u.job_name),
+    "organizationName": (("organization_name",), lambda u: u.organization_name),
+    "locationName": (("location_name",), lambda u: u.location_name),
+    "phone": (("phone",), lambda u: u.phone),
+    "registrationDate": (("created_at",), lambda u: u.created_at.isoformat() if u.created_at else None),
+    "accountId": (("id",), lambda u: u.id),
+    "certification": (("certification",), lambda u: u.certification),
+    "role": (("role",), lambda u: u.role),
+}
+
+# /me 等接口可选的字段（与 UserResponse 一致）
+USER_RESPONSE_FIELDS = list(UserResponse.model_fields)
+
+
+def user_info_columns(info_fields: Optional[Sequence[str]]) -> Optional[List[str]]:
+    """userInfo 字段对应需要加载的数据库列，None 表示全部"""
+    if info_fields is None:
+        return None
+    return list(dict.fromkeys(column for name in info_fields for column in USER_INFO_FIELDS[name][0]))
+
+
+def build_user_info(user, info_fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """构建前端期望格式的用户信息"""
+    names = USER_INFO_FIELDS if info_fields is None else info_fields
+    return {name: USER_INFO_FIELDS[name][1](user) for name in names}
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: DBSession = Depends(get_session)):
     """获取当前用户"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -29,20 +77,33 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     username: str = payload.get("sub")
     if username is None:
         raise credentials_exception
-    user = get_user_by_username(db, username=username)
+    # 优先使用认证主体缓存，未命中时查询数据库
+    user = principal_cache.get(username)
     if user is None:
-        raise credentials_exception
+        generation = principal_cache.generation
+        user = await get_user_by_username_async(db, username=username)
+        if user is None:
+            raise credentials_exception
+        principal_cache.put(username, user, payload.get("exp"), generation)
+    if settings.PROFILE_WRITE_BEHIND_ENABLED:
+        # 叠加尚未落库的个人信息修改
+        user = profile_writes.overlay(user)
     return user
 
 
 @router.post("/login")
-def login_for_access_token(
+async def login_for_access_token(
     username: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session)
 ):
-    """用户登录"""
-    user = authenticate_user(db, username, password)
+    """用户登录（fields 可指定返回的 userInfo 字段，逗号分隔）"""
+    info_fields = parse_fields(fields, USER_INFO_FIELDS)
+    try:
+        user = await authenticate_user_async(db, username, password, fields=user_info_columns(info_fields))
+    except PasswordHashBusyError:
+        return service_busy_error_response("登录请求过多，请稍后重试")
     if not user:
         return unauthorized_error_response("用户名或密码错误")
     
@@ -57,97 +118,85 @@ def login_for_access_token(
     # 创建响应数据，符合前端期望的格式
     response_data = {
         "token": access_token,
-        "userInfo": {
-            "name": user.full_name or user.username,
-            "avatar": user.avatar,
-            "job": user.job,
-            "organization": user.organization,
-            "location": user.location,
-            "email": user.email,
-            "introduction": user.introduction,
-            "personalWebsite": user.personal_website,
-            "jobName": user.job_name,
-            "organizationName": user.organization_name,
-            "locationName": user.location_name,
-            "phone": user.phone,
-            "registrationDate": user.created_at.isoformat() if user.created_at else None,
-            "accountId": user.id,
-            "certification": user.certification,
-            "role": user.role
-        }
+        "userInfo": build_user_info(user, info_fields)
     }
     
     return success_response(response_data, "登录成功")
 
 
 @router.post("/register", response_model=UserResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: DBSession = Depends(get_session)):
     """用户注册"""
     # 检查用户名是否已存在
-    db_user = get_user_by_username(db, username=user.username)
+    db_user = await get_user_by_username_async(db, username=user.username, fields=["id"])
     if db_user:
         raise HTTPException(
             status_code=400,
             detail="用户名已存在"
         )
     # 检查邮箱是否已存在
-    db_user = get_user_by_email(db, email=user.email)
+    db_user = await get_user_by_email_async(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=400,
             detail="邮箱已存在"
         )
-    return create_user(db=db, user=user)
+    try:
+        return await create_user_async(db, user)
+    except PasswordHashBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="服务繁忙，请稍后重试"
+        )
 
 
 @router.get("/me", response_model=UserResponse)
-def read_users_me(current_user: UserResponse = Depends(get_current_user)):
-    """获取当前用户信息"""
-    return current_user
+async def read_users_me(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """获取当前用户信息（fields 可指定返回字段，逗号分隔）"""
+    response_fields = parse_fields(fields, USER_RESPONSE_FIELDS)
+    validators = validators_for([current_user], variant=response_fields)
+    if validators.matches(request):
+        return validators.not_modified()
+    if response_fields is not None:
+        return validators.apply(json_response(project(current_user, response_fields)))
+    return validators.apply(current_user, response)
 
 
 @router.post("/logout")
-def logout(response: Response):
-    """用户登出"""
-    # 在实际应用中，这里可能需要处理令牌黑名单等逻辑
-    # 目前简单返回成功消息
+async def logout(response: Response, token: Optional[str] = Depends(optional_oauth2_scheme)):
+    """用户登出（吊销当前令牌，之后使用该令牌的请求返回401）"""
+    payload = verify_token(token) if token else None
+    if payload is not None:
+        revoke_token(payload)
     return success_response({"message": "登出成功"}, "登出成功")
 
 
+@router.get("/info")
 @router.post("/info")
-def get_user_info(current_user: UserResponse = Depends(get_current_user)):
-    """获取用户信息"""
+async def get_user_info(request: Request, fields: Optional[str] = None, current_user: UserResponse = Depends(get_current_user)):
+    """获取用户信息（fields 可指定返回的 userInfo 字段，逗号分隔；GET 请求支持条件请求）"""
     # 返回与前端期望格式匹配的用户信息
-    response_data = {
-        "name": current_user.full_name or current_user.username,
-        "avatar": current_user.avatar,
-        "job": current_user.job,
-        "organization": current_user.organization,
-        "location": current_user.location,
-        "email": current_user.email,
-        "introduction": current_user.introduction,
-        "personalWebsite": current_user.personal_website,
-        "jobName": current_user.job_name,
-        "organizationName": current_user.organization_name,
-        "locationName": current_user.location_name,
-        "phone": current_user.phone,
-        "registrationDate": current_user.created_at.isoformat() if current_user.created_at else None,
-        "accountId": current_user.id,
-        "certification": current_user.certification,
-        "role": current_user.role
-    }
-    
-    return success_response(response_data, "获取成功")
+    info_fields = parse_fields(fields, USER_INFO_FIELDS)
+    validators = validators_for([current_user], variant=info_fields)
+    if validators.matches(request):
+        return validators.not_modified()
+    return validators.apply(success_response(build_user_info(current_user, info_fields), "获取成功"))
 
 
 @router.put("/profile")
-def update_user_profile(
+async def update_user_profile(
     profile_data: dict,
+    fields: Optional[str] = None,
     current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session)
 ):
-    """更新用户个人信息"""
-    from crud.user import update_user
+    """更新用户个人信息（fields 可指定返回的 userInfo 字段，逗号分隔）"""
+    info_fields = parse_fields(fields, USER_INFO_FIELDS)
     
     # 构建更新数据
     update_data = {}
@@ -172,30 +221,16 @@ def update_user_profile(
         if frontend_field in profile_data:
             update_data[backend_field] = profile_data[frontend_field]
     
+    if settings.PROFILE_WRITE_BEHIND_ENABLED:
+        # 延迟写入：合并到待写入队列，返回叠加修改后的用户信息
+        profile_writes.submit(current_user, update_data)
+        return success_response(build_user_info(profile_writes.overlay(current_user), info_fields), "更新成功")
+
     # 更新用户信息
-    updated_user = update_user(db, current_user.id, update_data)
+    updated_user = await update_user_async(db, current_user.id, update_data)
     
     if not updated_user:
         return error_response(50000, "更新用户信息失败")
     
     # 返回更新后的用户信息
-    response_data = {
-        "name": updated_user.full_name or updated_user.username,
-        "avatar": updated_user.avatar,
-        "job": updated_user.job,
-        "organization": updated_user.organization,
-        "location": updated_user.location,
-        "email": updated_user.email,
-        "introduction": updated_user.introduction,
-        "personalWebsite": updated_user.personal_website,
-        "jobName": updated_user.job_name,
-        "organizationName": updated_user.organization_name,
-        "locationName": updated_user.location_name,
-        "phone": updated_user.phone,
-        "registrationDate": updated_user.created_at.isoformat() if updated_user.created_at else None,
-        "accountId": updated_user.id,
-        "certification": updated_user.certification,
-        "role": updated_user.role
-    }
-    
-    return success_response(response_data, "更新成功")
\ No newline at end of file
+    return success_response(build_user_info(updated_user, info_fields), "更新成功")
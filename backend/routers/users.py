@@ -1,20 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
 
-from database.database import get_db
-from crud.user import get_users, get_user, create_user, update_user, delete_user
-from schemas.user import UserCreate, UserUpdate, UserResponse
-from routers.user import get_current_user
+from database.database import DBSession, get_session
+from crud.user import users_export_statement, get_users_async, get_users_page_async, get_users_with_companies_page_async, get_user_async, create_user_async, update_user_async, delete_user_async
+from schemas.user import UserCreate, UserUpdate, UserResponse, UserPage, UserWithCompaniesPage
+from core.hashing import PasswordHashBusyError
+from core.fieldsets import parse_fields, project
+from core.response import json_response
+from core.exporter import parse_export_format, export_response
+from core.conditional import validators_for
+from core.write_behind import profile_writes
+from routers.user import get_current_user, USER_RESPONSE_FIELDS
 
 router = APIRouter(tags=["用户管理"])
 
 
 @router.get("/", response_model=List[UserResponse])
-def read_users(
+async def read_users(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session),
     current_user: UserResponse = Depends(get_current_user)
 ):
     """获取用户列表（需要管理员权限）"""
@@ -23,14 +31,81 @@ def read_users(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="权限不足"
         )
-    users = get_users(db, skip=skip, limit=limit)
-    return users
+    response_fields = parse_fields(fields, USER_RESPONSE_FIELDS)
+    users = await get_users_async(db, skip=skip, limit=limit, fields=response_fields)
+    validators = validators_for(users, weak=True, variant=(response_fields, skip, limit))
+    if validators.matches(request):
+        return validators.not_modified()
+    if response_fields is not None:
+        return validators.apply(json_response([project(user, response_fields) for user in users]))
+    return validators.apply(users, response)
+
+
+@router.get("/page", response_model=UserPage)
+async def read_users_page(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """键集分页获取用户列表（需要管理员权限）"""
+    if current_user.role not in ["admin", "root"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="权限不足"
+        )
+    response_fields = parse_fields(fields, USER_RESPONSE_FIELDS)
+    items, next_cursor, prev_cursor = await get_users_page_async(db, cursor=cursor, limit=limit, fields=response_fields)
+    validators = validators_for(items, weak=True, variant=(response_fields, next_cursor, prev_cursor))
+    if validators.matches(request):
+        return validators.not_modified()
+    if response_fields is not None:
+        items = [project(user, response_fields) for user in items]
+        return validators.apply(json_response({"items": items, "next_cursor": next_cursor, "prev_cursor": prev_cursor}))
+    return validators.apply({"items": items, "next_cursor": next_cursor, "prev_cursor": prev_cursor}, response)
+
+
+@router.get("/with-companies", response_model=UserWithCompaniesPage)
+async def read_users_with_companies(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: DBSession = Depends(get_session),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """键集分页获取用户及其公司状态（需要管理员权限）"""
+    if current_user.role not in ["admin", "root"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="权限不足"
+        )
+    items, next_cursor, prev_cursor = await get_users_with_companies_page_async(db, cursor=cursor, limit=limit)
+    return {"items": items, "next_cursor": next_cursor, "prev_cursor": prev_cursor}
+
+
+@router.get("/export")
+async def export_users(
+    format: Optional[str] = Query(None, description="ndjson（默认）/ csv"),
+    fields: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """流式导出用户（需要管理员权限，不包含密码哈希）"""
+    if current_user.role not in ["admin", "root"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="权限不足"
+        )
+    fmt = parse_export_format(format)
+    columns = parse_fields(fields, USER_RESPONSE_FIELDS) or USER_RESPONSE_FIELDS
+    return export_response(users_export_statement(columns), fmt, "users")
 
 
 @router.post("/", response_model=UserResponse)
-def create_new_user(
+async def create_new_user(
     user: UserCreate,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     current_user: UserResponse = Depends(get_current_user)
 ):
     """创建新用户（需要管理员权限）"""
@@ -39,13 +114,22 @@ def create_new_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="权限不足"
         )
-    return create_user(db=db, user=user)
+    try:
+        return await create_user_async(db, user)
+    except PasswordHashBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="服务繁忙，请稍后重试"
+        )
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def read_user(
+async def read_user(
+    request: Request,
+    response: Response,
     user_id: int,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_session),
     current_user: UserResponse = Depends(get_current_user)
 ):
     """获取用户详情"""
@@ -55,17 +139,23 @@ def read_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="权限不足"
         )
-    db_user = get_user(db, user_id=user_id)
+    response_fields = parse_fields(fields, USER_RESPONSE_FIELDS)
+    db_user = await get_user_async(db, user_id, fields=response_fields)
     if db_user is None:
         raise HTTPException(status_code=404, detail="用户不存在")
-    return db_user
+    validators = validators_for([db_user], variant=response_fields)
+    if validators.matches(request):
+        return validators.not_modified()
+    if response_fields is not None:
+        return validators.apply(json_response(project(db_user, response_fields)))
+    return validators.apply(db_user, response)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user_info(
+async def update_user_info(
     user_id: int,
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     current_user: UserResponse = Depends(get_current_user)
 ):
     """更新用户信息"""
@@ -75,16 +165,19 @@ def update_user_info(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="权限不足"
         )
-    db_user = update_user(db, user_id=user_id, user_update=user_update)
+    if profile_writes.has_pending(user_id):
+        # 先写入该用户延迟写入中的个人信息，避免之后被旧的修改覆盖
+        await profile_writes.flush_async()
+    db_user = await update_user_async(db, user_id, user_update)
     if db_user is None:
         raise HTTPException(status_code=404, detail="用户不存在")
     return db_user
 
 
 @router.delete("/{user_id}")
-def delete_user_by_id(
+async def delete_user_by_id(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     current_user: UserResponse = Depends(get_current_user)
 ):
     """删除用户（需要管理员权限）"""
@@ -93,7 +186,7 @@ def delete_user_by_id(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="权限不足"
         )
-    success = delete_user(db, user_id=user_id)
+    success = await delete_user_async(db, user_id)
     if not success:
         raise HTTPException(status_code=404, detail="用户不存在")
     return {"message": "用户删除成功"}
\ No newline at end of file
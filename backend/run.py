@@ -1,15 +1,29 @@
 #!/usr/bin/env python3
 """
 FastAPI应用启动脚本
+DEBUG=true 时以单进程启动并在代码变更后自动重载；
+DEBUG=false 或指定 --workers 时以多进程方式启动（见 core/prefork.py）
 """
+import argparse
+
 import uvicorn
 from config.settings import settings
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=settings.DEBUG,
-        log_level="info"
-    )
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="启动YG后端服务")
+    parser.add_argument("--workers", type=int, help="工作进程数（默认 WEB_WORKERS，0 为CPU核数）")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    args = parser.parse_args()
+
+    if args.workers is None and settings.DEBUG:
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            reload=True,
+            log_level="info"
+        )
+    else:
+        from core.prefork import serve
+        serve("main:app", workers=args.workers, host=args.host, port=args.port)
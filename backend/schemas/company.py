@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 
+from config.settings import settings
+
 
 class CompanyStateBase(BaseModel):
     company_name: str
@@ -39,4 +41,24 @@ class CompanyStateResponse(CompanyStateBase):
     updated_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class CompanyStatePage(BaseModel):
+    """公司状态键集分页结果"""
+    items: List[CompanyStateResponse]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class CompanyStateSearchResult(BaseModel):
+    """公司状态检索结果（按相关度排序）"""
+    items: List[CompanyStateResponse]
+    total: int
+
+
+class CompanyStateBatchQuery(BaseModel):
+    """批量查询公司状态：按ID、公司名称、用户ID任意组合，结果为并集"""
+    ids: List[int] = Field(default_factory=list, max_length=settings.BATCH_LOOKUP_MAX_KEYS)
+    names: List[str] = Field(default_factory=list, max_length=settings.BATCH_LOOKUP_MAX_KEYS)
+    user_ids: List[int] = Field(default_factory=list, max_length=settings.BATCH_LOOKUP_MAX_KEYS)
@@ -1,7 +1,9 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
+from schemas.company import CompanyStateResponse
+
 
 class UserBase(BaseModel):
     username: str
@@ -44,6 +46,25 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserPage(BaseModel):
+    """用户键集分页结果"""
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class UserWithCompanies(UserResponse):
+    """用户及其关联的公司状态"""
+    company_states: List[CompanyStateResponse] = []
+
+
+class UserWithCompaniesPage(BaseModel):
+    """用户及公司状态键集分页结果"""
+    items: List[UserWithCompanies]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -0,0 +1,62 @@
+"""
+测试公共夹具
+与 benchmarks 相同：导入任何应用模块之前先指向临时SQLite数据库，整个测试会话共用一份种子数据
+
+运行（在 backend 目录下执行）：
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.common import prepare_environment, seed_database, auth_headers  # noqa: E402
+
+# spec.grade 只在配置中声明（迁移不为其建索引），用于验证启动检查会补建索引
+prepare_environment(
+    ADMISSION_CONTROL_ENABLED="false",
+    MATERIAL_INFO_INDEXED_PATHS='{"code": "text", "quantity": "number", "spec.grade": "text"}',
+)
+
+USERS = 20
+COMPANIES = 200
+
+
+@pytest.fixture(scope="session")
+def seeded() -> dict:
+    """写入种子数据，并执行与应用启动时相同的结构检查；返回种子数据的规模"""
+    from database.database import engine
+    from database.schema import check_schema
+
+    seed_database(users=USERS, companies=COMPANIES)
+    check_schema(engine)
+    return {"users": USERS, "companies": COMPANIES}
+
+
+@pytest.fixture(scope="session")
+def admin_headers(seeded):
+    return auth_headers("user0")
+
+
+@pytest.fixture(scope="session")
+def client(seeded, admin_headers):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        # 预热认证主体缓存，使鉴权查询不计入语句数
+        client.get("/api/user/me", headers=admin_headers)
+        yield client
+
+
+@pytest.fixture
+def db(seeded):
+    from database.database import SessionLocal
+
+    with SessionLocal() as session:
+        yield session
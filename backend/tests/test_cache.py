@@ -0,0 +1,27 @@
+"""
+缓存后端接口
+"""
+
+import pytest
+
+from core.cache import CACHE_BACKENDS, CacheBackend, create_cache_backend
+
+
+def test_incomplete_backend_fails_on_creation(monkeypatch):
+    class PartialBackend(CacheBackend):
+        def __init__(self, max_size: int, **options):
+            self.max_size = max_size
+
+        def get(self, key):
+            return None
+
+    monkeypatch.setitem(CACHE_BACKENDS, "partial", PartialBackend)
+    with pytest.raises(TypeError, match="abstract"):
+        create_cache_backend("partial", max_size=10)
+
+
+def test_memory_backend_implements_interface():
+    backend = create_cache_backend("memory", max_size=10)
+    backend.set("key", [1], ttl=60)
+    assert backend.get("key") == [1]
+    assert backend.delete(["key", "other"]) == 1
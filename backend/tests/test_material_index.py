@@ -0,0 +1,78 @@
+"""
+物料信息JSON路径查询：每个声明的路径都建有表达式索引，过滤条件通过 EXPLAIN QUERY PLAN 确认命中索引
+"""
+
+import pytest
+
+from config.settings import settings
+from core.material import (
+    INDEXED_PATHS, NUMBER, explain_plan, indexes_used, material_index_name, missing_material_indexes,
+)
+from crud.company import company_states_by_material_query
+from models.user import CompanyState
+
+
+def plan_for(db, conditions, after_id=None):
+    """与 get_company_states_by_material 相同的查询形态（键集分页：id 游标 + 多取一行）"""
+    query = company_states_by_material_query(db, conditions)
+    if after_id is not None:
+        query = query.filter(CompanyState.id > after_id)
+    return explain_plan(db, query.order_by(CompanyState.id).limit(101))
+
+
+def test_config_only_path_is_declared():
+    # 迁移只为 code、quantity 建索引，spec.grade 的索引只能来自启动检查
+    assert "spec.grade" in INDEXED_PATHS
+
+
+def test_every_configured_path_has_index(db):
+    assert missing_material_indexes(db.connection()) == []
+
+
+@pytest.mark.parametrize("after_id", [None, 100], ids=["first_page", "cursor"])
+@pytest.mark.parametrize("path", list(INDEXED_PATHS))
+def test_equality_filter_uses_path_index(db, path, after_id):
+    value = 42 if INDEXED_PATHS[path] == NUMBER else "M0042"
+    plan = plan_for(db, [(path, "eq", value)], after_id)
+    assert indexes_used(plan) == [material_index_name(path)], plan
+
+
+@pytest.mark.parametrize("after_id", [None, 100], ids=["first_page", "cursor"])
+def test_range_filter_uses_path_index(db, after_id):
+    plan = plan_for(db, [("quantity", "gte", 100), ("quantity", "lt", 105)], after_id)
+    assert indexes_used(plan) == [material_index_name("quantity")], plan
+
+
+def test_combined_filter_uses_an_index(db):
+    plan = plan_for(db, [("code", "eq", "M0042"), ("quantity", "gt", 10)])
+    assert indexes_used(plan), plan
+
+
+def test_startup_check_rebuilds_missing_index(seeded, monkeypatch):
+    from sqlalchemy import text
+    from database.database import engine
+    from database.schema import check_schema
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX {material_index_name('spec.grade')}"))
+    # 关闭自动迁移时拒绝启动
+    monkeypatch.setattr(settings, "DB_AUTO_MIGRATE", False)
+    with pytest.raises(RuntimeError, match="spec.grade"):
+        check_schema(engine)
+    monkeypatch.setattr(settings, "DB_AUTO_MIGRATE", True)
+    assert check_schema(engine) is True
+    with engine.connect() as conn:
+        assert missing_material_indexes(conn) == []
+
+
+def test_index_check_skips_other_dialects():
+    from types import SimpleNamespace
+    from database.schema import check_material_indexes
+
+    # 非SQLite数据库不查询 sqlite_master，也不创建 json_extract 表达式索引（连接任何数据库都会失败）
+    def unreachable(*args, **kwargs):
+        raise AssertionError("不应访问数据库")
+
+    dialect = SimpleNamespace(name="postgresql")
+    assert missing_material_indexes(SimpleNamespace(dialect=dialect, execute=unreachable)) == []
+    assert check_material_indexes(SimpleNamespace(dialect=dialect, connect=unreachable, begin=unreachable)) is False
@@ -0,0 +1,111 @@
+"""
+多进程服务：进程内缓存在fork之前停用，只有工作进程启动失败时主进程才停止服务
+"""
+
+import pytest
+
+from config.settings import settings
+from core import company_cache as company_cache_module, prefork, principal_cache as principal_cache_module
+from core.cache import MemoryCacheBackend
+from core.company_cache import CompanyStateCache
+from core.principal_cache import PrincipalCache
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    """替换为独立的缓存实例，避免影响其他测试使用的全局缓存"""
+    company = CompanyStateCache(MemoryCacheBackend(max_size=100), ttl=60, replica_lag=0)
+    principal = PrincipalCache(max_size=100, ttl=60)
+    monkeypatch.setattr(company_cache_module, "company_cache", company)
+    monkeypatch.setattr(principal_cache_module, "principal_cache", principal)
+    return company, principal
+
+
+@pytest.fixture
+def arbiters(monkeypatch):
+    """记录 serve 创建的主进程对象，不实际监听端口和fork"""
+    created = []
+
+    class FakeArbiter:
+        def __init__(self, app, host, port, workers):
+            self.workers = workers
+            created.append(self)
+
+        def run(self):
+            pass
+
+    monkeypatch.setattr(prefork, "Arbiter", FakeArbiter)
+    return created
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_serve_disables_process_local_caches_for_multiple_workers(seeded, caches, arbiters, workers):
+    company, principal = caches
+    prefork.serve("main:app", workers=workers, host=settings.HOST, port=settings.PORT)
+    assert arbiters[0].workers == workers
+    assert company.enabled is (workers == 1)
+    assert (principal.max_size > 0) is (workers == 1)
+
+
+def test_disabled_principal_cache_stores_nothing(caches):
+    from models.user import User
+
+    _, principal = caches
+    principal.disable()
+    principal.put("user0", User(username="user0"), None, principal.generation)
+    assert principal.get("user0") is None
+
+
+def test_shared_cache_backend_stays_enabled():
+    class SharedBackend(MemoryCacheBackend):
+        process_local = False
+
+    cache = CompanyStateCache(SharedBackend(max_size=100), ttl=60, replica_lag=0)
+    assert cache.disable_process_local() is False
+    assert cache.enabled
+
+
+class WorkerExit(Exception):
+    pass
+
+
+@pytest.mark.parametrize("started, expected", [(False, prefork.WORKER_BOOT_ERROR), (True, prefork.WORKER_CRASHED)],
+                         ids=["boot_error", "crash_after_start"])
+def test_worker_exit_code_distinguishes_boot_failure(monkeypatch, started, expected):
+    from types import SimpleNamespace
+
+    arbiter = prefork.Arbiter(None, settings.HOST, settings.PORT, workers=1)
+
+    def run_worker():
+        arbiter._server = SimpleNamespace(started=started)
+        raise RuntimeError("worker failed")
+
+    def exit_worker(code):
+        codes.append(code)
+        raise WorkerExit
+
+    codes = []
+    monkeypatch.setattr(arbiter, "_run_worker", run_worker)
+    monkeypatch.setattr(prefork.os, "fork", lambda: 0)
+    monkeypatch.setattr(prefork.os, "_exit", exit_worker)
+    with pytest.raises(WorkerExit):
+        arbiter._spawn()
+    assert codes == [expected]
+
+
+@pytest.mark.parametrize("code, halts", [(prefork.WORKER_BOOT_ERROR, True), (prefork.WORKER_CRASHED, False), (0, False)],
+                         ids=["boot_error", "crash_after_start", "max_requests"])
+def test_only_boot_failure_halts_master(monkeypatch, code, halts):
+    arbiter = prefork.Arbiter(None, settings.HOST, settings.PORT, workers=1)
+    arbiter.workers = {1234: 0.0}
+    exited = [(1234, code << 8)]
+
+    def waitpid(pid, options):
+        if exited:
+            return exited.pop()
+        raise ChildProcessError
+
+    monkeypatch.setattr(prefork.os, "waitpid", waitpid)
+    arbiter._reap()
+    assert arbiter.workers == {}
+    assert arbiter._halt is halts
@@ -0,0 +1,46 @@
+"""
+批量查询接口的SQL语句数：查询数固定，与键的数量无关（防止退化为逐个查询 / N+1）
+"""
+
+import pytest
+
+from benchmarks.common import count_queries
+
+KEYS = 50
+
+
+@pytest.fixture
+def keys(seeded):
+    return {
+        "ids": list(range(1, KEYS + 1)),
+        "names": [f"company-{i:08d}" for i in range(KEYS)],
+        "user_ids": list(range(1, seeded["users"] + 1)),
+    }
+
+
+@pytest.mark.parametrize("kinds", [("ids",), ("names",), ("user_ids",), ("ids", "names", "user_ids")],
+                         ids=["ids", "names", "user_ids", "mixed"])
+def test_company_batch_is_one_query(client, keys, kinds):
+    with count_queries() as statements:
+        response = client.post("/api/company/batch", json={kind: keys[kind] for kind in kinds})
+    assert response.status_code == 200
+    assert len(statements) == 1, statements
+
+
+def test_company_batch_reports_missing_keys(client, keys, seeded):
+    missing = seeded["companies"] + 1
+    data = client.post("/api/company/batch", json={"ids": keys["ids"] + [missing]}).json()["data"]
+    assert len(data["items"]) == KEYS
+    assert data["missing_ids"] == [missing]
+
+
+@pytest.mark.parametrize("limit", [5, 20])
+def test_users_with_companies_is_two_queries(client, admin_headers, limit):
+    # 用户一条 + 公司状态一条（selectinload），与用户数无关
+    with count_queries() as statements:
+        response = client.get("/api/users/with-companies", params={"limit": limit}, headers=admin_headers)
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == limit
+    assert all(item["company_states"] for item in items)
+    assert len(statements) == 2, statements
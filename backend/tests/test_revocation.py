@@ -0,0 +1,137 @@
+"""
+令牌吊销名单
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from core import revocation
+from core.revocation import TokenDenylist
+
+
+def memory_denylist() -> TokenDenylist:
+    return TokenDenylist(None, bucket_seconds=60, bloom_bits=1 << 16, refresh_interval=1.0)
+
+
+def file_denylist(path) -> TokenDenylist:
+    return TokenDenylist(str(path), bucket_seconds=60, bloom_bits=1 << 16, refresh_interval=1.0)
+
+
+def login(client, username: str) -> dict:
+    response = client.post("/api/user/login", data={"username": username, "password": "bench-password"})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['data']['token']}"}
+
+
+def test_logout_revokes_token(client):
+    from config.settings import settings
+    from core.revocation import token_denylist
+    from core.security import verify_token
+
+    headers, other = login(client, "user1"), login(client, "user1")
+    assert client.get("/api/user/me", headers=headers).status_code == 200
+    payload = verify_token(headers["Authorization"].split()[1])
+
+    assert client.post("/api/user/logout", headers=headers).status_code == 200
+    assert client.get("/api/user/me", headers=headers).status_code == 401
+    # 同一用户的其他令牌不受影响
+    assert client.get("/api/user/me", headers=other).status_code == 200
+
+    # 重启后从名单文件重新加载，吊销仍然有效
+    token_denylist.flush()
+    reloaded = file_denylist(settings.TOKEN_DENYLIST_FILE)
+    assert reloaded.is_revoked(payload["jti"], payload["exp"])
+    assert not reloaded.is_revoked(verify_token(other["Authorization"].split()[1])["jti"], payload["exp"])
+
+
+def test_revocation_survives_reload(tmp_path):
+    path = tmp_path / "revoked.log"
+    exp = time.time() + 600
+    denylist = file_denylist(path)
+    denylist.revoke("revoked", exp)
+    reloaded = file_denylist(path)
+    assert reloaded.is_revoked("revoked", exp)
+    assert not reloaded.is_revoked("other", exp)
+
+
+def test_expired_entries_are_dropped(tmp_path, monkeypatch):
+    path = tmp_path / "revoked.log"
+    now = time.time()
+    denylist = file_denylist(path)
+    denylist.revoke("short", now + 30)
+    denylist.revoke("long", now + 3600)
+
+    # 两分钟后：short 所在的分桶整体过期，从内存中丢弃，压缩后从文件中删除
+    later = now + 120
+    monkeypatch.setattr(revocation, "time", SimpleNamespace(time=lambda: later))
+    denylist.maintain()
+    assert not denylist.is_revoked("short", now + 30)
+    assert denylist.is_revoked("long", now + 3600)
+    assert denylist.stats()["entries"] == 1
+    denylist.compact()
+    assert [line.split()[0] for line in path.read_text().splitlines()] == ["long"]
+    # 已过期的令牌不再加入名单
+    denylist.revoke("stale", now + 30)
+    assert denylist.stats()["entries"] == 1
+
+
+def test_bloom_rebuild_does_not_block_checks(monkeypatch):
+    denylist = memory_denylist()
+    now = time.time()
+    denylist.revoke("old", now + 10)
+    denylist.revoke("live", now + 1000)
+
+    started, release = threading.Event(), threading.Event()
+
+    class BlockingBloom(revocation.BloomFilter):
+        def add(self, key):
+            started.set()
+            release.wait(5)
+            super().add(key)
+
+    monkeypatch.setattr(revocation, "BloomFilter", BlockingBloom)
+    rebuild = threading.Thread(target=denylist._expire, args=(now + 300,))
+    rebuild.start()
+    assert started.wait(5)
+
+    # 重建进行中：检查与吊销不等待重建完成，期间新吊销的令牌在替换后的过滤器中仍然有效
+    results = []
+    check = threading.Thread(target=lambda: results.append(
+        (denylist.is_revoked("live", now + 1000), denylist.is_revoked("other", now + 1000))))
+    check.start()
+    check.join(1)
+    revoked_during = threading.Thread(target=denylist.revoke, args=("during", now + 1000))
+    revoked_during.start()
+    revoked_during.join(1)
+    blocked = check.is_alive() or revoked_during.is_alive()
+    release.set()
+    rebuild.join(5)
+
+    assert not blocked
+    assert results == [(True, False)]
+    assert denylist.is_revoked("during", now + 1000)
+    assert denylist.is_revoked("live", now + 1000)
+    assert denylist.stats()["buckets"] == 1
+
+
+def legacy_token(username: str) -> str:
+    """启用吊销之前签发的令牌（没有 jti）"""
+    import jwt
+    from datetime import datetime, timedelta
+    from config.settings import settings
+
+    payload = {"sub": username, "exp": datetime.utcnow() + timedelta(minutes=5)}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def test_token_without_jti_is_rejected(client, monkeypatch):
+    from config.settings import settings
+    from core.security import verify_token
+
+    token = legacy_token("user0")
+    assert verify_token(token) is None
+    assert client.get("/api/user/me", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+    # 关闭吊销时不要求 jti
+    monkeypatch.setattr(settings, "TOKEN_REVOCATION_ENABLED", False)
+    assert verify_token(token)["sub"] == "user0"
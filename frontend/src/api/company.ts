@@ -36,6 +36,19 @@ export const getCompanyStatesByUserId = (userId: number) => {
   return get<CompanyStateResponse>(`/api/company/user-info/${userId}`);
 };
 
+// 批量获取公司状态（按ID、公司名称、用户ID任意组合，一次请求返回并集）
+export const getCompanyStatesBatch = (query: {
+  ids?: number[];
+  names?: string[];
+  userIds?: number[];
+}) => {
+  return post<CompanyStateResponse>('/api/company/batch', {
+    ids: query.ids ?? [],
+    names: query.names ?? [],
+    user_ids: query.userIds ?? [],
+  });
+};
+
 // 创建公司状态
 export const createCompanyState = (data: CompanyStateCreateRequest) => {
   return post<CompanyStateResponse>('/api/company/create', data);